@@ -2,160 +2,188 @@
 # -*- coding: utf-8 -*-
 """
 Generate Input - input.json을 읽어서 addresses와 lines를 생성하는 모듈
+input.json의 zNNNN 섹션 수만큼 레이어를 만들고, 모든 레이어를 같은 루틴으로 처리합니다.
 """
 
+import hashlib
 import json
+import os
 import random
 import math
-from typing import List, Dict, Tuple
+import re
+import shutil
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from config import (
     INPUT_FILE, OUTPUT_FILE, 
-    RANDOM_INTERVAL, ADDRESS_ID_START, LINE_ID_START
+    RANDOM_INTERVAL, ADDRESS_ID_START, LINE_ID_START, GENERATION_WORKERS,
+    GENERATION_SEED, GENERATION_CACHE, GENERATION_CACHE_DIR, GENERATION_CACHE_MAX_ENTRIES,
+    GENERATION_WELD, GENERATION_WELD_TOLERANCE,
+    SHORTCUT_PROJECTION, SHORTCUT_PROJECTION_COUNT, SHORTCUT_PROJECTION_MAX_DISTANCE, SHORTCUT_SNAP_DISTANCE,
+    GENERATION_INCREMENTAL, GENERATION_SNAPSHOT_FILE
 )
+from generation_incremental import GenerationSnapshot, element_key, element_seed, match_fragments
+from geometry import SegmentIndex
+from spatial_index import find_coincident_clusters
+
+# 레이어 섹션 이름 (z + 높이, 예: z6022)
+LAYER_KEY_PATTERN = re.compile(r'^z(\d+(?:\.\d+)?)$')
+# 레이어마다 rail로 생성하는 loop 종류 (처리 순서)
+LAYER_LOOP_KINDS = ('central_loop', 'local_loop', 'local_loop_for_layer')
+# 레이어마다 점 단위로 추가하는 shortcut 종류 (처리 순서)
+LAYER_SHORTCUT_KINDS = ('shortcut_local_loop', 'shortcut_central_loop')
+# offset_cord / offset 섹션의 edge 종류
+LAYER_OFFSET_EDGES = ('edge_top', 'edge_bottom')
+# 생성 로직이 바뀌어 같은 입력/시드에서 결과가 달라지면 올려서 기존 캐시를 무효화
+GENERATION_CACHE_VERSION = 3
+
+
+def sample_rail_points(start_point: List[float], end_point: List[float], rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """직선 위에 RANDOM_INTERVAL 간격으로 놓일 x/y 좌표 배열을 구합니다. (시작점, 끝점 포함)
+
+    간격을 한 번에 뽑아 누적합으로 위치를 구하고, x/y 좌표를 배열로 보간합니다.
+    """
+    x1, y1 = start_point[0], start_point[1]
+    x2, y2 = end_point[0], end_point[1]
+    
+    # 직선의 길이 계산
+    length = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+    
+    # 끝점에 닿을 때까지 필요한 최대 간격 수만큼 뽑은 뒤, 끝점 이전 위치만 사용
+    max_points = int(length // min(RANDOM_INTERVAL)) + 1 if length > 0 else 0
+    offsets = np.cumsum(rng.choice(RANDOM_INTERVAL, size=max_points))
+    ratios = offsets[offsets < length] / length
+    
+    # 시작점 + 중간 포인트 + 끝점
+    xs = np.concatenate(([x1], x1 + ratios * (x2 - x1), [x2]))
+    ys = np.concatenate(([y1], y1 + ratios * (y2 - y1), [y2]))
+    return xs, ys
+
+
+def address_records(first_id: int, xs, ys, z_value) -> List[Dict]:
+    """좌표 배열을 first_id부터 연속된 ID의 address dict 목록으로 변환합니다."""
+    return [
+        {
+            "id": addr_id,
+            "address": addr_id,
+            "name": f"ADDR_{addr_id}",
+            "pos": {"x": round(x, 1), "y": round(y, 1), "z": z_value}
+        }
+        for addr_id, x, y in zip(range(first_id, first_id + len(xs)), np.asarray(xs).tolist(), np.asarray(ys).tolist())
+    ]
+
+
+def chain_line_records(addresses: List[Dict], first_line_id: int) -> List[Dict]:
+    """addresses를 순차적으로 연결하는 line dict 목록을 first_line_id부터 연속된 ID로 만듭니다."""
+    return [
+        {
+            "id": line_id,
+            "name": f"LINE_{current_addr['id']}_{next_addr['id']}",
+            "fromAddress": current_addr['id'],
+            "toAddress": next_addr['id'],
+            "fromPos": current_addr['pos'],
+            "toPos": next_addr['pos'],
+            "curve": False
+        }
+        for line_id, current_addr, next_addr in zip(range(first_line_id, first_line_id + len(addresses) - 1), addresses, addresses[1:])
+    ]
+
+
+def sample_loop_group(loops: List, seed_key: List[int]) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """loop 그룹 하나의 rail 좌표를 그룹 전용 난수 생성기로 구합니다. (worker 프로세스에서도 실행)"""
+    rng = np.random.default_rng(seed_key)
+    return [sample_rail_points(line[0], line[1], rng) for line in loops if len(line) == 2]
+
+
+def build_loop_group(rails: List[Tuple[np.ndarray, np.ndarray]], z_value: float,
+                     first_address_id: int, first_line_id: int) -> Tuple[List[Dict], List[Dict]]:
+    """예약된 ID 구간의 시작값부터 loop 그룹의 address / line dict를 만듭니다. (worker 프로세스에서도 실행)"""
+    addresses = []
+    lines = []
+    for xs, ys in rails:
+        rail_addresses = address_records(first_address_id + len(addresses), xs, ys, z_value)
+        lines.extend(chain_line_records(rail_addresses, first_line_id + len(lines)))
+        addresses.extend(rail_addresses)
+    return addresses, lines
 
 class InputGenerator:
-    def __init__(self):
-        self.z6022_central_loop = []
-        self.z6022_local_loop = []
-        self.z6022_local_loop_for_layer = []
-        self.z4822_central_loop = []
-        self.z4822_local_loop = []
-        self.z4822_local_loop_for_layer = []
-        
-        # z6022 offset 데이터
-        self.z6022_offset_cord_edge_top = []
-        self.z6022_offset_cord_edge_bottom = []
-        self.z6022_offset_edge_top = []
-        self.z6022_offset_edge_bottom = []
-        
-        # z4822 offset 데이터
-        self.z4822_offset_cord_edge_top = []
-        self.z4822_offset_cord_edge_bottom = []
-        self.z4822_offset_edge_top = []
-        self.z4822_offset_edge_bottom = []
-        
-        # shortcut 데이터
-        self.z6022_shortcut_local_loop = []
-        self.z4822_shortcut_local_loop = []
-        self.z6022_shortcut_central_loop = []
-        self.z4822_shortcut_central_loop = []
-        
-        # connect_point 데이터
-        self.z6022_connect_point_connection_points = []
-        self.z4822_connect_point_connection_points = []
-        
-        # pair_line_connect 데이터
-        self.z6022_pair_line_connect = []
-        self.z4822_pair_line_connect = []
-        
-        # LAYER_CONNECT_POINT 데이터
-        self.layer_connect_points_z0_4822 = []
-        self.layer_connect_points_z4822_6022 = []
+    def __init__(self, workers: Optional[int] = None, seed: Optional[int] = None, use_cache: Optional[bool] = None,
+                 incremental: Optional[bool] = None):
+        # 레이어 목록: [{'name', 'z', 'loops', 'offset_cords', 'offsets', 'shortcuts', 'shortcut_for_layer'}]
+        self.layers = []
+        # layer_crossover 목록: [(이름, 연결 목록)] (예: ('z0-4822', [...]))
+        self.layer_crossovers = []
         
         self.addresses = []
         self.lines = []
         self.current_address_id = ADDRESS_ID_START
         self.current_line_id = LINE_ID_START
+        # address 간격 추출용 시드와 난수 생성기 (시드가 없으면 random 모듈에서 가져옴)
+        # loop 그룹마다 [seed, 그룹 번호]로 별도 생성기를 만들므로 worker 수와 무관하게 결과가 같음
+        seed = seed if seed is not None else GENERATION_SEED
+        self.fixed_seed = seed is not None
+        self.seed = int(seed) if self.fixed_seed else random.getrandbits(64)
+        self.rng = np.random.default_rng(self.seed)
+        # 시드가 고정된 경우에만 결과 캐시 사용
+        self.use_cache = (use_cache if use_cache is not None else GENERATION_CACHE) and self.fixed_seed
+        self.cache_key = None
+        self.cache_hit = False
+        # loop line ID -> rail 번호, shortcut으로 추가된 address ID (shortcut 투영에 사용)
+        self.line_rails = {}
+        self.rail_count = 0
+        self.shortcut_address_ids = []
+        # input 요소별 생성 조각 (증분 생성 스냅샷에 저장)
+        self.fragments = []
+        # 직전 스냅샷과 비교하여 바뀐 요소만 다시 생성 (스냅샷이 없거나 설정이 다르면 전체 생성)
+        self.incremental = incremental if incremental is not None else GENERATION_INCREMENTAL
+        self.incremental_used = False
+        self.diff_summary = None
+        # loop 그룹 병렬 생성 프로세스 수 (1이면 순차 실행, None이면 CPU 코어 수)
+        self.workers = workers if workers is not None else GENERATION_WORKERS
+        if self.workers is None:
+            self.workers = os.cpu_count() or 1
+    
+    @staticmethod
+    def parse_layer(name: str, section: Dict) -> Dict:
+        """zNNNN 섹션 하나를 레이어 dict로 변환합니다."""
+        shortcut = section.get('shortcut', {})
+        offset_cord = section.get('offset_cord', {})
+        offset = section.get('offset', {})
+        return {
+            'name': name,
+            'z': float(LAYER_KEY_PATTERN.match(name).group(1)),
+            'loops': {kind: section.get(kind, []) for kind in LAYER_LOOP_KINDS},
+            'offset_cords': {edge: offset_cord.get(edge, []) for edge in LAYER_OFFSET_EDGES},
+            'offsets': {edge: offset.get(edge, []) for edge in LAYER_OFFSET_EDGES},
+            'shortcuts': {kind: shortcut.get(kind, []) for kind in LAYER_SHORTCUT_KINDS},
+            'shortcut_for_layer': shortcut.get('shortcut_for_layer', [])
+        }
         
     def load_input_data(self):
-        """input.json 파일을 읽어서 z6022, z4822, offset 데이터를 로드합니다."""
+        """input.json 파일을 읽어서 zNNNN 레이어들과 layer_crossover 데이터를 로드합니다."""
         try:
             with open(INPUT_FILE, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
-            # z6022 데이터 로드
-            z6022_data = data.get('z6022', {})
-            self.z6022_central_loop = z6022_data.get('central_loop', [])
-            self.z6022_local_loop = z6022_data.get('local_loop', [])
-            self.z6022_local_loop_for_layer = z6022_data.get('local_loop_for_layer', [])
-            
-            # z6022의 offset_cord 데이터 로드
-            z6022_offset_cord = z6022_data.get('offset_cord', {})
-            self.z6022_offset_cord_edge_top = z6022_offset_cord.get('edge_top', [])
-            self.z6022_offset_cord_edge_bottom = z6022_offset_cord.get('edge_bottom', [])
-            
-            # z6022의 offset 데이터 로드 
-            z6022_offset = z6022_data.get('offset', {})
-            self.z6022_offset_edge_top = z6022_offset.get('edge_top', [])
-            self.z6022_offset_edge_bottom = z6022_offset.get('edge_bottom', [])
-            
-            # z4822 데이터 로드
-            z4822_data = data.get('z4822', {})
-            self.z4822_central_loop = z4822_data.get('central_loop', [])
-            self.z4822_local_loop = z4822_data.get('local_loop', [])
-            self.z4822_local_loop_for_layer = z4822_data.get('local_loop_for_layer', [])
-            
-            # z4822의 offset_cord 데이터 로드
-            z4822_offset_cord = z4822_data.get('offset_cord', {})
-            self.z4822_offset_cord_edge_top = z4822_offset_cord.get('edge_top', [])
-            self.z4822_offset_cord_edge_bottom = z4822_offset_cord.get('edge_bottom', [])
-            
-            # z4822의 offset 데이터 로드
-            z4822_offset = z4822_data.get('offset', {})
-            self.z4822_offset_edge_top = z4822_offset.get('edge_top', [])
-            self.z4822_offset_edge_bottom = z4822_offset.get('edge_bottom', [])
-            
-            # z6022의 shortcut 데이터 로드
-            z6022_shortcut = z6022_data.get('shortcut', {})
-            self.z6022_shortcut_local_loop = z6022_shortcut.get('shortcut_local_loop', [])
-            self.z6022_shortcut_central_loop = z6022_shortcut.get('shortcut_central_loop', [])
-            
-            # z4822의 shortcut 데이터 로드
-            z4822_shortcut = z4822_data.get('shortcut', {})
-            self.z4822_shortcut_local_loop = z4822_shortcut.get('shortcut_local_loop', [])
-            self.z4822_shortcut_central_loop = z4822_shortcut.get('shortcut_central_loop', [])
-            
-            # LAYER_CONNECT_POINT 데이터 로드
-            layer_connect_point_data = data.get('layer_crossover', {})
-            self.layer_connect_points_z0_4822 = layer_connect_point_data.get('z0-4822', [])
-            self.layer_connect_points_z4822_6022 = layer_connect_point_data.get('z4822-6022', [])
+            # zNNNN 섹션은 input.json에 적힌 순서대로 레이어가 됨
+            self.layers = [self.parse_layer(name, section) for name, section in data.items() if LAYER_KEY_PATTERN.match(name)]
+            self.layer_crossovers = list(data.get('layer_crossover', {}).items())
             
             print(f"✅ {INPUT_FILE} 파일을 성공적으로 로드했습니다.")
-            print(f"📊 z6022 central_loop: {len(self.z6022_central_loop)}개")
-            print(f"📊 z6022 local_loop: {len(self.z6022_local_loop)}개")
-            print(f"📊 z6022 local_loop_for_layer: {len(self.z6022_local_loop_for_layer)}개")
-            print(f"📊 z4822 central_loop: {len(self.z4822_central_loop)}개")
-            print(f"📊 z4822 local_loop: {len(self.z4822_local_loop)}개")
-            print(f"📊 z4822 local_loop_for_layer: {len(self.z4822_local_loop_for_layer)}개")
-            print(f"📊 layer_crossover z0-4822: {len(self.layer_connect_points_z0_4822)}개")
-            print(f"📊 layer_crossover z4822-6022: {len(self.layer_connect_points_z4822_6022)}개")
-            
-            # z6022의 layer_connect_point 데이터 로드
-            z6022_shortcut = z6022_data.get('shortcut', {})
-            self.z6022_connect_point_connection_points = z6022_shortcut.get('shortcut_for_layer', [])
-            
-            # z4822의 layer_connect_point 데이터 로드
-            z4822_shortcut = z4822_data.get('shortcut', {})
-            self.z4822_connect_point_connection_points = z4822_shortcut.get('shortcut_for_layer', [])
-            
-            # z6022의 pair_line_connect 데이터 로드
-            z6022_shortcut = z6022_data.get('shortcut', {})
-            self.z6022_pair_line_connect = z6022_shortcut.get('shortcut_local_loop', [])
-            
-            # z4822의 pair_line_connect 데이터 로드
-            z4822_shortcut = z4822_data.get('shortcut', {})
-            self.z4822_pair_line_connect = z4822_shortcut.get('shortcut_local_loop', [])
-            
-            print(f"✅ {INPUT_FILE} 파일을 성공적으로 로드했습니다.")
-            print(f"📊 z6022 central_loop: {len(self.z6022_central_loop)}개")
-            print(f"📊 z6022 local_loop: {len(self.z6022_local_loop)}개")
-            print(f"📊 z4822 central_loop: {len(self.z4822_central_loop)}개")
-            print(f"📊 z4822 local_loop: {len(self.z4822_local_loop)}개")
-            print(f"📊 z6022 offset_cord edge_bottom: {len(self.z6022_offset_cord_edge_bottom)}개")
-            print(f"📊 z6022 offset edge_top: {len(self.z6022_offset_edge_top)}개")
-            print(f"📊 z6022 offset edge_bottom: {len(self.z6022_offset_edge_bottom)}개")
-            print(f"📊 z4822 offset_cord edge_top: {len(self.z4822_offset_cord_edge_top)}개")
-            print(f"📊 z4822 offset_cord edge_bottom: {len(self.z4822_offset_cord_edge_bottom)}개")
-            print(f"📊 z4822 offset edge_top: {len(self.z4822_offset_edge_top)}개")
-            print(f"📊 z4822 offset edge_bottom: {len(self.z4822_offset_edge_bottom)}개")
-            print(f"📊 z6022 shortcut_local_loop: {len(self.z6022_shortcut_local_loop)}개")
-            print(f"📊 z6022 shortcut_central_loop: {len(self.z6022_shortcut_central_loop)}개")
-            print(f"📊 z6022 shortcut_for_layer: {len(self.z6022_connect_point_connection_points)}개")
-            print(f"📊 z6022 shortcut_local_loop: {len(self.z6022_pair_line_connect)}개")
-            print(f"📊 z4822 shortcut_local_loop: {len(self.z4822_shortcut_local_loop)}개")
-            print(f"📊 z4822 shortcut_central_loop: {len(self.z4822_shortcut_central_loop)}개")
-            print(f"📊 z4822 shortcut_for_layer: {len(self.z4822_connect_point_connection_points)}개")
-            print(f"📊 z4822 shortcut_local_loop: {len(self.z4822_pair_line_connect)}개")
+            print(f"📊 레이어: {', '.join(layer['name'] for layer in self.layers) or '없음'}")
+            for layer in self.layers:
+                name = layer['name']
+                for kind, loops in layer['loops'].items():
+                    print(f"📊 {name} {kind}: {len(loops)}개")
+                for edge in LAYER_OFFSET_EDGES:
+                    print(f"📊 {name} offset_cord {edge}: {len(layer['offset_cords'][edge])}개")
+                    print(f"📊 {name} offset {edge}: {len(layer['offsets'][edge])}개")
+                for kind, points in layer['shortcuts'].items():
+                    print(f"📊 {name} {kind}: {len(points)}개")
+                print(f"📊 {name} shortcut_for_layer: {len(layer['shortcut_for_layer'])}개")
+            for name, connections in self.layer_crossovers:
+                print(f"📊 layer_crossover {name}: {len(connections)}개")
             return True
             
         except Exception as e:
@@ -164,54 +192,13 @@ class InputGenerator:
     
     def generate_addresses_on_line(self, start_point: List[float], end_point: List[float], z_value: int) -> List[Dict]:
         """직선 위에 RANDOM_INTERVAL 간격으로 addresses를 생성합니다."""
-        addresses = []
-        
-        x1, y1 = start_point[0], start_point[1]
-        x2, y2 = end_point[0], end_point[1]
-        
-        # 직선의 길이 계산
-        length = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-        
-        # 시작점 추가
-        start_address = {
-            "id": self.current_address_id,
-            "address": self.current_address_id,
-            "name": f"ADDR_{self.current_address_id}",
-            "pos": {"x": round(x1, 1), "y": round(y1, 1), "z": z_value}
-        }
-        addresses.append(start_address)
-        self.current_address_id += 1
-        
-        # 간격으로 포인트 생성
-        current_pos = 0
-        while current_pos < length:
-            interval = random.choice(RANDOM_INTERVAL)
-            current_pos += interval
-            
-            if current_pos < length:  # 끝점 제외
-                ratio = current_pos / length
-                x = x1 + ratio * (x2 - x1)
-                y = y1 + ratio * (y2 - y1)
-                
-                address = {
-                    "id": self.current_address_id,
-                    "address": self.current_address_id,
-                    "name": f"ADDR_{self.current_address_id}",
-                    "pos": {"x": round(x, 1), "y": round(y, 1), "z": z_value}
-                }
-                addresses.append(address)
-                self.current_address_id += 1
-        
-        # 끝점 추가
-        end_address = {
-            "id": self.current_address_id,
-            "address": self.current_address_id,
-            "name": f"ADDR_{self.current_address_id}",
-            "pos": {"x": round(x2, 1), "y": round(y2, 1), "z": z_value}
-        }
-        addresses.append(end_address)
-        self.current_address_id += 1
-        
+        xs, ys = sample_rail_points(start_point, end_point, self.rng)
+        return self.make_address_records(xs, ys, z_value)
+    
+    def make_address_records(self, xs, ys, z_value) -> List[Dict]:
+        """좌표 배열을 address dict 목록으로 변환하고 ID를 순서대로 할당합니다."""
+        addresses = address_records(self.current_address_id, xs, ys, z_value)
+        self.current_address_id += len(addresses)
         return addresses
     
     def generate_addresses_from_offset(self, base_coords: List[List[float]], offsets: List[List[float]], z_value: int) -> List[Dict]:
@@ -249,237 +236,95 @@ class InputGenerator:
     
     def generate_lines_from_addresses(self, addresses: List[Dict]) -> List[Dict]:
         """addresses를 순차적으로 연결하는 lines를 생성합니다."""
-        lines = []
-        
         if len(addresses) < 2:
-            return lines
-        
-        for i in range(len(addresses) - 1):
-            current_addr = addresses[i]
-            next_addr = addresses[i + 1]
-            
-            line = {
-                "id": self.current_line_id,
-                "name": f"LINE_{current_addr['id']}_{next_addr['id']}",
-                "fromAddress": current_addr['id'],
-                "toAddress": next_addr['id'],
-                "fromPos": current_addr['pos'],
-                "toPos": next_addr['pos'],
-                "curve": False
-            }
-            lines.append(line)
-            self.current_line_id += 1
-        
+            return []
+        lines = chain_line_records(addresses, self.current_line_id)
+        self.current_line_id += len(lines)
         return lines
     
-    def process_z6022_data(self):
-        """z6022 데이터 처리"""
-        print("📊 z6022 데이터 처리 중...")
-        
-        # InterBay 처리
-        for line in self.z6022_central_loop:
-            if len(line) == 2:
-                addresses = self.generate_addresses_on_line(line[0], line[1], 6022.0)
-                self.addresses.extend(addresses)
-                
-                if len(addresses) > 1:
-                    lines = self.generate_lines_from_addresses(addresses)
-                    self.lines.extend(lines)
-        
-        # IntraBay 처리
-        for line in self.z6022_local_loop:
-            if len(line) == 2:
-                addresses = self.generate_addresses_on_line(line[0], line[1], 6022.0)
-                self.addresses.extend(addresses)
-                
-                if len(addresses) > 1:
-                    lines = self.generate_lines_from_addresses(addresses)
-                    self.lines.extend(lines)
-        
-        # local_loop_for_layer 처리
-        if hasattr(self, 'z6022_local_loop_for_layer') and self.z6022_local_loop_for_layer:
-            print(f"   📍 z6022 local_loop_for_layer: {len(self.z6022_local_loop_for_layer)}개")
-            for line in self.z6022_local_loop_for_layer:
-                if len(line) == 2:
-                    addresses = self.generate_addresses_on_line(line[0], line[1], 6022.0)
-                    self.addresses.extend(addresses)
-                    
-                    if len(addresses) > 1:
-                        lines = self.generate_lines_from_addresses(addresses)
-                        self.lines.extend(lines)
-            print(f"         local_loop_for_layer 생성된 addresses: {len(self.z6022_local_loop_for_layer)}개")
-    
-    def process_z4822_data(self):
-        """z4822 데이터 처리"""
-        print("📊 z4822 데이터 처리 중...")
-        
-        # InterBay 처리
-        for line in self.z4822_central_loop:
-            if len(line) == 2:
-                addresses = self.generate_addresses_on_line(line[0], line[1], 4822.0)
-                self.addresses.extend(addresses)
-                
-                if len(addresses) > 1:
-                    lines = self.generate_lines_from_addresses(addresses)
-                    self.lines.extend(lines)
-        
-        # IntraBay 처리
-        for line in self.z4822_local_loop:
-            if len(line) == 2:
-                addresses = self.generate_addresses_on_line(line[0], line[1], 4822.0)
-                self.addresses.extend(addresses)
-                
-                if len(addresses) > 1:
-                    lines = self.generate_lines_from_addresses(addresses)
-                    self.lines.extend(lines)
-        
-        # local_loop_for_layer 처리
-        if hasattr(self, 'z4822_local_loop_for_layer') and self.z4822_local_loop_for_layer:
-            print(f"   📍 z4822 local_loop_for_layer: {len(self.z4822_local_loop_for_layer)}개")
-            for line in self.z4822_local_loop_for_layer:
-                if len(line) == 2:
-                    addresses = self.generate_addresses_on_line(line[0], line[1], 4822.0)
-                    self.addresses.extend(addresses)
-                    
-                    if len(addresses) > 1:
-                        lines = self.generate_lines_from_addresses(addresses)
-                        self.lines.extend(lines)
-            print(f"         local_loop_for_layer 생성된 addresses: {len(self.z4822_local_loop_for_layer)}개")
+    def record_fragment(self, kind: str, section: str, element, addresses: List[Dict], lines: List[Dict]):
+        """input 요소 하나에서 생성된 addresses / lines를 조각으로 기록하고, rail / shortcut이면 투영 대상으로 등록합니다."""
+        self.fragments.append({'kind': kind, 'section': section, 'element': element, 'addresses': addresses, 'lines': lines})
+        if kind == 'rail':
+            for line in lines:
+                self.line_rails[line['id']] = self.rail_count
+            self.rail_count += 1
+        elif kind == 'shortcut':
+            self.shortcut_address_ids.extend(addr['id'] for addr in addresses)
     
-    def process_offset_data(self):
-        """offset 데이터 처리 - z6022와 z4822의 각 offset_cord를 시작점으로 하여 offset을 적용한 addresses와 lines 생성"""
-        print("📊 offset 데이터 처리 중...")
-        
-        # z6022 offset 데이터 처리
-        print("   📍 z6022 offset 데이터 처리:")
-        
-        # z6022 edge_top 처리
-        if self.z6022_offset_cord_edge_top and self.z6022_offset_edge_top:
-            print(f"      📍 edge_top: {len(self.z6022_offset_cord_edge_top)}개 시작점, {len(self.z6022_offset_edge_top)}개 offset")
-            
-            for i, base_coord in enumerate(self.z6022_offset_cord_edge_top):
-                # 2차원 좌표 처리 (모든 좌표가 2차원으로 변경됨)
-                base_x, base_y = base_coord
-                print(f"         시작점 {i+1}: [{base_x}, {base_y}]")
-                
-                # 이 시작점에 모든 offset을 적용하여 addresses 생성
-                addresses_for_this_base = []
-                
-                for j, offset in enumerate(self.z6022_offset_edge_top):
-                    # 2차원 offset 처리 (모든 offset이 2차원으로 변경됨)
-                    if len(offset) == 2:
-                        offset_x, offset_y = offset
-                    else:
-                        # 1차원 offset인 경우 y=0으로 처리
-                        offset_x = offset[0]
-                        offset_y = 0.0
-                    
-                    # offset 적용
-                    final_x = base_x + offset_x
-                    final_y = base_y + offset_y
-                    final_z = 6022.0  # z6022 레벨 고정
-                    
-                    address = {
-                        "id": self.current_address_id,
-                        "address": self.current_address_id,
-                        "name": f"ADDR_{self.current_address_id}",
-                        "pos": {"x": round(final_x, 1), "y": round(final_y, 1), "z": final_z}
-                    }
-                    addresses_for_this_base.append(address)
-                    self.current_address_id += 1
-                
-                # 이 시작점에서 생성된 addresses를 전체 addresses에 추가
-                self.addresses.extend(addresses_for_this_base)
-                
-                # 이 시작점의 addresses를 순차적으로 연결하는 lines 생성
-                if len(addresses_for_this_base) > 1:
-                    lines_for_this_base = self.generate_lines_from_addresses(addresses_for_this_base)
-                    self.lines.extend(lines_for_this_base)
-                    print(f"            생성된 addresses: {len(addresses_for_this_base)}개, lines: {len(lines_for_this_base)}개")
-        
-        # z6022 edge_bottom 처리
-        if self.z6022_offset_cord_edge_bottom and self.z6022_offset_edge_bottom:
-            print(f"      📍 edge_bottom: {len(self.z6022_offset_cord_edge_bottom)}개 시작점, {len(self.z6022_offset_edge_bottom)}개 offset")
-            
-            for i, base_coord in enumerate(self.z6022_offset_cord_edge_bottom):
-                # 2차원 좌표 처리 (모든 좌표가 2차원으로 변경됨)
-                base_x, base_y = base_coord
-                print(f"         시작점 {i+1}: [{base_x}, {base_y}]")
-                
-                # 이 시작점에 모든 offset을 적용하여 addresses 생성
-                addresses_for_this_base = []
-                
-                for j, offset in enumerate(self.z6022_offset_edge_bottom):
-                    # 2차원 offset 처리 (모든 offset이 2차원으로 변경됨)
-                    if len(offset) == 2:
-                        offset_x, offset_y = offset
-                    else:
-                        # 1차원 offset인 경우 y=0으로 처리
-                        offset_x = offset[0]
-                        offset_y = 0.0
-                    
-                    # offset 적용
-                    final_x = base_x + offset_x
-                    final_y = base_y + offset_y
-                    final_z = 6022.0  # z6022 레벨 고정
-                    
-                    address = {
-                        "id": self.current_address_id,
-                        "address": self.current_address_id,
-                        "name": f"ADDR_{self.current_address_id}",
-                        "pos": {"x": round(final_x, 1), "y": round(final_y, 1), "z": final_z}
-                    }
-                    addresses_for_this_base.append(address)
-                    self.current_address_id += 1
-                
-                # 이 시작점에서 생성된 addresses를 전체 addresses에 추가
-                self.addresses.extend(addresses_for_this_base)
-                
-                # 이 시작점의 addresses를 순차적으로 연결하는 lines 생성
-                if len(addresses_for_this_base) > 1:
-                    lines_for_this_base = self.generate_lines_from_addresses(addresses_for_this_base)
-                    self.lines.extend(lines_for_this_base)
-                    print(f"            생성된 addresses: {len(addresses_for_this_base)}개, lines: {len(lines_for_this_base)}개")
-        
-        # z4822 offset 데이터 처리
-        print("   📍 z4822 offset 데이터 처리:")
+    def loop_groups(self) -> List[Tuple[Dict, str, List]]:
+        """모든 레이어의 (레이어, loop 종류, rail 목록) 그룹을 처리 순서대로 반환합니다."""
+        return [
+            (layer, kind, layer['loops'][kind])
+            for layer in self.layers for kind in LAYER_LOOP_KINDS if layer['loops'][kind]
+        ]
+    
+    def process_layer_loops(self):
+        """모든 레이어의 loop rail들 위에 addresses와 lines를 생성합니다.
+
+        1) 그룹마다 rail 좌표를 구하고 (병렬), 2) 그룹 순서대로 address / line 수만큼 ID 구간을 예약한 뒤,
+        3) 각 그룹이 자기 구간의 ID로 dict를 만들고 (병렬) 그룹 순서대로 합칩니다.
+        ID는 순차 생성과 같은 순서로 빈틈없이 할당되고, 같은 시드면 worker 수와 무관하게 같은 결과가 나옵니다.
+        """
+        groups = self.loop_groups()
+        if not groups:
+            return
+        seed_keys = [[self.seed, index] for index in range(len(groups))]
+        loops = [group[2] for group in groups]
+        workers = min(self.workers, len(groups))
+        print(f"📊 loop 데이터 처리 중... ({len(groups)}개 그룹, workers: {workers})")
+        
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            run = executor.map if executor else map
+            sampled = list(run(sample_loop_group, loops, seed_keys))
+            
+            # 그룹 순서대로 ID 구간 예약
+            address_starts = []
+            line_starts = []
+            for rails in sampled:
+                address_starts.append(self.current_address_id)
+                line_starts.append(self.current_line_id)
+                self.current_address_id += sum(len(xs) for xs, _ in rails)
+                self.current_line_id += sum(len(xs) - 1 for xs, _ in rails)
+            
+            z_values = [group[0]['z'] for group in groups]
+            built = list(run(build_loop_group, sampled, z_values, address_starts, line_starts))
+        finally:
+            if executor:
+                executor.shutdown()
+        
+        for (layer, kind, group_loops), rails, (addresses, lines) in zip(groups, sampled, built):
+            self.addresses.extend(addresses)
+            self.lines.extend(lines)
+            # 각 rail의 address / line은 연속된 구간이므로 순서대로 잘라 rail 조각으로 기록
+            address_start = line_start = 0
+            rail_loops = [line for line in group_loops if len(line) == 2]
+            for rail, (xs, _) in zip(rail_loops, rails):
+                self.record_fragment('rail', f"{layer['name']}.{kind}", rail,
+                                     addresses[address_start:address_start + len(xs)],
+                                     lines[line_start:line_start + len(xs) - 1])
+                address_start += len(xs)
+                line_start += len(xs) - 1
+            print(f"   📍 {layer['name']} {kind}: {len(group_loops)}개, 생성된 addresses: {len(addresses)}개, lines: {len(lines)}개")
+    
+    def process_layer_offsets(self, layer: Dict):
+        """레이어의 각 offset_cord를 시작점으로 하여 offset을 적용한 addresses와 lines를 생성합니다."""
+        name, z_value = layer['name'], layer['z']
+        print(f"   📍 {name} offset 데이터 처리:")
         
-        # z4822 edge_top 처리
-        if self.z4822_offset_cord_edge_top and self.z4822_offset_edge_top:
-            print(f"      📍 edge_top: {len(self.z4822_offset_cord_edge_top)}개 시작점, {len(self.z4822_offset_edge_top)}개 offset")
+        for edge in LAYER_OFFSET_EDGES:
+            base_coords = layer['offset_cords'][edge]
+            offsets = layer['offsets'][edge]
+            if not (base_coords and offsets):
+                continue
+            print(f"      📍 {edge}: {len(base_coords)}개 시작점, {len(offsets)}개 offset")
             
-            for i, base_coord in enumerate(self.z4822_offset_cord_edge_top):
-                # 2차원 좌표 처리 (모든 좌표가 2차원으로 변경됨)
-                base_x, base_y = base_coord
-                print(f"         시작점 {i+1}: [{base_x}, {base_y}]")
+            for i, base_coord in enumerate(base_coords):
+                print(f"         시작점 {i+1}: [{base_coord[0]}, {base_coord[1]}]")
                 
                 # 이 시작점에 모든 offset을 적용하여 addresses 생성
-                addresses_for_this_base = []
-                
-                for j, offset in enumerate(self.z4822_offset_edge_top):
-                    # 2차원 offset 처리 (모든 offset이 2차원으로 변경됨)
-                    if len(offset) == 2:
-                        offset_x, offset_y = offset
-                    else:
-                        # 1차원 offset인 경우 y=0으로 처리
-                        offset_x = offset[0]
-                        offset_y = 0.0
-                    
-                    # offset 적용
-                    final_x = base_x + offset_x
-                    final_y = base_y + offset_y
-                    final_z = 4822.0  # z4822 레벨 고정
-                    
-                    address = {
-                        "id": self.current_address_id,
-                        "address": self.current_address_id,
-                        "name": f"ADDR_{self.current_address_id}",
-                        "pos": {"x": round(final_x, 1), "y": round(final_y, 1), "z": final_z}
-                    }
-                    addresses_for_this_base.append(address)
-                    self.current_address_id += 1
-                
-                # 이 시작점에서 생성된 addresses를 전체 addresses에 추가
+                addresses_for_this_base = self.generate_addresses_from_offset([base_coord], offsets, z_value)
                 self.addresses.extend(addresses_for_this_base)
                 
                 # 이 시작점의 addresses를 순차적으로 연결하는 lines 생성
@@ -487,310 +332,107 @@ class InputGenerator:
                     lines_for_this_base = self.generate_lines_from_addresses(addresses_for_this_base)
                     self.lines.extend(lines_for_this_base)
                     print(f"            생성된 addresses: {len(addresses_for_this_base)}개, lines: {len(lines_for_this_base)}개")
-        
-        # z4822 edge_bottom 처리
-        if self.z4822_offset_cord_edge_bottom and self.z4822_offset_edge_bottom:
-            print(f"      📍 edge_bottom: {len(self.z4822_offset_cord_edge_bottom)}개 시작점, {len(self.z4822_offset_edge_bottom)}개 offset")
+    
+    def process_offset_data(self):
+        """offset 데이터 처리 - 모든 레이어의 offset_cord에 offset을 적용한 addresses와 lines 생성"""
+        print("📊 offset 데이터 처리 중...")
+        for layer in self.layers:
+            self.process_layer_offsets(layer)
+    
+    def add_point_addresses(self, points: List[List[float]], z_value: float, verbose: bool = False) -> int:
+        """2D/3D 좌표 목록을 그대로 addresses에 추가합니다. (2D 좌표는 레이어 높이 사용)"""
+        for i, point in enumerate(points):
+            if len(point) == 2:  # 2D 좌표
+                x, y = point
+                z = z_value
+            else:  # 3D 좌표
+                x, y, z = point[0], point[1], point[2]
+            
+            if verbose:
+                print(f"      포인트 {i+1}: [{x}, {y}, {z}]")
             
-            for i, base_coord in enumerate(self.z4822_offset_cord_edge_bottom):
-                # 2차원 좌표 처리 (모든 좌표가 2차원으로 변경됨)
-                base_x, base_y = base_coord
-                print(f"         시작점 {i+1}: [{base_x}, {base_y}]")
-                
-                # 이 시작점에 모든 offset을 적용하여 addresses 생성
-                addresses_for_this_base = []
-                
-                for j, offset in enumerate(self.z4822_offset_edge_bottom):
-                    # 2차원 offset 처리 (모든 offset이 2차원으로 변경됨)
-                    if len(offset) == 2:
-                        offset_x, offset_y = offset
-                    else:
-                        # 1차원 offset인 경우 y=0으로 처리
-                        offset_x = offset[0]
-                        offset_y = 0.0
-                    
-                    # offset 적용
-                    final_x = base_x + offset_x
-                    final_y = base_y + offset_y
-                    final_z = 4822.0  # z4822 레벨 고정
-                    
-                    address = {
-                        "id": self.current_address_id,
-                        "address": self.current_address_id,
-                        "name": f"ADDR_{self.current_address_id}",
-                        "pos": {"x": round(final_x, 1), "y": round(final_y, 1), "z": final_z}
-                    }
-                    addresses_for_this_base.append(address)
-                    self.current_address_id += 1
-                
-                # 이 시작점에서 생성된 addresses를 전체 addresses에 추가
-                self.addresses.extend(addresses_for_this_base)
-                
-                # 이 시작점의 addresses를 순차적으로 연결하는 lines 생성
-                if len(addresses_for_this_base) > 1:
-                    lines_for_this_base = self.generate_lines_from_addresses(addresses_for_this_base)
-                    self.lines.extend(lines_for_this_base)
-                    print(f"            생성된 addresses: {len(addresses_for_this_base)}개, lines: {len(lines_for_this_base)}개")
+            address = {
+                "id": self.current_address_id,
+                "address": self.current_address_id,
+                "name": f"ADDR_{self.current_address_id}",
+                "pos": {"x": round(x, 1), "y": round(y, 1), "z": z}
+            }
+            self.addresses.append(address)
+            self.current_address_id += 1
+        return len(points)
     
     def process_shortcut_data(self):
-        """shortcut 데이터 처리 - 모든 좌표를 addresses에 추가"""
+        """shortcut 데이터 처리 - 모든 레이어의 shortcut 좌표를 addresses에 추가"""
         print("📊 shortcut 데이터 처리 중...")
         
-        # z6022 shortcut_local_loop 처리
-        if self.z6022_shortcut_local_loop:
-            print(f"   📍 z6022 shortcut_local_loop: {len(self.z6022_shortcut_local_loop)}개")
-            
-            for i, point in enumerate(self.z6022_shortcut_local_loop):
-                # 2D/3D 좌표 처리
-                if len(point) == 2:  # 2D 좌표
-                    x, y = point
-                    z = 6022.0
-                else:  # 3D 좌표
-                    x, y, z = point[0], point[1], point[2]
-                
-                print(f"      포인트 {i+1}: [{x}, {y}, {z}]")
-                
-                address = {
-                    "id": self.current_address_id,
-                    "address": self.current_address_id,
-                    "name": f"ADDR_{self.current_address_id}",
-                    "pos": {"x": round(x, 1), "y": round(y, 1), "z": z}
-                }
-                self.addresses.append(address)
-                self.current_address_id += 1
-            
-            print(f"         생성된 addresses: {len(self.z6022_shortcut_local_loop)}개")
-        
-        # z6022 shortcut_central_loop 처리
-        if self.z6022_shortcut_central_loop:
-            print(f"   📍 z6022 shortcut_central_loop: {len(self.z6022_shortcut_central_loop)}개")
-            
-            for i, point in enumerate(self.z6022_shortcut_central_loop):
-                # 2D/3D 좌표 처리
-                if len(point) == 2:  # 2D 좌표
-                    x, y = point
-                    z = 6022.0
-                else:  # 3D 좌표
-                    x, y, z = point[0], point[1], point[2]
-                
-                print(f"      포인트 {i+1}: [{x}, {y}, {z}]")
-                
-                address = {
-                    "id": self.current_address_id,
-                    "address": self.current_address_id,
-                    "name": f"ADDR_{self.current_address_id}",
-                    "pos": {"x": round(x, 1), "y": round(y, 1), "z": z}
-                }
-                self.addresses.append(address)
-                self.current_address_id += 1
-            
-            print(f"         생성된 addresses: {len(self.z6022_shortcut_central_loop)}개")
-        
-        # z4822 shortcut_local_loop 처리
-        if self.z4822_shortcut_local_loop:
-            print(f"   📍 z4822 shortcut_local_loop: {len(self.z4822_shortcut_local_loop)}개")
-            
-            for i, point in enumerate(self.z4822_shortcut_local_loop):
-                # 2D/3D 좌표 처리
-                if len(point) == 2:  # 2D 좌표
-                    x, y = point
-                    z = 4822.0
-                else:  # 3D 좌표
-                    x, y, z = point[0], point[1], point[2]
-                
-                print(f"      포인트 {i+1}: [{x}, {y}, {z}]")
-                
-                address = {
-                    "id": self.current_address_id,
-                    "address": self.current_address_id,
-                    "name": f"ADDR_{self.current_address_id}",
-                    "pos": {"x": round(x, 1), "y": round(y, 1), "z": z}
-                }
-                self.addresses.append(address)
-                self.current_address_id += 1
-            
-            print(f"         생성된 addresses: {len(self.z4822_shortcut_local_loop)}개")
-        
-        # z4822 shortcut_central_loop 처리
-        if self.z4822_shortcut_central_loop:
-            print(f"   📍 z4822 shortcut_central_loop: {len(self.z4822_shortcut_central_loop)}개")
-            
-            for i, point in enumerate(self.z4822_shortcut_central_loop):
-                # 2D/3D 좌표 처리
-                if len(point) == 2:  # 2D 좌표
-                    x, y = point
-                    z = 4822.0
-                else:  # 3D 좌표
-                    x, y, z = point[0], point[1], point[2]
-                
-                print(f"      포인트 {i+1}: [{x}, {y}, {z}]")
-                
-                address = {
-                    "id": self.current_address_id,
-                    "address": self.current_address_id,
-                    "name": f"ADDR_{self.current_address_id}",
-                    "pos": {"x": round(x, 1), "y": round(y, 1), "z": z}
-                }
-                self.addresses.append(address)
-                self.current_address_id += 1
-            
-            print(f"         생성된 addresses: {len(self.z4822_shortcut_central_loop)}개")
+        for layer in self.layers:
+            for kind in LAYER_SHORTCUT_KINDS:
+                points = layer['shortcuts'][kind]
+                if points:
+                    print(f"   📍 {layer['name']} {kind}: {len(points)}개")
+                    created = self.add_point_addresses(points, layer['z'], verbose=True)
+                    for point, address in zip(points, self.addresses[-created:]):
+                        self.record_fragment('shortcut', f"{layer['name']}.shortcut.{kind}", point, [address], [])
+                    print(f"         생성된 addresses: {created}개")
     
     def process_shortcut_for_layer_data(self):
-        """shortcut_for_layer 데이터 처리 - 모든 좌표를 addresses에 추가"""
+        """shortcut_for_layer 데이터 처리 - 모든 레이어의 좌표를 addresses에 추가"""
         print("📊 shortcut_for_layer 데이터 처리 중...")
         
-        # z6022 shortcut_for_layer 처리
-        if self.z6022_connect_point_connection_points:
-            print(f"   📍 z6022 shortcut_for_layer: {len(self.z6022_connect_point_connection_points)}개")
-            
-            for i, point in enumerate(self.z6022_connect_point_connection_points):
-                # 2차원 좌표 처리
-                if len(point) == 2:
-                    x, y = point
-                    z = 6022.0
-                else:
-                    x, y, z = point[0], point[1], point[2]
-                
-                address = {
-                    "id": self.current_address_id,
-                    "address": self.current_address_id,
-                    "name": f"ADDR_{self.current_address_id}",
-                    "pos": {"x": round(x, 1), "y": round(y, 1), "z": z}
-                }
-                self.addresses.append(address)
-                self.current_address_id += 1
-            
-            print(f"         생성된 addresses: {len(self.z6022_connect_point_connection_points)}개")
-        
-        # z4822 shortcut_for_layer 처리
-        if self.z4822_connect_point_connection_points:
-            print(f"   📍 z4822 shortcut_for_layer: {len(self.z4822_connect_point_connection_points)}개")
-            
-            for i, point in enumerate(self.z4822_connect_point_connection_points):
-                # 2차원 좌표 처리
-                if len(point) == 2:
-                    x, y = point
-                    z = 4822.0
-                else:
-                    x, y, z = point[0], point[1], point[2]
-                
-                address = {
-                    "id": self.current_address_id,
-                    "address": self.current_address_id,
-                    "name": f"ADDR_{self.current_address_id}",
-                    "pos": {"x": round(x, 1), "y": round(y, 1), "z": z}
-                }
-                self.addresses.append(address)
-                self.current_address_id += 1
-            
-            print(f"         생성된 addresses: {len(self.z4822_connect_point_connection_points)}개")
-    
+        for layer in self.layers:
+            points = layer['shortcut_for_layer']
+            if points:
+                print(f"   📍 {layer['name']} shortcut_for_layer: {len(points)}개")
+                created = self.add_point_addresses(points, layer['z'])
+                for point, address in zip(points, self.addresses[-created:]):
+                    self.record_fragment('shortcut', f"{layer['name']}.shortcut.shortcut_for_layer", point, [address], [])
+                print(f"         생성된 addresses: {created}개")
     
+    def add_crossover_connection(self, connection: List) -> Tuple[List[Dict], List[Dict]]:
+        """layer_crossover 연결 하나([시작점, 끝점], 3차원 좌표)의 addresses 2개와 연결선을 추가합니다."""
+        if not (len(connection) == 2 and len(connection[0]) == 3 and len(connection[1]) == 3):
+            return [], []
+        start_point = connection[0]
+        end_point = connection[1]
+        
+        # 시작점 / 끝점 주소 생성
+        start_id = self.current_address_id
+        end_id = start_id + 1
+        self.add_point_addresses([start_point, end_point], start_point[2])
+        
+        # 연결선 생성
+        line = {
+            "id": self.current_line_id,
+            "name": f"LINE_{self.current_line_id}",
+            "fromAddress": start_id,
+            "toAddress": end_id,
+            "fromPos": {"x": round(start_point[0], 1), "y": round(start_point[1], 1), "z": start_point[2]},
+            "toPos": {"x": round(end_point[0], 1), "y": round(end_point[1], 1), "z": end_point[2]}
+        }
+        self.lines.append(line)
+        self.current_line_id += 1
+        return self.addresses[-2:], [line]
     
     def process_layer_crossover_data(self):
         """layer_crossover 데이터를 처리하여 addresses와 lines를 생성합니다."""
         print("\n🔗 layer_crossover 데이터 처리 중...")
         
-        if self.layer_connect_points_z0_4822:
-            print(f"   📍 z0-4822 연결점: {len(self.layer_connect_points_z0_4822)}개")
-            
-            for i, connection in enumerate(self.layer_connect_points_z0_4822):
-                # 3차원 좌표 처리
-                if len(connection) == 2 and len(connection[0]) == 3 and len(connection[1]) == 3:
-                    start_point = connection[0]
-                    end_point = connection[1]
-                    
-                    # 시작점 주소 생성
-                    start_address = {
-                        "id": self.current_address_id,
-                        "address": self.current_address_id,
-                        "name": f"ADDR_{self.current_address_id}",
-                        "pos": {"x": round(start_point[0], 1), "y": round(start_point[1], 1), "z": start_point[2]}
-                    }
-                    self.addresses.append(start_address)
-                    start_id = self.current_address_id
-                    self.current_address_id += 1
-                    
-                    # 끝점 주소 생성
-                    end_address = {
-                        "id": self.current_address_id,
-                        "address": self.current_address_id,
-                        "name": f"ADDR_{self.current_address_id}",
-                        "pos": {"x": round(end_point[0], 1), "y": round(end_point[1], 1), "z": end_point[2]}
-                    }
-                    self.addresses.append(end_address)
-                    end_id = self.current_address_id
-                    self.current_address_id += 1
-                    
-                    # 연결선 생성
-                    line = {
-                        "id": self.current_line_id,
-                        "name": f"LINE_{self.current_line_id}",
-                        "fromAddress": start_id,
-                        "toAddress": end_id,
-                        "fromPos": {"x": round(start_point[0], 1), "y": round(start_point[1], 1), "z": start_point[2]},
-                        "toPos": {"x": round(end_point[0], 1), "y": round(end_point[1], 1), "z": end_point[2]}
-                    }
-                    self.lines.append(line)
-                    self.current_line_id += 1
-                    
-                    if (i + 1) % 10 == 0:
-                        print(f"      {i + 1}/{len(self.layer_connect_points_z0_4822)} 처리 완료")
-            
-            print(f"         z0-4822 생성된 주소: {len(self.layer_connect_points_z0_4822) * 2}개")
-            print(f"         z0-4822 생성된 연결선: {len(self.layer_connect_points_z0_4822)}개")
-        
-        if self.layer_connect_points_z4822_6022:
-            print(f"   📍 z4822-6022 연결점: {len(self.layer_connect_points_z4822_6022)}개")
+        total_connections = 0
+        for name, connections in self.layer_crossovers:
+            if not connections:
+                continue
+            print(f"   📍 {name} 연결점: {len(connections)}개")
             
-            for i, connection in enumerate(self.layer_connect_points_z4822_6022):
-                # 3차원 좌표 처리
-                if len(connection) == 2 and len(connection[0]) == 3 and len(connection[1]) == 3:
-                    start_point = connection[0]
-                    end_point = connection[1]
-                    
-                    # 시작점 주소 생성
-                    start_address = {
-                        "id": self.current_address_id,
-                        "address": self.current_address_id,
-                        "name": f"ADDR_{self.current_address_id}",
-                        "pos": {"x": round(start_point[0], 1), "y": round(start_point[1], 1), "z": start_point[2]}
-                    }
-                    self.addresses.append(start_address)
-                    start_id = self.current_address_id
-                    self.current_address_id += 1
-                    
-                    # 끝점 주소 생성
-                    end_address = {
-                        "id": self.current_address_id,
-                        "address": self.current_address_id,
-                        "name": f"ADDR_{self.current_address_id}",
-                        "pos": {"x": round(end_point[0], 1), "y": round(end_point[1], 1), "z": end_point[2]}
-                    }
-                    self.addresses.append(end_address)
-                    end_id = self.current_address_id
-                    self.current_address_id += 1
-                    
-                    # 연결선 생성
-                    line = {
-                        "id": self.current_line_id,
-                        "name": f"LINE_{self.current_line_id}",
-                        "fromAddress": start_id,
-                        "toAddress": end_id,
-                        "fromPos": {"x": round(start_point[0], 1), "y": round(start_point[1], 1), "z": start_point[2]},
-                        "toPos": {"x": round(end_point[0], 1), "y": round(end_point[1], 1), "z": end_point[2]}
-                    }
-                    self.lines.append(line)
-                    self.current_line_id += 1
-                    
-                    if (i + 1) % 10 == 0:
-                        print(f"      {i + 1}/{len(self.layer_connect_points_z4822_6022)} 처리 완료")
+            for i, connection in enumerate(connections):
+                addresses, lines = self.add_crossover_connection(connection)
+                self.record_fragment('crossover', f"layer_crossover.{name}", connection, addresses, lines)
+                if lines and (i + 1) % 10 == 0:
+                    print(f"      {i + 1}/{len(connections)} 처리 완료")
             
-            print(f"         z4822-6022 생성된 주소: {len(self.layer_connect_points_z4822_6022) * 2}개")
-            print(f"         z4822-6022 생성된 연결선: {len(self.layer_connect_points_z4822_6022)}개")
+            print(f"         {name} 생성된 주소: {len(connections) * 2}개")
+            print(f"         {name} 생성된 연결선: {len(connections)}개")
+            total_connections += len(connections)
         
-        total_connections = len(self.layer_connect_points_z0_4822) + len(self.layer_connect_points_z4822_6022)
         if total_connections > 0:
             print(f"✅ layer_crossover 데이터 처리 완료:")
             print(f"   총 연결점: {total_connections}개")
@@ -806,11 +448,8 @@ class InputGenerator:
         # layer_crossover 데이터 처리 (가장 먼저 실행)
         self.process_layer_crossover_data()
         
-        # z6022 데이터 처리
-        self.process_z6022_data()
-        
-        # z4822 데이터 처리
-        self.process_z4822_data()
+        # 레이어별 loop 처리 (input.json 순서, 그룹 단위 병렬 가능)
+        self.process_layer_loops()
         
         # shortcut_for_layer 데이터 처리
         self.process_shortcut_for_layer_data()
@@ -818,10 +457,372 @@ class InputGenerator:
         # 모든 shortcut 데이터 처리 (local_loop + central_loop)
         self.process_shortcut_data()
         
+        self.finish_generation()
+    
+    def input_elements(self) -> List[Tuple[str, str, object, Optional[Dict]]]:
+        """input 요소 (조각 종류, 섹션 이름, 요소, 레이어) 목록을 전체 생성과 같은 순서로 반환합니다."""
+        elements = [
+            ('crossover', f"layer_crossover.{name}", connection, None)
+            for name, connections in self.layer_crossovers for connection in connections
+        ]
+        for layer, kind, loops in self.loop_groups():
+            elements.extend(('rail', f"{layer['name']}.{kind}", rail, layer) for rail in loops if len(rail) == 2)
+        for layer in self.layers:
+            elements.extend(('shortcut', f"{layer['name']}.shortcut.shortcut_for_layer", point, layer)
+                            for point in layer['shortcut_for_layer'])
+        for layer in self.layers:
+            for kind in LAYER_SHORTCUT_KINDS:
+                elements.extend(('shortcut', f"{layer['name']}.shortcut.{kind}", point, layer)
+                                for point in layer['shortcuts'][kind])
+        return elements
+    
+    def generate_element(self, kind: str, section: str, element, layer: Optional[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """input 요소 하나의 addresses / lines를 새 ID로 생성하여 추가합니다. (rail은 요소 내용으로 만든 시드 사용)"""
+        if kind == 'crossover':
+            return self.add_crossover_connection(element)
+        if kind == 'rail':
+            rng = np.random.default_rng([self.seed, element_seed(element_key(section, element))])
+            xs, ys = sample_rail_points(element[0], element[1], rng)
+            addresses = self.make_address_records(xs, ys, layer['z'])
+            lines = self.generate_lines_from_addresses(addresses)
+            self.addresses.extend(addresses)
+            self.lines.extend(lines)
+            return addresses, lines
+        created = self.add_point_addresses([element], layer['z'])
+        return self.addresses[-created:], []
+    
+    def generate_incremental_data(self, snapshot: GenerationSnapshot):
+        """직전 스냅샷과 내용이 같은 input 요소는 조각을 그대로 재사용하고, 바뀐 요소만 새 ID로 생성합니다.
+
+        삭제된 요소의 ID는 다시 사용하지 않습니다. shortcut 투영과 같은 위치 병합은 전체에 대해 다시 실행하되,
+        직전과 같은 위치 / 같은 끝점으로 다시 생긴 address와 line에는 직전 ID를 돌려줍니다.
+        """
+        print("🚀 증분 데이터 생성을 시작합니다...")
+        elements = self.input_elements()
+        matched, self.diff_summary = match_fragments(snapshot.fragments, [(section, element) for _, section, element, _ in elements])
+        self.current_address_id = max(self.current_address_id, snapshot.next_address_id)
+        self.current_line_id = max(self.current_line_id, snapshot.next_line_id)
+        
+        for (kind, section, element, layer), fragment in zip(elements, matched):
+            if fragment:
+                addresses, lines = fragment['addresses'], fragment['lines']
+                self.addresses.extend(addresses)
+                self.lines.extend(lines)
+            else:
+                addresses, lines = self.generate_element(kind, section, element, layer)
+            self.record_fragment(kind, section, element, addresses, lines)
+        
+        totals = {key: sum(counts[key] for counts in self.diff_summary.values()) for key in ('unchanged', 'added', 'removed')}
+        print(f"📊 input 요소: 유지 {totals['unchanged']}개, 새로 생성 {totals['added']}개, 삭제 {totals['removed']}개")
+        for section, counts in self.diff_summary.items():
+            if counts['added'] or counts['removed']:
+                print(f"   📍 {section}: 유지 {counts['unchanged']}개, 새로 생성 {counts['added']}개, 삭제 {counts['removed']}개")
+        
+        self.finish_generation()
+        self.restore_derived_ids(snapshot)
+    
+    def finish_generation(self):
+        """요소별 생성 뒤의 공통 후처리(shortcut 투영, 같은 위치 병합)를 실행합니다."""
+        # 병합 단계가 line dict를 직접 고치므로 스냅샷에 저장할 원본 조각은 복사해 둠
+        for fragment in self.fragments:
+            fragment['lines'] = [dict(line) for line in fragment['lines']]
+        
+        # shortcut 점을 가까운 rail 선분 위로 투영하여 연결
+        if SHORTCUT_PROJECTION:
+            self.project_shortcut_points()
+        
+        # rail 중간에 놓인 끝점에서 rail을 나눈 뒤 같은 위치의 address 병합 (crossover 끝점과 loop 끝점 등)
+        if GENERATION_WELD:
+            self.split_rails_at_endpoints()
+            self.weld_coincident_points()
+        
         print(f"✅ 데이터 생성 완료:")
         print(f"   📍 Addresses: {len(self.addresses)}개")
         print(f"   📏 Lines: {len(self.lines)}개")
     
+    def project_shortcut_points(self, count: Optional[int] = None, max_distance: Optional[float] = None,
+                                snap_distance: Optional[float] = None) -> int:
+        """shortcut 점마다 가장 가까운 count개 rail의 선분 위로 점을 투영하여 연결 line을 만듭니다.
+
+        투영점이 선분 끝점에서 snap_distance 이내면 그 끝점에 연결하고, 아니면 선분을 투영점에서
+        나누어(a→b를 a→p→b로) 새 address를 넣습니다. rail마다 가장 가까운 선분 하나만 사용하며,
+        같은 레이어(z)의 rail만 대상으로 합니다. 연결 line이 다른 rail이나 shortcut 점을 가로지르지
+        않도록 수직 투영이 아닌 경우(rail 끝 너머), 이미 연결한 rail과 같은 쪽인 경우, 다른 shortcut
+        점을 지나는 경우는 연결하지 않고 endpoint 연결 단계에 맡깁니다. 생성된 연결 line 수를 반환합니다.
+        """
+        count = count if count is not None else SHORTCUT_PROJECTION_COUNT
+        max_distance = max_distance if max_distance is not None else SHORTCUT_PROJECTION_MAX_DISTANCE
+        snap_distance = snap_distance if snap_distance is not None else SHORTCUT_SNAP_DISTANCE
+        print(f"\n📐 shortcut 점을 rail 선분에 투영 중... (rail {count}개, 최대 거리: {max_distance})")
+        
+        rail_lines = [line for line in self.lines if line['id'] in self.line_rails]
+        if not rail_lines or not self.shortcut_address_ids:
+            print("   투영할 shortcut 점 또는 rail이 없습니다.")
+            return 0
+        
+        address_by_id = {addr['id']: addr for addr in self.addresses}
+        starts = np.array([(line['fromPos']['x'], line['fromPos']['y']) for line in rail_lines], dtype=np.float64)
+        ends = np.array([(line['toPos']['x'], line['toPos']['y']) for line in rail_lines], dtype=np.float64)
+        z_values = np.array([line['fromPos']['z'] for line in rail_lines], dtype=np.float64)
+        segment_index = SegmentIndex(starts, ends)
+        
+        # 1) shortcut 점마다 rail별 가장 가까운 선분 선택: [(shortcut ID, 선분 번호, t)]
+        projections = []
+        unmatched = 0
+        directions = ends - starts
+        lengths = np.sqrt((directions ** 2).sum(axis=1))
+        for shortcut_id in self.shortcut_address_ids:
+            pos = address_by_id[shortcut_id]['pos']
+            point = np.array([pos['x'], pos['y']])
+            segments, distances, ratios = segment_index.query(point, max_distance)
+            used_rails = set()
+            offsets = []  # 이미 연결한 투영점 방향 (shortcut 점 기준)
+            for seg, t in zip(segments.tolist(), ratios.tolist()):
+                rail = self.line_rails[rail_lines[seg]['id']]
+                if z_values[seg] != pos['z'] or rail in used_rails:
+                    continue
+                offset = starts[seg] + t * directions[seg] - point
+                # rail 끝 너머의 점(수직 투영이 아님)이나 이미 연결한 rail과 같은 쪽의 rail은 건너뜀
+                if lengths[seg] > 0 and abs(offset @ directions[seg]) > snap_distance * lengths[seg]:
+                    continue
+                if any(offset @ other >= 0 for other in offsets):
+                    continue
+                used_rails.add(rail)
+                offsets.append(offset)
+                projections.append((shortcut_id, seg, t))
+                if len(used_rails) == count:
+                    break
+            if not used_rails:
+                unmatched += 1
+        
+        # 다른 shortcut 점을 지나는 연결 line은 만들지 않음 (나란히 놓인 shortcut 점끼리는 endpoint 연결 단계에서 연결)
+        if projections:
+            shortcut_points = np.array([(address_by_id[shortcut_id]['pos']['x'], address_by_id[shortcut_id]['pos']['y'])
+                                        for shortcut_id in self.shortcut_address_ids])
+            connector_starts = np.array([(address_by_id[shortcut_id]['pos']['x'], address_by_id[shortcut_id]['pos']['y'])
+                                         for shortcut_id, _, _ in projections])
+            connector_ends = np.array([starts[seg] + t * directions[seg] for _, seg, t in projections])
+            connector_index = SegmentIndex(connector_starts, connector_ends)
+            blocked = set()
+            for shortcut_id, point in zip(self.shortcut_address_ids, shortcut_points):
+                segments, _, _ = connector_index.query(point, snap_distance)
+                blocked.update(i for i in segments.tolist() if projections[i][0] != shortcut_id)
+            projections = [projection for i, projection in enumerate(projections) if i not in blocked]
+            unmatched = len(self.shortcut_address_ids) - len({shortcut_id for shortcut_id, _, _ in projections})
+        
+        # 2) 선분별로 투영점을 t 순서로 정리하여 끝점에 붙이거나 새 address로 나눔
+        by_segment = {}
+        for shortcut_id, seg, t in projections:
+            by_segment.setdefault(seg, []).append((t, shortcut_id))
+        
+        targets = {}  # (shortcut ID, 선분 번호) -> 연결할 address
+        split_lines = {}  # 나뉜 line ID -> 새 line 목록
+        split_count = 0
+        for seg in sorted(by_segment):
+            line = rail_lines[seg]
+            start_addr = address_by_id[line['fromAddress']]
+            end_addr = address_by_id[line['toAddress']]
+            length = float(np.sqrt(((ends[seg] - starts[seg]) ** 2).sum()))
+            chain = [(0.0, start_addr)]
+            for t, shortcut_id in sorted(by_segment[seg]):
+                offset = t * length
+                if offset <= snap_distance:
+                    target = start_addr
+                elif length - offset <= snap_distance:
+                    target = end_addr
+                elif offset - chain[-1][0] <= snap_distance:
+                    target = chain[-1][1]
+                else:
+                    x, y = starts[seg] + t * (ends[seg] - starts[seg])
+                    target = address_records(self.current_address_id, [float(x)], [float(y)], line['fromPos']['z'])[0]
+                    self.current_address_id += 1
+                    self.addresses.append(target)
+                    address_by_id[target['id']] = target
+                    chain.append((offset, target))
+                    split_count += 1
+                targets[(shortcut_id, seg)] = target
+            
+            if len(chain) > 1:
+                # 첫 구간은 원래 line ID를 유지하고 나머지 구간은 current_line_id부터 새 ID 사용
+                pieces = chain_line_records([addr for _, addr in chain] + [end_addr], self.current_line_id - 1)
+                pieces[0]['id'] = line['id']
+                self.current_line_id += len(pieces) - 1
+                for piece in pieces:
+                    self.line_rails[piece['id']] = self.line_rails[line['id']]
+                split_lines[line['id']] = pieces
+        
+        if split_lines:
+            self.lines = [piece for line in self.lines for piece in split_lines.get(line['id'], [line])]
+        
+        # 3) shortcut 점 -> 투영점 연결 line 생성
+        connections = []
+        for shortcut_id, seg, _ in projections:
+            connections.append(address_by_id[shortcut_id])
+            connections.append(targets[(shortcut_id, seg)])
+        for i in range(0, len(connections), 2):
+            self.lines.extend(chain_line_records(connections[i:i + 2], self.current_line_id))
+            self.current_line_id += 1
+        
+        print(f"   투영된 shortcut 점: {len(self.shortcut_address_ids) - unmatched}개 / {len(self.shortcut_address_ids)}개")
+        print(f"   나뉜 rail 선분: {len(split_lines)}개, 새 address: {split_count}개, 연결 line: {len(projections)}개")
+        return len(projections)
+    
+    def split_rails_at_endpoints(self, tolerance: Optional[float] = None) -> int:
+        """연결 수가 1 이하인 address(crossover 끝점, rail 끝 등)가 rail 선분 중간에 놓이면 그 선분을 나눕니다.
+
+        선분 a→b를 끝점 p에서 a→p→b로 나누어 p가 rail에 이어지도록 하며, 같은 레이어(z)의 rail 선분만
+        대상으로 합니다. 선분 끝에서 tolerance 이내인 점은 병합 단계에서 합쳐지므로 나누지 않습니다.
+        나뉜 rail 선분 수를 반환합니다.
+        """
+        tolerance = tolerance if tolerance is not None else GENERATION_WELD_TOLERANCE
+        rail_lines = [line for line in self.lines if line['id'] in self.line_rails]
+        if not rail_lines:
+            return 0
+        
+        degrees = {}
+        for line in self.lines:
+            for addr_id in (line['fromAddress'], line['toAddress']):
+                degrees[addr_id] = degrees.get(addr_id, 0) + 1
+        endpoints = [addr for addr in self.addresses if degrees.get(addr['id'], 0) <= 1]
+        
+        starts = np.array([(line['fromPos']['x'], line['fromPos']['y']) for line in rail_lines], dtype=np.float64)
+        ends = np.array([(line['toPos']['x'], line['toPos']['y']) for line in rail_lines], dtype=np.float64)
+        lengths = np.sqrt(((ends - starts) ** 2).sum(axis=1))
+        segment_index = SegmentIndex(starts, ends)
+        
+        # 선분 번호 -> [(t, 끝점 address)]
+        by_segment = {}
+        for addr in endpoints:
+            pos = addr['pos']
+            segments, _, ratios = segment_index.query((pos['x'], pos['y']), tolerance)
+            for seg, t in zip(segments.tolist(), ratios.tolist()):
+                line = rail_lines[seg]
+                if line['fromPos']['z'] != pos['z'] or addr['id'] in (line['fromAddress'], line['toAddress']):
+                    continue
+                if t * lengths[seg] <= tolerance or (1.0 - t) * lengths[seg] <= tolerance:
+                    continue
+                by_segment.setdefault(seg, []).append((t, addr))
+        if not by_segment:
+            return 0
+        
+        address_by_id = {addr['id']: addr for addr in self.addresses}
+        split_lines = {}
+        for seg in sorted(by_segment):
+            line = rail_lines[seg]
+            chain = [address_by_id[line['fromAddress']]]
+            chain.extend(addr for _, addr in sorted(by_segment[seg], key=lambda item: (item[0], item[1]['id'])))
+            chain.append(address_by_id[line['toAddress']])
+            # 첫 구간은 원래 line ID를 유지하고 나머지 구간은 current_line_id부터 새 ID 사용
+            pieces = chain_line_records(chain, self.current_line_id - 1)
+            pieces[0]['id'] = line['id']
+            self.current_line_id += len(pieces) - 1
+            for piece in pieces:
+                self.line_rails[piece['id']] = self.line_rails[line['id']]
+            split_lines[line['id']] = pieces
+        self.lines = [piece for line in self.lines for piece in split_lines.get(line['id'], [line])]
+        
+        print(f"\n✂️ rail 중간의 끝점에서 선분 나누기: rail 선분 {len(split_lines)}개, 끝점 {sum(len(v) for v in by_segment.values())}개")
+        return len(split_lines)
+    
+    def weld_coincident_points(self, tolerance: Optional[float] = None) -> int:
+        """tolerance 이내에 겹치는 addresses를 하나로 합치고 lines의 참조를 바꿉니다.
+
+        각 클러스터에서 가장 먼저 생성된 address만 남기며, 병합 후 자기 자신을 잇게 된 line과
+        같은 방향으로 같은 두 address를 잇는 중복 line은 제거합니다. 병합된 address 수를 반환합니다.
+        """
+        tolerance = tolerance if tolerance is not None else GENERATION_WELD_TOLERANCE
+        print(f"\n🧲 같은 위치 address 병합 중... (허용 오차: {tolerance})")
+        
+        positions = np.array([(a['pos']['x'], a['pos']['y'], a['pos']['z']) for a in self.addresses], dtype=np.float64)
+        clusters = find_coincident_clusters(positions, tolerance)
+        if not clusters:
+            print("   병합할 address가 없습니다.")
+            return 0
+        
+        # 병합되는 address ID -> 남는 address
+        replacement = {}
+        for cluster in clusters:
+            keep = self.addresses[cluster[0]]
+            for index in cluster[1:]:
+                replacement[self.addresses[index]['id']] = keep
+        self.addresses = [addr for addr in self.addresses if addr['id'] not in replacement]
+        
+        lines = []
+        seen = set()
+        self_loops = 0
+        duplicates = 0
+        for line in self.lines:
+            from_addr = replacement.get(line['fromAddress'])
+            to_addr = replacement.get(line['toAddress'])
+            if from_addr or to_addr:
+                default_name = f"LINE_{line['fromAddress']}_{line['toAddress']}"
+                if from_addr:
+                    line['fromAddress'] = from_addr['id']
+                    line['fromPos'] = from_addr['pos']
+                if to_addr:
+                    line['toAddress'] = to_addr['id']
+                    line['toPos'] = to_addr['pos']
+                # 끝점 ID로 만든 이름은 새 끝점 기준으로 갱신
+                if line['name'] == default_name:
+                    line['name'] = f"LINE_{line['fromAddress']}_{line['toAddress']}"
+            
+            key = (line['fromAddress'], line['toAddress'])
+            if key[0] == key[1]:
+                self_loops += 1
+                continue
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            lines.append(line)
+        self.lines = lines
+        
+        print(f"   병합된 address: {len(replacement)}개 ({len(clusters)}개 위치)")
+        print(f"   제거된 line: 자기 연결 {self_loops}개, 중복 {duplicates}개")
+        return len(replacement)
+    
+    def raw_ids(self) -> Tuple[set, set]:
+        """input 요소 조각에 속한 address ID / line ID 집합 (나머지는 투영으로 생긴 것)"""
+        address_ids = {addr['id'] for fragment in self.fragments for addr in fragment['addresses']}
+        line_ids = {line['id'] for fragment in self.fragments for line in fragment['lines']}
+        return address_ids, line_ids
+    
+    def restore_derived_ids(self, snapshot: GenerationSnapshot) -> int:
+        """투영으로 새로 생긴 address / line 중 직전과 같은 위치 / 같은 끝점인 것에 직전 ID를 돌려줍니다.
+        
+        직전 ID는 모두 snapshot.next_*_id보다 작고 이번 실행의 새 ID는 그 이상이므로 겹치지 않습니다.
+        """
+        raw_address_ids, raw_line_ids = self.raw_ids()
+        previous_addresses = {(x, y, z): addr_id for addr_id, x, y, z in snapshot.derived_addresses}
+        previous_lines = {(from_id, to_id): line_id for line_id, from_id, to_id in snapshot.derived_lines}
+        
+        address_map = {}
+        for addr in self.addresses:
+            if addr['id'] in raw_address_ids:
+                continue
+            pos = addr['pos']
+            previous_id = previous_addresses.pop((pos['x'], pos['y'], pos['z']), None)
+            if previous_id is not None:
+                address_map[addr['id']] = previous_id
+                addr.update(id=previous_id, address=previous_id, name=f"ADDR_{previous_id}")
+        
+        restored_lines = 0
+        for line in self.lines:
+            default_name = f"LINE_{line['fromAddress']}_{line['toAddress']}"
+            line['fromAddress'] = address_map.get(line['fromAddress'], line['fromAddress'])
+            line['toAddress'] = address_map.get(line['toAddress'], line['toAddress'])
+            if line['name'] == default_name:
+                line['name'] = f"LINE_{line['fromAddress']}_{line['toAddress']}"
+            if line['id'] in raw_line_ids:
+                continue
+            previous_id = previous_lines.pop((line['fromAddress'], line['toAddress']), None)
+            if previous_id is not None:
+                line['id'] = previous_id
+                restored_lines += 1
+        
+        print(f"   직전 ID 유지: 투영 address {len(address_map)}개, 연결 line {restored_lines}개")
+        return len(address_map) + restored_lines
+    
     def save_output(self):
         """생성된 데이터를 output.json 파일로 저장합니다."""
         output_data = {"addresses": self.addresses, "lines": self.lines}
@@ -837,23 +838,151 @@ class InputGenerator:
             print(f"❌ 파일 저장 중 오류 발생: {str(e)}")
             return False
     
+    def generation_settings(self) -> Dict:
+        """생성 결과에 영향을 주는 설정 (캐시 키와 증분 생성 스냅샷 비교에 사용)"""
+        return {
+            'version': GENERATION_CACHE_VERSION,
+            'seed': self.seed,
+            'random_interval': list(RANDOM_INTERVAL),
+            'address_id_start': ADDRESS_ID_START,
+            'line_id_start': LINE_ID_START,
+            'weld': GENERATION_WELD,
+            'weld_tolerance': GENERATION_WELD_TOLERANCE,
+            'shortcut_projection': [SHORTCUT_PROJECTION, SHORTCUT_PROJECTION_COUNT,
+                                    SHORTCUT_PROJECTION_MAX_DISTANCE, SHORTCUT_SNAP_DISTANCE]
+        }
+    
+    def compute_cache_key(self) -> str:
+        """input.json 내용, 시드, RANDOM_INTERVAL, 시작 ID로 캐시 키(sha256)를 계산합니다."""
+        digest = hashlib.sha256()
+        with open(INPUT_FILE, 'rb') as f:
+            digest.update(f.read())
+        digest.update(json.dumps(self.generation_settings(), sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def cache_path(self) -> str:
+        return os.path.join(GENERATION_CACHE_DIR, f"{self.cache_key}.json")
+    
+    @staticmethod
+    def cache_snapshot_path(cache_path: str) -> str:
+        """캐시 항목과 함께 저장하는 증분 생성 스냅샷 경로 (예: generation_cache/<key>.snapshot)"""
+        return os.path.splitext(cache_path)[0] + '.snapshot'
+    
+    def load_from_cache(self) -> bool:
+        """캐시에 같은 키의 결과가 있으면 output.json으로, 함께 저장된 스냅샷은 스냅샷 파일로 복사합니다."""
+        try:
+            self.cache_key = self.compute_cache_key()
+            path = self.cache_path()
+            if not os.path.exists(path):
+                return False
+            shutil.copyfile(path, OUTPUT_FILE)
+            # 복원한 output.json에 맞는 스냅샷으로 교체 (없으면 맞지 않는 직전 스냅샷만 삭제)
+            snapshot_path = self.cache_snapshot_path(path)
+            if os.path.exists(snapshot_path):
+                shutil.copyfile(snapshot_path, GENERATION_SNAPSHOT_FILE)
+            else:
+                GenerationSnapshot.remove(GENERATION_SNAPSHOT_FILE)
+            # 최근 사용 순서로 정리되도록 수정 시각 갱신
+            os.utime(path)
+            self.cache_hit = True
+            print(f"♻️ 생성 캐시 적중 (seed: {self.seed}, key: {self.cache_key[:12]}) - {OUTPUT_FILE}에 저장된 결과를 복원했습니다.")
+            return True
+        except Exception as e:
+            print(f"⚠️ 생성 캐시 확인 중 오류: {str(e)}")
+            return False
+    
+    def store_to_cache(self):
+        """output.json과 스냅샷을 캐시에 저장하고, 오래된 캐시를 GENERATION_CACHE_MAX_ENTRIES개까지 정리합니다."""
+        try:
+            os.makedirs(GENERATION_CACHE_DIR, exist_ok=True)
+            shutil.copyfile(OUTPUT_FILE, self.cache_path())
+            if os.path.exists(GENERATION_SNAPSHOT_FILE):
+                shutil.copyfile(GENERATION_SNAPSHOT_FILE, self.cache_snapshot_path(self.cache_path()))
+            entries = sorted(
+                (os.path.join(GENERATION_CACHE_DIR, name) for name in os.listdir(GENERATION_CACHE_DIR) if name.endswith('.json')),
+                key=os.path.getmtime, reverse=True
+            )
+            for stale in entries[GENERATION_CACHE_MAX_ENTRIES:]:
+                os.remove(stale)
+                GenerationSnapshot.remove(self.cache_snapshot_path(stale))
+            print(f"💾 생성 결과를 캐시에 저장했습니다. (key: {self.cache_key[:12]})")
+        except Exception as e:
+            print(f"⚠️ 생성 캐시 저장 중 오류: {str(e)}")
+    
+    def load_snapshot(self) -> Optional[GenerationSnapshot]:
+        """증분 생성의 기준이 될 직전 스냅샷을 읽습니다. 없거나 생성 설정(시드 포함)이 다르면 None을 반환합니다."""
+        snapshot = GenerationSnapshot.load(GENERATION_SNAPSHOT_FILE)
+        if snapshot is None:
+            print(f"ℹ️ {GENERATION_SNAPSHOT_FILE}이 없어 전체 생성을 실행합니다.")
+            return None
+        # 시드를 지정하지 않았으면 직전 생성의 시드를 이어서 사용
+        if not self.fixed_seed and snapshot.seed is not None:
+            self.seed = snapshot.seed
+            self.rng = np.random.default_rng(self.seed)
+        if snapshot.settings != self.generation_settings():
+            print("ℹ️ 생성 설정이 직전 스냅샷과 달라 전체 생성을 실행합니다.")
+            return None
+        return snapshot
+    
+    def save_snapshot(self):
+        """다음 증분 생성에 사용할 요소별 조각과 투영 결과 ID를 저장합니다."""
+        try:
+            raw_address_ids, raw_line_ids = self.raw_ids()
+            snapshot = GenerationSnapshot(
+                self.generation_settings(), self.fragments,
+                [[addr['id'], addr['pos']['x'], addr['pos']['y'], addr['pos']['z']]
+                 for addr in self.addresses if addr['id'] not in raw_address_ids],
+                [[line['id'], line['fromAddress'], line['toAddress']]
+                 for line in self.lines if line['id'] not in raw_line_ids],
+                self.current_address_id, self.current_line_id
+            )
+            snapshot.save(GENERATION_SNAPSHOT_FILE)
+            print(f"💾 증분 생성 스냅샷을 {GENERATION_SNAPSHOT_FILE}에 저장했습니다. (요소 {len(self.fragments)}개)")
+        except Exception as e:
+            print(f"⚠️ 증분 생성 스냅샷 저장 중 오류: {str(e)}")
+    
     def run(self):
         """전체 프로세스를 실행합니다."""
+        snapshot = self.load_snapshot() if self.incremental else None
+        print(f"🎲 시드: {self.seed}" + ("" if self.fixed_seed or snapshot else " (임의 시드, 캐시 사용 안 함)"))
+        # 증분 생성 결과의 ID는 직전 생성 이력에 따라 달라지므로 입력 해시 캐시는 전체 생성에만 사용
+        if snapshot is None and self.use_cache and self.load_from_cache():
+            print("🎉 모든 작업이 완료되었습니다!")
+            return True
+        
         if not self.load_input_data():
             return False
         
-        self.generate_data()
+        if snapshot:
+            self.generate_incremental_data(snapshot)
+            self.incremental_used = True
+        else:
+            self.generate_data()
         
         if not self.save_output():
             return False
         
+        self.save_snapshot()
+        if not self.incremental_used and self.use_cache and self.cache_key:
+            self.store_to_cache()
+        
         print("🎉 모든 작업이 완료되었습니다!")
         return True
 
-def generate_data():
-    """데이터 생성을 실행하는 함수"""
-    generator = InputGenerator()
-    return generator.run()
+def generate_data(workers=None, seed=None, use_cache=None, incremental=None, return_info=False):
+    """데이터 생성을 실행하는 함수 (return_info=True면 시드/캐시/증분 생성 정보 dict 반환)"""
+    generator = InputGenerator(workers=workers, seed=seed, use_cache=use_cache, incremental=incremental)
+    success = generator.run()
+    if return_info:
+        return {
+            'success': success,
+            'seed': generator.seed,
+            'cache_hit': generator.cache_hit,
+            'cache_key': generator.cache_key,
+            'incremental': generator.incremental_used,
+            'diff': generator.diff_summary
+        }
+    return success
 
 def main():
     """메인 실행 함수"""
@@ -17,13 +17,18 @@ import pandas as pd
 import numpy as np
 import math
 from typing import List, Tuple, Set, Dict
-from config import OUTPUT_FILE
+from config import OUTPUT_FILE, ENDPOINT_PARTITION_BY_Z
+from spatial_index import SpatialIndex
+from edge_index import EdgeIndex
 
 class EndpointConnector:
     def __init__(self):
         self.addresses_df = None
         self.lines_df = None
         self.current_line_id = None
+        self.spatial_index = None
+        self.edge_index = EdgeIndex()
+        self.address_records = {}
         
     def load_output_data(self):
         """output.json 파일을 pandas DataFrame으로 읽어서 addresses와 lines를 로드합니다."""
@@ -46,6 +51,10 @@ class EndpointConnector:
             
             self.current_line_id = max_line_id + 1
             
+            # 최근접 검색용 공간 인덱스와 line 연결 인덱스 구성
+            self.build_spatial_index()
+            self.build_edge_index()
+            
             print(f"✅ {OUTPUT_FILE} 파일을 성공적으로 로드했습니다.")
             print(f"📊 Addresses: {len(self.addresses_df)}개")
             print(f"📊 Lines: {len(self.lines_df)}개")
@@ -56,6 +65,25 @@ class EndpointConnector:
             print(f"❌ 데이터 로드 중 오류 발생: {str(e)}")
             return False
     
+    def build_spatial_index(self):
+        """addresses로 최근접 검색용 격자 공간 인덱스를 구성합니다."""
+        self.address_records = {}
+        if not self.addresses_df.empty:
+            for record in self.addresses_df.to_dict('records'):
+                self.address_records.setdefault(record.get('id'), record)
+        self.spatial_index = SpatialIndex.from_dataframe(self.addresses_df, partition_by_z=ENDPOINT_PARTITION_BY_Z)
+    
+    def build_edge_index(self):
+        """lines로 line 존재 여부 / degree 조회용 EdgeIndex를 구성합니다."""
+        if self.lines_df.empty:
+            self.edge_index = EdgeIndex()
+        else:
+            self.edge_index = EdgeIndex.from_pairs(self.lines_df['fromAddress'].tolist(), self.lines_df['toAddress'].tolist())
+    
+    def register_line(self, line: Dict):
+        """새로 만든 line을 EdgeIndex에 반영하여 같은 패스의 이후 검사에서도 보이도록 합니다."""
+        self.edge_index.add_line(line['fromAddress'], line['toAddress'])
+    
     def find_unused_addresses(self):
         """line의 toAddress와 fromAddress에 한 번도 사용되지 않은 unused address를 찾습니다."""
         print("\n🔍 Unused addresses 찾는 중...")
@@ -64,10 +92,7 @@ class EndpointConnector:
         all_address_ids = set(self.addresses_df['id'].tolist())
         
         # lines에서 사용되는 address ID들
-        used_address_ids = set()
-        if not self.lines_df.empty:
-            used_address_ids.update(self.lines_df['fromAddress'].tolist())
-            used_address_ids.update(self.lines_df['toAddress'].tolist())
+        used_address_ids = set(self.edge_index.degrees)
         
         # 사용되지 않은 address ID들
         unused_address_ids = all_address_ids - used_address_ids
@@ -87,45 +112,49 @@ class EndpointConnector:
     
     def find_nearest_addresses(self, source_address: Dict, count: int = 2, exclude_address_ids: Set[int] = None) -> List[Tuple[Dict, float]]:
         """source_address와 가장 가까운 address들을 찾습니다."""
-        if exclude_address_ids is None:
-            exclude_address_ids = set()
+        exclude_ids = set(exclude_address_ids) if exclude_address_ids else set()
         
-        source_pos = source_address.get('pos', {})
-        source_id = source_address.get('id')
-        distances = []
+        # 자기 자신은 제외
+        exclude_ids.add(source_address.get('id'))
         
-        for _, address_row in self.addresses_df.iterrows():
-            address = address_row.to_dict()
-            address_id = address.get('id')
-            
-            # 자기 자신은 제외
-            if address_id == source_id:
-                continue
-            
-            # 제외할 address들도 제외
-            if address_id in exclude_address_ids:
-                continue
-            
-            address_pos = address.get('pos', {})
-            distance = self.calculate_distance(source_pos, address_pos)
-            distances.append((address, distance))
+        source_pos = source_address.get('pos', {})
+        point = (source_pos.get('x', 0), source_pos.get('y', 0), source_pos.get('z', 0))
         
-        # 거리순으로 정렬하고 상위 count개 반환
-        distances.sort(key=lambda x: x[1])
-        return distances[:count]
+        neighbours = self.spatial_index.knn(point, count, exclude_ids)
+        return [(self.address_records[address_id], distance) for address_id, distance in neighbours]
     
-    def is_line_exists(self, from_address_id: int, to_address_id: int) -> bool:
-        """두 address 간의 line이 이미 존재하는지 확인합니다."""
-        if self.lines_df.empty:
-            return False
-        
-        # 동일한 연결 또는 역방향 연결 확인
-        condition = (
-            ((self.lines_df['fromAddress'] == from_address_id) & (self.lines_df['toAddress'] == to_address_id)) |
-            ((self.lines_df['fromAddress'] == to_address_id) & (self.lines_df['toAddress'] == from_address_id))
+    def find_nearest_addresses_batch(self, source_addresses: List[Dict], count: int = 2, exclude_per_source: List[Set[int]] = None) -> List[List[Tuple[Dict, float]]]:
+        """여러 source_address의 최근접 address들을 한 번의 벡터 연산으로 찾습니다."""
+        if not source_addresses:
+            return []
+        
+        source_ids = [addr.get('id') for addr in source_addresses]
+        points = [
+            (addr.get('pos', {}).get('x', 0), addr.get('pos', {}).get('y', 0), addr.get('pos', {}).get('z', 0))
+            for addr in source_addresses
+        ]
+        
+        # 자기 자신은 query_ids로 제외
+        neighbour_ids, neighbour_dists = self.spatial_index.batch_knn(
+            points, count, query_ids=source_ids, per_query_exclude=exclude_per_source
         )
         
-        return self.lines_df[condition].shape[0] > 0
+        results = []
+        for ids_row, dists_row in zip(neighbour_ids.tolist(), neighbour_dists.tolist()):
+            results.append([
+                (self.address_records[address_id], distance)
+                for address_id, distance in zip(ids_row, dists_row)
+                if address_id != -1
+            ])
+        return results
+    
+    def get_connected_address_ids(self, source_ids: List[int]) -> Dict[int, Set[int]]:
+        """source_ids 각각에 line으로 연결된 address ID 집합을 구합니다."""
+        return {source_id: set(self.edge_index.neighbors(source_id)) for source_id in source_ids}
+    
+    def is_line_exists(self, from_address_id: int, to_address_id: int) -> bool:
+        """두 address 간의 line이 이미 존재하는지 확인합니다. (동일한 연결 또는 역방향 연결)"""
+        return self.edge_index.has_edge(from_address_id, to_address_id)
     
     def connect_unused_addresses(self):
         """사용되지 않은 address들을 가장 가까운 두 개의 address와 연결합니다."""
@@ -140,12 +169,11 @@ class EndpointConnector:
         new_lines = []
         connected_count = 0
         
-        for _, unused_address_row in unused_addresses_df.iterrows():
-            unused_address = unused_address_row.to_dict()
-            
-            # 가장 가까운 두 개의 address 찾기
-            nearest_addresses = self.find_nearest_addresses(unused_address, 2)
-            
+        # 모든 unused address의 가장 가까운 두 개의 address를 한 번에 찾기
+        unused_addresses = unused_addresses_df.to_dict('records')
+        nearest_addresses_list = self.find_nearest_addresses_batch(unused_addresses, 2)
+        
+        for unused_address, nearest_addresses in zip(unused_addresses, nearest_addresses_list):
             if len(nearest_addresses) >= 2:
                 addr1, dist1 = nearest_addresses[0]
                 addr2, dist2 = nearest_addresses[1]
@@ -162,6 +190,7 @@ class EndpointConnector:
                         "curve": False
                     }
                     new_lines.append(line1)
+                    self.register_line(line1)
                     self.current_line_id += 1
                     connected_count += 1
                     print(f"  ✅ {unused_address.get('id')} → {addr1.get('id')} 연결 (거리: {dist1:.2f})")
@@ -180,6 +209,7 @@ class EndpointConnector:
                         "curve": False
                     }
                     new_lines.append(line2)
+                    self.register_line(line2)
                     self.current_line_id += 1
                     connected_count += 1
                     print(f"  ✅ {unused_address.get('id')} → {addr2.get('id')} 연결 (거리: {dist2:.2f})")
@@ -201,15 +231,8 @@ class EndpointConnector:
         if self.lines_df.empty:
             return pd.DataFrame()
         
-        # 각 address의 사용 횟수 계산
-        from_address_counts = self.lines_df['fromAddress'].value_counts()
-        to_address_counts = self.lines_df['toAddress'].value_counts()
-        
-        # 모든 address의 총 사용 횟수 계산
-        all_address_counts = from_address_counts.add(to_address_counts, fill_value=0)
-        
         # 한 번만 사용된 address들 찾기
-        endpoint_address_ids = all_address_counts[all_address_counts == 1].index.tolist()
+        endpoint_address_ids = self.edge_index.addresses_with_degree(1)
         
         # endpoint addresses DataFrame 생성
         endpoint_addresses_df = self.addresses_df[self.addresses_df['id'].isin(endpoint_address_ids)]
@@ -223,39 +246,20 @@ class EndpointConnector:
         source_id = source_address.get('id')
         
         # 현재 address가 연결된 address들 찾기
-        connected_address_ids = set()
-        if not self.lines_df.empty:
-            # fromAddress로 연결된 것들
-            from_connections = self.lines_df[self.lines_df['fromAddress'] == source_id]['toAddress'].tolist()
-            connected_address_ids.update(from_connections)
-            
-            # toAddress로 연결된 것들
-            to_connections = self.lines_df[self.lines_df['toAddress'] == source_id]['fromAddress'].tolist()
-            connected_address_ids.update(to_connections)
+        connected_address_ids = set(self.edge_index.neighbors(source_id))
         
         # 자기 자신도 제외
         connected_address_ids.add(source_id)
         
         # 가장 가까운 address 찾기 (연결되지 않은 것들 중에서)
-        nearest_address = None
-        min_distance = float('inf')
+        point = (source_pos.get('x', 0), source_pos.get('y', 0), source_pos.get('z', 0))
+        neighbours = self.spatial_index.knn(point, 1, connected_address_ids)
         
-        for _, address_row in self.addresses_df.iterrows():
-            address = address_row.to_dict()
-            address_id = address.get('id')
-            
-            # 이미 연결된 address는 제외
-            if address_id in connected_address_ids:
-                continue
-            
-            address_pos = address.get('pos', {})
-            distance = self.calculate_distance(source_pos, address_pos)
-            
-            if distance < min_distance:
-                min_distance = distance
-                nearest_address = address
+        if not neighbours:
+            return None, float('inf')
         
-        return nearest_address, min_distance if nearest_address else float('inf')
+        nearest_id, min_distance = neighbours[0]
+        return self.address_records[nearest_id], min_distance
     
     def connect_endpoints(self):
         """Endpoint address들을 가장 가까운 address와 연결합니다."""
@@ -270,11 +274,14 @@ class EndpointConnector:
         new_lines = []
         connected_count = 0
         
-        for _, endpoint_address_row in endpoint_addresses_df.iterrows():
-            endpoint_address = endpoint_address_row.to_dict()
-            
-            # 겹치지 않는 가장 가까운 address 찾기
-            nearest_address, distance = self.find_nearest_non_overlapping_address(endpoint_address)
+        # 이미 연결된 address를 제외하고 겹치지 않는 가장 가까운 address를 한 번에 찾기
+        endpoint_addresses = endpoint_addresses_df.to_dict('records')
+        connected_map = self.get_connected_address_ids([addr.get('id') for addr in endpoint_addresses])
+        exclude_per_source = [connected_map[addr.get('id')] for addr in endpoint_addresses]
+        nearest_list = self.find_nearest_addresses_batch(endpoint_addresses, 1, exclude_per_source)
+        
+        for endpoint_address, nearest in zip(endpoint_addresses, nearest_list):
+            nearest_address, distance = nearest[0] if nearest else (None, float('inf'))
             
             if nearest_address and distance != float('inf'):
                 # line이 겹치지 않는지 확인
@@ -289,6 +296,7 @@ class EndpointConnector:
                         "curve": False
                     }
                     new_lines.append(line)
+                    self.register_line(line)
                     self.current_line_id += 1
                     connected_count += 1
                     print(f"  ✅ {endpoint_address.get('id')} → {nearest_address.get('id')} 연결 (거리: {distance:.2f})")
@@ -4,7 +4,7 @@
 Layout Graph Visualizer Flask Web Server
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
 import json
 import os
 import sys
@@ -18,6 +18,8 @@ from contextlib import redirect_stdout, redirect_stderr
 current_dir = Path(__file__).parent
 sys.path.append(str(current_dir))
 
+from config import CHECK_API_STDOUT_LIMIT, CHECK_REPORT_FILE
+
 # visualize.py 모듈 import
 try:
     from visualize import LayoutVisualizer
@@ -25,7 +27,7 @@ try:
     from add_addresses_lines import generate_data
     from add_lines_endpoint import add_endpoint_lines
     from add_stations import add_intra_bay_stations
-    from generate_udp_data import generate_udp_data
+    from generate_udp_data import generate_udp_data, generate_udp_batch, batch_worker_count, normalize_route_pair, read_route_pairs_csv
     from check import check_data_integrity
     pass
 except ImportError as e:
@@ -78,6 +80,13 @@ def kill_processes_on_port(port):
         print(f"❌ 포트 {port} 프로세스 종료 중 오류: {e}")
         return False
 
+def truncate_output(text, limit):
+    """긴 출력은 앞/뒤만 남기고 가운데를 생략합니다."""
+    if limit is None or len(text) <= limit:
+        return text
+    half = limit // 2
+    return f"{text[:half]}\n... ({len(text) - limit}자 생략 - 전체 결과는 check.log / {CHECK_REPORT_FILE} 참조) ...\n{text[-half:]}"
+
 def ensure_port_available(port):
     """포트가 사용 가능하도록 보장"""
     if is_port_in_use(port):
@@ -448,14 +457,22 @@ def run_generate():
     try:
         print("🚀 Generate.py 실행 시작 (직접 함수 호출)")
         
+        # 요청 데이터에서 시드 / 증분 생성 여부 가져오기 (없으면 config.py의 GENERATION_SEED / GENERATION_INCREMENTAL)
+        data = request.get_json(silent=True) or {}
+        seed = data.get('seed')
+        use_cache = data.get('use_cache')
+        incremental = data.get('incremental')
+        
         # stdout과 stderr를 캡처하여 실행 결과 수집
         output_buffer = io.StringIO()
         error_buffer = io.StringIO()
+        info = {}
         
         try:
             with redirect_stdout(output_buffer), redirect_stderr(error_buffer):
                 # generate_data() 함수 직접 호출
-                result = generate_data()
+                info = generate_data(seed=seed, use_cache=use_cache, incremental=incremental, return_info=True)
+                result = info['success']
                 
         except Exception as e:
             error_buffer.write(f"❌ Generate.py 실행 중 오류: {str(e)}\n")
@@ -479,7 +496,11 @@ def run_generate():
                 'config_updated': {
                     'script': 'add_addresses_lines.py',
                     'status': 'completed',
-                    'method': 'direct_function_call'
+                    'method': 'direct_function_call',
+                    'seed': info.get('seed'),
+                    'cache_hit': info.get('cache_hit', False),
+                    'incremental': info.get('incremental', False),
+                    'diff': info.get('diff')
                 }
             })
         else:
@@ -571,17 +592,18 @@ def run_check():
         
         try:
             with redirect_stdout(output_buffer), redirect_stderr(error_buffer):
-                # check_data_integrity() 함수 직접 호출
-                check_data_integrity()
+                # check_data_integrity() 함수 직접 호출 (JSON 리포트 반환)
+                report = check_data_integrity(return_report=True)
                 result = True
                 
         except Exception as e:
             error_buffer.write(f"❌ Check.py 실행 중 오류: {str(e)}\n")
+            report = None
             result = False
         
-        # 캡처된 출력 결과
-        stdout_output = output_buffer.getvalue()
-        stderr_output = error_buffer.getvalue()
+        # 캡처된 출력 결과 (상세 내용은 report / check.log에 있으므로 길이 제한)
+        stdout_output = truncate_output(output_buffer.getvalue(), CHECK_API_STDOUT_LIMIT)
+        stderr_output = truncate_output(error_buffer.getvalue(), CHECK_API_STDOUT_LIMIT)
         output_buffer.close()
         error_buffer.close()
         
@@ -589,6 +611,7 @@ def run_check():
             return jsonify({
                 'success': True,
                 'message': 'Check.py가 성공적으로 실행되었습니다. (직접 함수 호출)',
+                'report': report,
                 'execution_output': {
                     'stdout': stdout_output,
                     'stderr': stderr_output,
@@ -745,6 +768,72 @@ def run_udp_generator():
             'message': f'UDP Generator 실행 중 오류가 발생했습니다: {str(e)}'
         }), 500
 
+@app.route('/api/run-udp-batch', methods=['POST'])
+def run_udp_batch():
+    """여러 (시작, 목적지) 쌍의 UDP 데이터를 한 번에 생성 - 결과를 한 줄에 하나씩 JSON(NDJSON)으로 스트리밍
+
+    요청: {"pairs": [[시작, 목적지], ...] 또는 [{"start_address", "destination_address"}, ...], "workers": N},
+    {"csv": "시작,목적지\\n..."}, text/csv 본문, 또는 multipart 'file'(CSV) 업로드
+    """
+    try:
+        data = {}
+        if 'file' in request.files:
+            pairs = read_route_pairs_csv(request.files['file'].read().decode('utf-8-sig'))
+        elif request.mimetype == 'text/csv':
+            pairs = read_route_pairs_csv(request.get_data(as_text=True))
+        else:
+            data = request.get_json(silent=True) or {}
+            if 'csv' in data:
+                pairs = read_route_pairs_csv(data['csv'])
+            else:
+                pairs = [normalize_route_pair(item) for item in data.get('pairs', [])]
+        
+        if not pairs:
+            return jsonify({
+                'success': False,
+                'message': '경로 쌍(pairs 또는 CSV)이 없습니다.'
+            }), 400
+        
+        try:
+            workers = batch_worker_count(data.get('workers'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': f'workers 값 오류: {str(e)}'
+            }), 400
+        
+        print(f"🎯 UDP 배치 생성: {len(pairs)}개 경로 (workers: {workers})")
+        # worker 풀과 로그 파일은 여기서 준비되므로 설정 오류는 스트리밍 전에 400/500으로 응답
+        results = generate_udp_batch(pairs, workers=workers)
+        if results is None:
+            return jsonify({
+                'success': False,
+                'message': 'output.json을 읽거나 그래프를 구성하지 못했습니다.'
+            }), 500
+        
+        def stream():
+            succeeded = 0
+            for result in results:
+                succeeded += result['success']
+                yield json.dumps(result, ensure_ascii=False) + '\n'
+            yield json.dumps({
+                'summary': {'total': len(pairs), 'succeeded': succeeded, 'failed': len(pairs) - succeeded}
+            }, ensure_ascii=False) + '\n'
+        
+        return Response(stream_with_context(stream()), mimetype='application/x-ndjson')
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'경로 쌍 형식 오류: {str(e)}'
+        }), 400
+    except Exception as e:
+        print(f"UDP 배치 생성 오류: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'UDP 배치 생성 중 오류가 발생했습니다: {str(e)}'
+        }), 500
+
 if __name__ == '__main__':
     print("🚀 Layout Graph Visualizer Flask 서버 시작")
     
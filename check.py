@@ -6,14 +6,49 @@ Data Integrity Checker - output.json 파일의 데이터 무결성을 검증하
 
 import json
 import logging
+import logging.handlers
+import queue
+import time
 from datetime import datetime
 from collections import defaultdict, Counter
-from config import OUTPUT_FILE
+import numpy as np
+from config import (
+    OUTPUT_FILE, HIGHLY_CONNECTED_THRESHOLD, DEGREE_HISTOGRAM_BINS, DUPLICATE_POSITION_TOLERANCE,
+    CHECK_LOG_ASYNC, CHECK_LOG_MAX_PER_CATEGORY, CHECK_PRINT_MAX_PER_CATEGORY,
+    CHECK_REPORT_FILE, CHECK_REPORT_SAMPLE_LIMIT, LINE_POSITION_TOLERANCE, LINE_POSITION_REPAIR, CHECK_INCREMENTAL
+)
+from check_engine import IntegrityCheckEngine, CheckTables, find_near_duplicate_positions
+from check_incremental import IncrementalCheckEngine
+from edge_index import EdgeIndex
 
 class DataChecker:
-    def __init__(self):
+    def __init__(self, highly_connected_threshold=None, degree_histogram_bins=None,
+                 async_logging=None, log_limit=None, print_limit=None, repair_line_positions=None, incremental=None):
         self.addresses = []
         self.lines = []
+        self.address_index = {}
+        self.edge_index = EdgeIndex()
+        self._overlap_scan = None
+        self.findings = {}
+        self.check_timings = {}
+        self.incremental = incremental if incremental is not None else CHECK_INCREMENTAL
+        # 증분 검사 정보: mode('full'/'incremental'), 전체 검사로 돌아간 이유, 변경 건수
+        self.check_mode = {}
+        self.degree_histogram = {}
+        self.highly_connected_threshold = highly_connected_threshold if highly_connected_threshold is not None else HIGHLY_CONNECTED_THRESHOLD
+        self.degree_histogram_bins = sorted(degree_histogram_bins if degree_histogram_bins is not None else DEGREE_HISTOGRAM_BINS)
+        self.async_logging = async_logging if async_logging is not None else CHECK_LOG_ASYNC
+        self.log_limit = log_limit if log_limit is not None else CHECK_LOG_MAX_PER_CATEGORY
+        self.print_limit = print_limit if print_limit is not None else CHECK_PRINT_MAX_PER_CATEGORY
+        self.repair_line_positions = repair_line_positions if repair_line_positions is not None else LINE_POSITION_REPAIR
+        # 카테고리별 상세 메시지 수: {category: {'log': n, 'print': n}}
+        self.detail_counts = {}
+        # JSON 리포트: 검사별 결과, 단계별 소요 시간
+        self.check_results = {}
+        self.step_timings = {}
+        self.report = {}
+        self.report_sample_limit = CHECK_REPORT_SAMPLE_LIMIT
+        self.log_listener = None
         self.setup_logging()
     
     def setup_logging(self):
@@ -42,14 +77,77 @@ class DataChecker:
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
         
-        # 핸들러 추가
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # 핸들러 추가 (비동기 모드에서는 QueueListener 스레드가 파일/콘솔 I/O를 처리)
+        self.log_handlers = [file_handler, console_handler]
+        if self.async_logging:
+            log_queue = queue.SimpleQueue()
+            self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+            self.log_listener = logging.handlers.QueueListener(log_queue, *self.log_handlers, respect_handler_level=True)
+            self.log_listener.start()
+        else:
+            for handler in self.log_handlers:
+                self.logger.addHandler(handler)
         
         self.logger.info("=" * 50)
         self.logger.info("데이터 무결성 검사 시작")
         self.logger.info("=" * 50)
         
+    def close_logging(self):
+        """비동기 로깅을 종료합니다. 남은 로그를 모두 기록한 뒤 핸들러를 동기 방식으로 되돌립니다."""
+        if self.log_listener is None:
+            return
+        self.log_listener.stop()
+        self.log_listener = None
+        self.logger.handlers.clear()
+        for handler in self.log_handlers:
+            self.logger.addHandler(handler)
+    
+    def _report_detail(self, category, message, level=logging.ERROR, console=None):
+        """항목별 상세 메시지를 기록합니다. 카테고리별 상한을 넘는 메시지는 건수만 셉니다.
+        
+        console이 True면 message를, 문자열이면 그 문자열을 화면에도 출력합니다.
+        """
+        counts = self.detail_counts.setdefault(category, {'log': 0, 'print': 0})
+        counts['log'] += 1
+        if self.log_limit is None or counts['log'] <= self.log_limit:
+            self.logger.log(level, message)
+        if console:
+            counts['print'] += 1
+            if self.print_limit is None or counts['print'] <= self.print_limit:
+                print(message if console is True else console)
+    
+    def _report_suppressed(self, category, level=logging.ERROR):
+        """카테고리에서 상한으로 생략된 상세 메시지 수를 요약합니다."""
+        counts = self.detail_counts.get(category)
+        if not counts:
+            return
+        if self.print_limit is not None and counts['print'] > self.print_limit:
+            print(f"     ... 및 {counts['print'] - self.print_limit}개 더 (화면 출력 생략)")
+        if self.log_limit is not None and counts['log'] > self.log_limit:
+            self.logger.log(level, f"[{category}] {counts['log'] - self.log_limit}개 상세 로그 생략 (상한: {self.log_limit}개)")
+    
+    def _record_result(self, name, passed, count, ids=None, samples=None, **extra):
+        """JSON 리포트에 들어갈 검사 결과를 기록합니다. (samples는 호출 측에서 상한만큼만 만듦)"""
+        result = {'passed': passed, 'count': count}
+        if ids is not None:
+            result['ids'] = ids
+        if samples is not None:
+            result['samples'] = samples
+        result.update(extra)
+        self.check_results[name] = result
+    
+    def _timed(self, name, func):
+        """검사 단계를 실행하고 소요 시간을 기록합니다."""
+        start = time.perf_counter()
+        result = func()
+        self.step_timings[name] = round(time.perf_counter() - start, 6)
+        return result
+    
+    @staticmethod
+    def _pos_list(item):
+        pos = item.get('pos', {})
+        return [pos.get('x'), pos.get('y'), pos.get('z')]
+    
     def load_output_data(self):
         """output.json 파일을 읽어서 데이터를 로드합니다."""
         try:
@@ -58,6 +156,14 @@ class DataChecker:
             
             self.addresses = data.get('addresses', [])
             self.lines = data.get('lines', [])
+            self.invalidate_findings()
+            # 연결 수(degree)는 line 삭제와 함께 갱신되는 EdgeIndex에서 읽음
+            self.edge_index = EdgeIndex.from_lines(self.lines)
+            
+            # id -> address 인덱스 (ID 중복 시 첫 번째 address 사용)
+            self.address_index = {}
+            for addr in self.addresses:
+                self.address_index.setdefault(addr.get('id'), addr)
             
             print(f"✅ {OUTPUT_FILE} 파일을 성공적으로 로드했습니다.")
             print(f"📊 Addresses: {len(self.addresses)}개")
@@ -90,6 +196,88 @@ class DataChecker:
             self.logger.error(error_msg)
             return False
     
+    def invalidate_findings(self):
+        """addresses / lines를 새로 읽거나 바꾼 뒤 엔진 결과와 겹침 스캔 결과를 비웁니다."""
+        self.findings = {}
+        self._overlap_scan = None
+    
+    def run_integrity_engine(self):
+        """열 배열을 한 번만 추출하여 독립적인 검사들을 병렬로 실행하고 결과를 저장합니다."""
+        print("\n⚙️ 무결성 검사 엔진 실행 중...")
+        if self.incremental:
+            engine = IncrementalCheckEngine(self.addresses, self.lines, edge_index=self.edge_index)
+        else:
+            engine = IntegrityCheckEngine(self.addresses, self.lines, edge_index=self.edge_index)
+        self.findings = engine.run()
+        self.check_timings = dict(engine.timings)
+        
+        timing_str = ", ".join(f"{name}: {elapsed:.3f}s" for name, elapsed in self.check_timings.items())
+        print(f"✅ 검사 엔진 완료 (workers: {engine.max_workers})")
+        self.logger.info(f"검사 엔진 완료 - workers: {engine.max_workers}, 소요 시간: {timing_str}")
+        
+        if self.incremental:
+            changes = {
+                kind: {change: len(ids) for change, ids in diff.items()}
+                for kind, diff in engine.changes.items()
+            }
+            self.check_mode = {'mode': engine.mode, 'fallback_reason': engine.fallback_reason, 'changes': changes}
+            if engine.mode == 'incremental':
+                change_str = ", ".join(
+                    f"{kind} +{counts['added']}/-{counts['removed']}/~{counts['modified']}" for kind, counts in changes.items()
+                )
+                print(f"♻️ 증분 검사: 변경분만 다시 검사 ({change_str})")
+                self.logger.info(f"증분 검사 실행 - 변경: {change_str}")
+            else:
+                print(f"🔄 전체 검사 실행 ({engine.fallback_reason})")
+                self.logger.info(f"전체 검사 실행 - 사유: {engine.fallback_reason}")
+        return self.findings
+    
+    def _get_finding(self, name):
+        """현재 데이터에 대한 엔진 결과를 반환합니다. (invalidate_findings로 비워졌으면 엔진을 다시 실행)"""
+        if name not in self.findings:
+            self.run_integrity_engine()
+        return self.findings[name]
+    
+    def _apply_line_removal(self, removed_indices, removed_lines):
+        """line 삭제 후 EdgeIndex와 엔진 결과의 line 행 번호, 연결 수를 새 목록 기준으로 갱신합니다.
+        
+        self.lines에서 removed_indices 행을 이미 지운 뒤 호출하며, 겹침 스캔 결과는 행 번호가 바뀌므로 비웁니다.
+        """
+        for line in removed_lines:
+            if line.get('fromAddress') is not None and line.get('toAddress') is not None:
+                self.edge_index.remove_line(line.get('fromAddress'), line.get('toAddress'))
+        self._overlap_scan = None
+        if not self.findings or not removed_indices:
+            return
+        removed = np.zeros(len(self.lines) + len(removed_indices), dtype=bool)
+        removed[list(removed_indices)] = True
+        new_rows = np.cumsum(~removed) - 1
+        
+        def remap_groups(groups):
+            remapped = []
+            for group in groups:
+                kept = [int(new_rows[i]) for i in group if not removed[i]]
+                if len(kept) > 1:
+                    remapped.append(kept)
+            return remapped
+        
+        if 'line_duplicates' in self.findings:
+            self.findings['line_duplicates'] = {key: remap_groups(groups) for key, groups in self.findings['line_duplicates'].items()}
+        if 'line_overlaps' in self.findings:
+            self.findings['line_overlaps'] = remap_groups(self.findings['line_overlaps'])
+        if 'line_references' in self.findings:
+            self.findings['line_references'] = {
+                key: [int(new_rows[i]) for i in rows if not removed[i]]
+                for key, rows in self.findings['line_references'].items()
+            }
+        if 'segment_intersections' in self.findings:
+            self.findings['segment_intersections'] = {
+                key: [(z_value, int(new_rows[i]), int(new_rows[j])) for z_value, i, j in pairs if not removed[i] and not removed[j]]
+                for key, pairs in self.findings['segment_intersections'].items()
+            }
+        if 'degrees' in self.findings:
+            self.findings['degrees'] = Counter(self.edge_index.degrees)
+    
     def check_and_report_duplicate_addresses(self):
         """Addresses의 중복을 체크하고 Error로 보고합니다."""
         print("\n🔍 Addresses 중복 검사 중...")
@@ -97,98 +285,93 @@ class DataChecker:
         
         has_errors = False
         
-        # ID 중복 체크 및 보고
-        seen_ids = {}
-        duplicate_ids_list = []
+        duplicates = self._get_finding('address_duplicates')
         
-        for addr in self.addresses:
-            addr_id = addr.get('id')
-            if addr_id not in seen_ids:
-                seen_ids[addr_id] = [addr]
-            else:
-                seen_ids[addr_id].append(addr)
-                duplicate_ids_list.append(addr_id)
+        # ID 중복 체크 및 보고
+        duplicate_id_groups = duplicates['ids']
         
-        if duplicate_ids_list:
+        if duplicate_id_groups:
             has_errors = True
-            print(f"❌ ERROR: 중복된 Address ID 발견: {len(set(duplicate_ids_list))}개")
-            self.logger.error(f"중복된 Address ID 발견: {len(set(duplicate_ids_list))}개")
+            print(f"❌ ERROR: 중복된 Address ID 발견: {len(duplicate_id_groups)}개")
+            self.logger.error(f"중복된 Address ID 발견: {len(duplicate_id_groups)}개")
             
-            for dup_id in set(duplicate_ids_list):
-                addresses_with_id = seen_ids[dup_id]
-                print(f"\n🔴 중복된 Address ID {dup_id}:")
-                self.logger.error(f"=== 중복된 Address ID {dup_id} ===")
+            for group in duplicate_id_groups:
+                addresses_with_id = [self.addresses[i] for i in group]
+                dup_id = addresses_with_id[0].get('id')
+                self._report_detail('address_id', f"=== 중복된 Address ID {dup_id} ===", console=f"\n🔴 중복된 Address ID {dup_id}:")
                 
                 for i, addr in enumerate(addresses_with_id):
                     addr_info = f"  {i+1}. Name: {addr.get('name')}, Pos: ({addr.get('pos', {}).get('x')}, {addr.get('pos', {}).get('y')}, {addr.get('pos', {}).get('z')})"
-                    print(addr_info)
-                    self.logger.error(addr_info)
+                    self._report_detail('address_id', addr_info, console=True)
+            self._report_suppressed('address_id')
         else:
             print("✅ Address ID 중복 없음")
             self.logger.info("Address ID 중복 없음")
         
         # name 중복 체크 및 보고
-        seen_names = {}
-        duplicate_names_list = []
+        duplicate_name_groups = duplicates['names']
         
-        for addr in self.addresses:
-            addr_name = addr.get('name')
-            if addr_name not in seen_names:
-                seen_names[addr_name] = [addr]
-            else:
-                seen_names[addr_name].append(addr)
-                duplicate_names_list.append(addr_name)
-        
-        if duplicate_names_list:
+        if duplicate_name_groups:
             has_errors = True
-            print(f"❌ ERROR: 중복된 Address name 발견: {len(set(duplicate_names_list))}개")
-            self.logger.error(f"중복된 Address name 발견: {len(set(duplicate_names_list))}개")
+            print(f"❌ ERROR: 중복된 Address name 발견: {len(duplicate_name_groups)}개")
+            self.logger.error(f"중복된 Address name 발견: {len(duplicate_name_groups)}개")
             
-            for dup_name in set(duplicate_names_list):
-                addresses_with_name = seen_names[dup_name]
-                print(f"\n🔴 중복된 Address name '{dup_name}':")
-                self.logger.error(f"=== 중복된 Address name '{dup_name}' ===")
+            for group in duplicate_name_groups:
+                addresses_with_name = [self.addresses[i] for i in group]
+                dup_name = addresses_with_name[0].get('name')
+                self._report_detail('address_name', f"=== 중복된 Address name '{dup_name}' ===", console=f"\n🔴 중복된 Address name '{dup_name}':")
                 
                 for i, addr in enumerate(addresses_with_name):
                     addr_info = f"  {i+1}. ID: {addr.get('id')}, Pos: ({addr.get('pos', {}).get('x')}, {addr.get('pos', {}).get('y')}, {addr.get('pos', {}).get('z')})"
-                    print(addr_info)
-                    self.logger.error(addr_info)
+                    self._report_detail('address_name', addr_info, console=True)
+            self._report_suppressed('address_name')
         else:
             print("✅ Address name 중복 없음")
             self.logger.info("Address name 중복 없음")
         
         # position 중복 체크 및 보고
-        seen_positions = {}
-        duplicate_positions_list = []
-        
-        for addr in self.addresses:
-            pos = addr.get('pos', {})
-            pos_str = f"({pos.get('x')}, {pos.get('y')}, {pos.get('z')})"
-            
-            if pos_str not in seen_positions:
-                seen_positions[pos_str] = [addr]
-            else:
-                seen_positions[pos_str].append(addr)
-                duplicate_positions_list.append(pos_str)
+        duplicate_position_groups = duplicates['positions']
         
-        if duplicate_positions_list:
+        if duplicate_position_groups:
             has_errors = True
-            print(f"❌ ERROR: 중복된 Address position 발견: {len(set(duplicate_positions_list))}개 위치")
-            self.logger.error(f"중복된 Address position 발견: {len(set(duplicate_positions_list))}개 위치")
+            print(f"❌ ERROR: 중복된 Address position 발견: {len(duplicate_position_groups)}개 위치")
+            self.logger.error(f"중복된 Address position 발견: {len(duplicate_position_groups)}개 위치")
             
-            for pos_str in set(duplicate_positions_list):
-                addresses_at_pos = seen_positions[pos_str]
-                print(f"\n🔴 위치 {pos_str}에 있는 중복 Addresses ({len(addresses_at_pos)}개):")
-                self.logger.error(f"=== 위치 {pos_str}에 있는 중복 Addresses ({len(addresses_at_pos)}개) ===")
+            for group in duplicate_position_groups:
+                addresses_at_pos = [self.addresses[i] for i in group]
+                pos = addresses_at_pos[0].get('pos', {})
+                pos_str = f"({pos.get('x')}, {pos.get('y')}, {pos.get('z')})"
+                self._report_detail('address_position', f"=== 위치 {pos_str}에 있는 중복 Addresses ({len(addresses_at_pos)}개) ===",
+                                    console=f"\n🔴 위치 {pos_str}에 있는 중복 Addresses ({len(addresses_at_pos)}개):")
                 
                 for i, addr in enumerate(addresses_at_pos):
                     addr_info = f"  {i+1}. ID: {addr.get('id')}, Name: {addr.get('name')}"
-                    print(addr_info)
-                    self.logger.error(addr_info)
+                    self._report_detail('address_position', addr_info, console=True)
+            self._report_suppressed('address_position')
         else:
             print("✅ Address position 중복 없음")
             self.logger.info("Address position 중복 없음")
         
+        limit = self.report_sample_limit
+        self._record_result(
+            'address_duplicate_ids', not duplicate_id_groups, len(duplicate_id_groups),
+            ids=[self.addresses[group[0]].get('id') for group in duplicate_id_groups],
+            samples=[{'id': self.addresses[group[0]].get('id'), 'names': [self.addresses[i].get('name') for i in group]}
+                     for group in duplicate_id_groups[:limit]]
+        )
+        self._record_result(
+            'address_duplicate_names', not duplicate_name_groups, len(duplicate_name_groups),
+            ids=[[self.addresses[i].get('id') for i in group] for group in duplicate_name_groups],
+            samples=[{'name': self.addresses[group[0]].get('name'), 'ids': [self.addresses[i].get('id') for i in group]}
+                     for group in duplicate_name_groups[:limit]]
+        )
+        self._record_result(
+            'address_duplicate_positions', not duplicate_position_groups, len(duplicate_position_groups),
+            ids=[[self.addresses[i].get('id') for i in group] for group in duplicate_position_groups],
+            samples=[{'pos': self._pos_list(self.addresses[group[0]]), 'ids': [self.addresses[i].get('id') for i in group]}
+                     for group in duplicate_position_groups[:limit]]
+        )
+        
         if has_errors:
             print("❌ Addresses 중복 오류 발견!")
             self.logger.error("Addresses 중복 오류 발견!")
@@ -198,6 +381,47 @@ class DataChecker:
         
         return not has_errors
     
+    def check_and_report_near_duplicate_positions(self, tolerance=None):
+        """서로 tolerance 이내에 있는 (좌표가 정확히 같지는 않은) Address 클러스터를 찾아 Error로 보고합니다."""
+        if tolerance is None:
+            tolerance = DUPLICATE_POSITION_TOLERANCE
+        print(f"\n🔍 Address 근접 위치 검사 중... (허용 오차: {tolerance})")
+        self.logger.info(f"Address 근접 위치 검사 시작 - 허용 오차: {tolerance}")
+        
+        if tolerance == DUPLICATE_POSITION_TOLERANCE:
+            cluster_rows = self._get_finding('near_duplicate_positions')
+        else:
+            cluster_rows = find_near_duplicate_positions(CheckTables(self.addresses, []), tolerance)
+        clusters = [[self.addresses[i] for i in rows] for rows in cluster_rows]
+        
+        if clusters:
+            print(f"❌ ERROR: 근접 위치 Address 클러스터 발견: {len(clusters)}개")
+            self.logger.error(f"근접 위치 Address 클러스터 발견: {len(clusters)}개 (허용 오차: {tolerance})")
+            
+            for n, cluster in enumerate(clusters):
+                header = f"=== 근접 클러스터 {n+1} ({len(cluster)}개) ==="
+                self._report_detail('near_duplicate_positions', header, console=f"\n🔴 근접 클러스터 {n+1} ({len(cluster)}개):" if n < 5 else None)
+                for i, addr in enumerate(cluster):
+                    pos = addr.get('pos', {})
+                    addr_info = f"  {i+1}. ID: {addr.get('id')}, Name: {addr.get('name')}, Pos: ({pos.get('x')}, {pos.get('y')}, {pos.get('z')})"
+                    self._report_detail('near_duplicate_positions', addr_info, console=n < 5)
+            if len(clusters) > 5:
+                print(f"     ... 및 {len(clusters) - 5}개 더")
+            self._report_suppressed('near_duplicate_positions')
+        else:
+            print("✅ 근접 위치 Address 없음")
+            self.logger.info("근접 위치 Address 없음")
+        
+        self._record_result(
+            'near_duplicate_positions', not clusters, len(clusters),
+            ids=[[addr.get('id') for addr in cluster] for cluster in clusters],
+            samples=[[{'id': addr.get('id'), 'pos': self._pos_list(addr)} for addr in cluster]
+                     for cluster in clusters[:self.report_sample_limit]],
+            tolerance=tolerance
+        )
+        
+        return not clusters
+    
     def check_and_report_duplicate_lines(self):
         """Lines의 중복을 체크하고 Error로 보고합니다."""
         print("\n🔍 Lines 중복 검사 중...")
@@ -205,66 +429,63 @@ class DataChecker:
         
         has_errors = False
         
-        # ID 중복 체크 및 보고
-        seen_ids = {}
-        duplicate_line_ids_list = []
+        duplicates = self._get_finding('line_duplicates')
         
-        for line in self.lines:
-            line_id = line.get('id')
-            if line_id not in seen_ids:
-                seen_ids[line_id] = [line]
-            else:
-                seen_ids[line_id].append(line)
-                duplicate_line_ids_list.append(line_id)
+        # ID 중복 체크 및 보고
+        duplicate_id_groups = duplicates['ids']
         
-        if duplicate_line_ids_list:
+        if duplicate_id_groups:
             has_errors = True
-            print(f"❌ ERROR: 중복된 Line ID 발견: {len(set(duplicate_line_ids_list))}개")
-            self.logger.error(f"중복된 Line ID 발견: {len(set(duplicate_line_ids_list))}개")
+            print(f"❌ ERROR: 중복된 Line ID 발견: {len(duplicate_id_groups)}개")
+            self.logger.error(f"중복된 Line ID 발견: {len(duplicate_id_groups)}개")
             
-            for dup_id in set(duplicate_line_ids_list):
-                lines_with_id = seen_ids[dup_id]
-                print(f"\n🔴 중복된 Line ID {dup_id}:")
-                self.logger.error(f"=== 중복된 Line ID {dup_id} ===")
+            for group in duplicate_id_groups:
+                lines_with_id = [self.lines[i] for i in group]
+                dup_id = lines_with_id[0].get('id')
+                self._report_detail('line_id', f"=== 중복된 Line ID {dup_id} ===", console=f"\n🔴 중복된 Line ID {dup_id}:")
                 
                 for i, line in enumerate(lines_with_id):
                     line_info = f"  {i+1}. Name: {line.get('name')}, From: {line.get('fromAddress')}, To: {line.get('toAddress')}"
-                    print(line_info)
-                    self.logger.error(line_info)
+                    self._report_detail('line_id', line_info, console=True)
+            self._report_suppressed('line_id')
         else:
             print("✅ Line ID 중복 없음")
             self.logger.info("Line ID 중복 없음")
         
         # name 중복 체크 및 보고
-        seen_names = {}
-        duplicate_line_names_list = []
-        
-        for line in self.lines:
-            line_name = line.get('name')
-            if line_name not in seen_names:
-                seen_names[line_name] = [line]
-            else:
-                seen_names[line_name].append(line)
-                duplicate_line_names_list.append(line_name)
+        duplicate_name_groups = duplicates['names']
         
-        if duplicate_line_names_list:
+        if duplicate_name_groups:
             has_errors = True
-            print(f"❌ ERROR: 중복된 Line name 발견: {len(set(duplicate_line_names_list))}개")
-            self.logger.error(f"중복된 Line name 발견: {len(set(duplicate_line_names_list))}개")
+            print(f"❌ ERROR: 중복된 Line name 발견: {len(duplicate_name_groups)}개")
+            self.logger.error(f"중복된 Line name 발견: {len(duplicate_name_groups)}개")
             
-            for dup_name in set(duplicate_line_names_list):
-                lines_with_name = seen_names[dup_name]
-                print(f"\n🔴 중복된 Line name '{dup_name}':")
-                self.logger.error(f"=== 중복된 Line name '{dup_name}' ===")
+            for group in duplicate_name_groups:
+                lines_with_name = [self.lines[i] for i in group]
+                dup_name = lines_with_name[0].get('name')
+                self._report_detail('line_name', f"=== 중복된 Line name '{dup_name}' ===", console=f"\n🔴 중복된 Line name '{dup_name}':")
                 
                 for i, line in enumerate(lines_with_name):
                     line_info = f"  {i+1}. ID: {line.get('id')}, From: {line.get('fromAddress')}, To: {line.get('toAddress')}"
-                    print(line_info)
-                    self.logger.error(line_info)
+                    self._report_detail('line_name', line_info, console=True)
+            self._report_suppressed('line_name')
         else:
             print("✅ Line name 중복 없음")
             self.logger.info("Line name 중복 없음")
         
+        limit = self.report_sample_limit
+        line_sample = lambda line: {'id': line.get('id'), 'name': line.get('name'), 'from': line.get('fromAddress'), 'to': line.get('toAddress')}
+        self._record_result(
+            'line_duplicate_ids', not duplicate_id_groups, len(duplicate_id_groups),
+            ids=[self.lines[group[0]].get('id') for group in duplicate_id_groups],
+            samples=[[line_sample(self.lines[i]) for i in group] for group in duplicate_id_groups[:limit]]
+        )
+        self._record_result(
+            'line_duplicate_names', not duplicate_name_groups, len(duplicate_name_groups),
+            ids=[[self.lines[i].get('id') for i in group] for group in duplicate_name_groups],
+            samples=[[line_sample(self.lines[i]) for i in group] for group in duplicate_name_groups[:limit]]
+        )
+        
         if has_errors:
             print("❌ Lines 중복 오류 발견!")
             self.logger.error("Lines 중복 오류 발견!")
@@ -274,46 +495,168 @@ class DataChecker:
         
         return not has_errors
     
+    def check_and_report_line_references(self):
+        """lines의 fromAddress/toAddress가 존재하는지, fromPos/toPos가 address 좌표와 일치하는지 검사합니다.
+        
+        repair_line_positions가 True면 불일치한 좌표를 address 테이블 값으로 한 번에 다시 씁니다.
+        """
+        print(f"\n🔍 Lines 참조/좌표 검사 중... (허용 오차: {LINE_POSITION_TOLERANCE})")
+        self.logger.info(f"Lines 참조/좌표 검사 시작 - 허용 오차: {LINE_POSITION_TOLERANCE}")
+        
+        references = self._get_finding('line_references')
+        dangling_rows = sorted(set(references['dangling_from']) | set(references['dangling_to']))
+        stale_rows = sorted(set(references['stale_from']) | set(references['stale_to']))
+        dangling_from = set(references['dangling_from'])
+        dangling_to = set(references['dangling_to'])
+        
+        if dangling_rows:
+            print(f"❌ ERROR: 존재하지 않는 Address를 참조하는 Lines 발견: {len(dangling_rows)}개")
+            self.logger.error(f"존재하지 않는 Address를 참조하는 Lines 발견: {len(dangling_rows)}개")
+            for n, idx in enumerate(dangling_rows):
+                line = self.lines[idx]
+                missing = [f"{key}={line.get(key)}" for key, rows in (('fromAddress', dangling_from), ('toAddress', dangling_to)) if idx in rows]
+                detail = f"잘못된 참조 {n+1}: Line(ID={line.get('id')}, Name={line.get('name')}) - 없는 Address: {', '.join(missing)}"
+                self._report_detail('dangling_references', detail, console=f"   🔴 {detail}" if n < 5 else None)
+            if len(dangling_rows) > 5:
+                print(f"     ... 및 {len(dangling_rows) - 5}개 더")
+            self._report_suppressed('dangling_references')
+        else:
+            print("✅ 잘못된 Address 참조 없음")
+            self.logger.info("잘못된 Address 참조 없음")
+        
+        if stale_rows:
+            print(f"❌ ERROR: fromPos/toPos가 Address 좌표와 다른 Lines 발견: {len(stale_rows)}개")
+            self.logger.error(f"fromPos/toPos가 Address 좌표와 다른 Lines 발견: {len(stale_rows)}개")
+            stale_from = set(references['stale_from'])
+            stale_to = set(references['stale_to'])
+            for n, idx in enumerate(stale_rows):
+                line = self.lines[idx]
+                parts = []
+                for key, pos_key, rows in (('fromAddress', 'fromPos', stale_from), ('toAddress', 'toPos', stale_to)):
+                    if idx in rows:
+                        copy = line.get(pos_key) or {}
+                        actual = self._pos_list(self.address_index[line.get(key)])
+                        parts.append(f"{pos_key}=({copy.get('x')}, {copy.get('y')}, {copy.get('z')}) vs Address {line.get(key)}=({actual[0]}, {actual[1]}, {actual[2]})")
+                detail = f"좌표 불일치 {n+1}: Line(ID={line.get('id')}, Name={line.get('name')}) - {'; '.join(parts)}"
+                self._report_detail('stale_positions', detail, console=f"   🔴 {detail}" if n < 5 else None)
+            if len(stale_rows) > 5:
+                print(f"     ... 및 {len(stale_rows) - 5}개 더")
+            self._report_suppressed('stale_positions')
+        else:
+            print("✅ fromPos/toPos 불일치 없음")
+            self.logger.info("fromPos/toPos 불일치 없음")
+        
+        repaired = 0
+        if stale_rows and self.repair_line_positions:
+            repaired = self.repair_stale_line_positions(references)
+        
+        limit = self.report_sample_limit
+        self._record_result(
+            'dangling_references', not dangling_rows, len(dangling_rows),
+            ids=[self.lines[idx].get('id') for idx in dangling_rows],
+            samples=[{'id': self.lines[idx].get('id'), 'from': self.lines[idx].get('fromAddress'), 'to': self.lines[idx].get('toAddress')}
+                     for idx in dangling_rows[:limit]]
+        )
+        self._record_result(
+            'stale_positions', not stale_rows or repaired > 0, len(stale_rows),
+            ids=[self.lines[idx].get('id') for idx in stale_rows],
+            samples=[{'id': self.lines[idx].get('id'), 'from': self.lines[idx].get('fromAddress'), 'to': self.lines[idx].get('toAddress')}
+                     for idx in stale_rows[:limit]],
+            tolerance=LINE_POSITION_TOLERANCE, repaired=repaired
+        )
+        
+        return not dangling_rows and (not stale_rows or repaired > 0)
+    
+    def repair_stale_line_positions(self, references=None):
+        """불일치한 fromPos/toPos를 address 테이블 좌표로 다시 씁니다. 수정한 line 수를 반환합니다."""
+        if references is None:
+            references = self._get_finding('line_references')
+        
+        repaired_rows = set()
+        for key, pos_key, rows in (('fromAddress', 'fromPos', references['stale_from']), ('toAddress', 'toPos', references['stale_to'])):
+            for idx in rows:
+                line = self.lines[idx]
+                x, y, z = self._pos_list(self.address_index[line.get(key)])
+                line[pos_key] = {'x': x, 'y': y, 'z': z}
+                repaired_rows.add(idx)
+        
+        # fromPos/toPos를 읽는 엔진 결과는 line_references뿐이므로 그 결과만 수정 후 상태로 바꿈
+        if 'line_references' in self.findings:
+            self.findings['line_references'] = dict(references, stale_from=[], stale_to=[])
+        
+        print(f"🔧 fromPos/toPos 수정 완료: {len(repaired_rows)}개 Lines")
+        self.logger.info(f"fromPos/toPos를 Address 좌표로 수정: {len(repaired_rows)}개 Lines")
+        return len(repaired_rows)
+    
+    def scan_line_overlaps(self):
+        """canonical (min(from, to), max(from, to)) 키로 한 번만 순회하여 겹치는 Lines를 찾습니다.
+        
+        반환값:
+            overlaps: 모든 겹침 쌍 (i, j, 겹침 종류) - i < j, (i, j) 순서
+            first_overlaps: 그룹의 첫 번째 line과 나머지 line의 쌍 - 삭제 로그용
+            duplicates: 삭제 대상 line 인덱스 (각 그룹의 첫 번째 line 제외)
+        """
+        overlaps = []
+        first_overlaps = []
+        duplicates = []
+        for indices in self._get_finding('line_overlaps'):
+            first = indices[0]
+            for pos, i in enumerate(indices):
+                for j in indices[pos + 1:]:
+                    overlaps.append((i, j, self._overlap_type(self.lines[i], self.lines[j])))
+            for j in indices[1:]:
+                first_overlaps.append((first, j, self._overlap_type(self.lines[first], self.lines[j])))
+                duplicates.append(j)
+        
+        overlaps.sort()
+        first_overlaps.sort()
+        duplicates.sort()
+        
+        self._overlap_scan = {
+            'overlaps': overlaps,
+            'first_overlaps': first_overlaps,
+            'duplicates': duplicates
+        }
+        return self._overlap_scan
+    
+    def _overlap_type(self, line1, line2):
+        """두 line의 겹침 종류를 반환합니다. (동일한 연결 / 역방향 연결)"""
+        is_identical = (line1.get('fromAddress') == line2.get('fromAddress') and line1.get('toAddress') == line2.get('toAddress'))
+        return "동일한 연결" if is_identical else "역방향 연결"
+    
+    def _get_overlap_scan(self):
+        """직전 스캔 결과가 있으면 재사용합니다. (lines가 바뀌면 invalidate_findings / _apply_line_removal에서 비움)"""
+        if self._overlap_scan is None:
+            return self.scan_line_overlaps()
+        return self._overlap_scan
+    
     def check_and_report_line_overlaps(self):
         """Lines가 겹치는 경우를 찾고 Error로 보고합니다."""
         print("\n🔍 Lines 겹침 검사 중...")
         self.logger.info("Lines 겹침 검사 시작")
         
+        # 겹침 조건:
+        # 1. 동일한 연결: (from1, to1) == (from2, to2)
+        # 2. 역방향 연결: (from1, to1) == (to2, from2)
         overlaps = []
-        
-        for i, line1 in enumerate(self.lines):
-            for j, line2 in enumerate(self.lines[i+1:], i+1):
-                # line1의 연결 정보
-                line1_from = line1.get('fromAddress')
-                line1_to = line1.get('toAddress')
-                
-                # line2의 연결 정보
-                line2_from = line2.get('fromAddress')
-                line2_to = line2.get('toAddress')
-                
-                # 겹침 조건 확인:
-                # 1. 동일한 연결: (from1, to1) == (from2, to2)
-                # 2. 역방향 연결: (from1, to1) == (to2, from2)
-                is_identical = (line1_from == line2_from and line1_to == line2_to)
-                is_reverse = (line1_from == line2_to and line1_to == line2_from)
-                
-                if is_identical or is_reverse:
-                    overlap_type = "동일한 연결" if is_identical else "역방향 연결"
-                    overlaps.append({
-                        'line1': {
-                            'id': line1.get('id'),
-                            'name': line1.get('name'),
-                            'from': line1_from,
-                            'to': line1_to
-                        },
-                        'line2': {
-                            'id': line2.get('id'),
-                            'name': line2.get('name'),
-                            'from': line2_from,
-                            'to': line2_to
-                        },
-                        'type': overlap_type
-                    })
+        for i, j, overlap_type in self.scan_line_overlaps()['overlaps']:
+            line1 = self.lines[i]
+            line2 = self.lines[j]
+            overlaps.append({
+                'line1': {
+                    'id': line1.get('id'),
+                    'name': line1.get('name'),
+                    'from': line1.get('fromAddress'),
+                    'to': line1.get('toAddress')
+                },
+                'line2': {
+                    'id': line2.get('id'),
+                    'name': line2.get('name'),
+                    'from': line2.get('fromAddress'),
+                    'to': line2.get('toAddress')
+                },
+                'type': overlap_type
+            })
         
         if overlaps:
             print(f"❌ ERROR: 겹치는 Lines 발견: {len(overlaps)}개")
@@ -323,7 +666,8 @@ class DataChecker:
             self.logger.error(f"=== 겹침 상세 정보 ===")
             for i, overlap in enumerate(overlaps):
                 overlap_detail = f"겹침 {i+1} ({overlap['type']}): Line1(ID={overlap['line1']['id']}, Name={overlap['line1']['name']}, From={overlap['line1']['from']}, To={overlap['line1']['to']}) vs Line2(ID={overlap['line2']['id']}, Name={overlap['line2']['name']}, From={overlap['line2']['from']}, To={overlap['line2']['to']})"
-                self.logger.error(overlap_detail)
+                self._report_detail('line_overlaps', overlap_detail)
+            self._report_suppressed('line_overlaps')
             
             # 화면에는 처음 5개만 출력
             for i, overlap in enumerate(overlaps[:5]):
@@ -340,60 +684,58 @@ class DataChecker:
             print("✅ Lines 겹침 없음")
             self.logger.info("Lines 겹침 없음")
         
+        self._record_result(
+            'line_overlaps', not overlaps, len(overlaps),
+            ids=[[overlap['line1']['id'], overlap['line2']['id']] for overlap in overlaps],
+            samples=overlaps[:self.report_sample_limit]
+        )
+        
         return len(overlaps) == 0
     
     def remove_overlapping_lines(self):
-        """겹치는 라인을 삭제합니다."""
+        """겹치는 라인을 삭제합니다. (각 겹침 그룹의 첫 번째 line만 유지)"""
         print("\n🗑️ 겹치는 Lines 삭제 중...")
         self.logger.info("겹치는 Lines 삭제 시작")
         
         original_count = len(self.lines)
-        lines_to_remove = set()
+        scan = self._get_overlap_scan()
+        lines_to_remove = set(scan['duplicates'])
         
-        # 겹치는 라인 찾기
-        for i, line1 in enumerate(self.lines):
-            if i in lines_to_remove:  # 이미 삭제 대상인 경우 스킵
-                continue
-                
-            for j, line2 in enumerate(self.lines[i+1:], i+1):
-                if j in lines_to_remove:  # 이미 삭제 대상인 경우 스킵
-                    continue
-                    
-                # line1의 연결 정보
-                line1_from = line1.get('fromAddress')
-                line1_to = line1.get('toAddress')
-                
-                # line2의 연결 정보
-                line2_from = line2.get('fromAddress')
-                line2_to = line2.get('toAddress')
-                
-                # 겹침 조건 확인
-                is_identical = (line1_from == line2_from and line1_to == line2_to)
-                is_reverse = (line1_from == line2_to and line1_to == line2_from)
-                
-                if is_identical or is_reverse:
-                    # 나중에 나온 라인(line2)을 삭제 대상으로 추가
-                    lines_to_remove.add(j)
-                    
-                    overlap_type = "동일한 연결" if is_identical else "역방향 연결"
-                    self.logger.info(f"겹침 발견 및 삭제 대상 추가: Line1(ID={line1.get('id')}, Name={line1.get('name')}) vs Line2(ID={line2.get('id')}, Name={line2.get('name')}) - {overlap_type}")
+        # 나중에 나온 라인을 삭제 대상으로 추가
+        for i, j, overlap_type in scan['first_overlaps']:
+            line1 = self.lines[i]
+            line2 = self.lines[j]
+            self._report_detail('overlap_removal_pairs', f"겹침 발견 및 삭제 대상 추가: Line1(ID={line1.get('id')}, Name={line1.get('name')}) vs Line2(ID={line2.get('id')}, Name={line2.get('name')}) - {overlap_type}", level=logging.INFO)
+        self._report_suppressed('overlap_removal_pairs', level=logging.INFO)
         
         # 삭제할 라인 정보 로깅
         if lines_to_remove:
             self.logger.info(f"=== 삭제 대상 Lines 정보 ===")
-            for idx in sorted(lines_to_remove):
+            for idx in scan['duplicates']:
                 line = self.lines[idx]
                 delete_info = f"삭제 대상: ID={line.get('id')}, Name={line.get('name')}, From={line.get('fromAddress')}, To={line.get('toAddress')}"
-                self.logger.info(delete_info)
+                self._report_detail('overlap_removal_targets', delete_info, level=logging.INFO)
+            self._report_suppressed('overlap_removal_targets', level=logging.INFO)
         
-        # 겹치는 라인 삭제 (역순으로 삭제하여 인덱스 변화 방지)
-        for idx in sorted(lines_to_remove, reverse=True):
-            removed_line = self.lines.pop(idx)
-            print(f"   🗑️ 삭제된 Line: ID={removed_line.get('id')}, Name={removed_line.get('name')}")
-            print(f"      From={removed_line.get('fromAddress')}, To={removed_line.get('toAddress')}")
+        # 겹치는 라인 삭제 (출력은 기존과 같이 역순)
+        for idx in reversed(scan['duplicates']):
+            removed_line = self.lines[idx]
+            self._report_detail('removed_lines', f"삭제된 Line: ID={removed_line.get('id')}, Name={removed_line.get('name')}, From={removed_line.get('fromAddress')}, To={removed_line.get('toAddress')}",
+                                level=logging.INFO,
+                                console=f"   🗑️ 삭제된 Line: ID={removed_line.get('id')}, Name={removed_line.get('name')}\n      From={removed_line.get('fromAddress')}, To={removed_line.get('toAddress')}")
+        self._report_suppressed('removed_lines', level=logging.INFO)
+        if lines_to_remove:
+            removed_lines = [self.lines[idx] for idx in scan['duplicates']]
+            self.lines[:] = [line for idx, line in enumerate(self.lines) if idx not in lines_to_remove]
+            self._apply_line_removal(scan['duplicates'], removed_lines)
         
         removed_count = len(lines_to_remove)
         remaining_count = len(self.lines)
+        self._record_result(
+            'overlap_removal', True, removed_count,
+            ids=[line.get('id') for line in removed_lines] if lines_to_remove else [],
+            original_count=original_count, remaining_count=remaining_count
+        )
         
         print(f"✅ 겹치는 Lines 삭제 완료:")
         print(f"   원본 Lines 수: {original_count}개")
@@ -404,29 +746,166 @@ class DataChecker:
         
         return removed_count > 0
     
+    def check_and_report_segment_intersections(self):
+        """같은 Z 레이어의 line 선분이 물리적으로 교차하거나 같은 직선 위에서 겹치는 경우를 찾습니다.
+        
+        endpoint 연결 단계가 만든 line에서도 나올 수 있어 경고로만 보고하며, 전체 결과를 실패로 만들지 않습니다.
+        """
+        print("\n🔍 Lines 기하 교차/겹침 검사 중...")
+        self.logger.info("Lines 기하 교차/겹침 검사 시작")
+        
+        # Z 레이어별 선분 검사 결과 (address 테이블의 현재 좌표 사용, 삭제될 겹침 line 제외)
+        intersections = self._get_finding('segment_intersections')
+        crossings = intersections['crossings']
+        collinear_overlaps = intersections['collinear_overlaps']
+        
+        for label, category, found in (("교차", 'segment_crossings', crossings), ("동일선상 겹침", 'segment_collinear_overlaps', collinear_overlaps)):
+            if not found:
+                print(f"✅ Lines {label} 없음")
+                self.logger.info(f"Lines {label} 없음")
+                continue
+            
+            print(f"⚠️ WARNING: {label} Lines 발견: {len(found)}개")
+            self.logger.warning(f"{label} Lines 발견: {len(found)}개")
+            for n, (z_value, i, j) in enumerate(found):
+                line1 = self.lines[i]
+                line2 = self.lines[j]
+                detail = f"{label} {n+1} (Z={z_value}): Line1(ID={line1.get('id')}, From={line1.get('fromAddress')}, To={line1.get('toAddress')}) vs Line2(ID={line2.get('id')}, From={line2.get('fromAddress')}, To={line2.get('toAddress')})"
+                self._report_detail(category, detail, level=logging.WARNING, console=f"   🟡 {detail}" if n < 5 else None)
+            if len(found) > 5:
+                print(f"     ... 및 {len(found) - 5}개 더")
+            self._report_suppressed(category, level=logging.WARNING)
+        
+        for category, found in (('segment_crossings', crossings), ('segment_collinear_overlaps', collinear_overlaps)):
+            self._record_result(
+                category, not found, len(found),
+                ids=[[self.lines[i].get('id'), self.lines[j].get('id')] for _, i, j in found],
+                samples=[{'z': z_value, 'line1': self.lines[i].get('id'), 'line2': self.lines[j].get('id')}
+                         for z_value, i, j in found[:self.report_sample_limit]]
+            )
+        
+        return not crossings and not collinear_overlaps
+    
+    def check_and_report_connectivity(self):
+        """address 그래프의 연결 요소(방향 무시)와 강연결 요소(line 방향 기준)를 검사합니다.
+        
+        연결 요소가 2개 이상이면 서로 오갈 수 없는 섬이 있으므로 Error로 보고하고,
+        강연결 요소는 방향을 고려한 도달 가능성 정보로 Warning/Info로만 보고합니다.
+        """
+        print("\n🔍 그래프 연결성 검사 중...")
+        self.logger.info("그래프 연결성 검사 시작")
+        
+        connectivity = self._get_finding('connectivity')
+        components = connectivity['components']
+        strong_components = connectivity['strong_components']
+        
+        # 1. 연결 요소 (union-find, 방향 무시)
+        if len(components) <= 1:
+            print("✅ 모든 Address가 하나의 연결 요소에 속함")
+            self.logger.info(f"연결 요소: {len(components)}개 - 모든 Address 연결됨")
+        else:
+            isolated = sum(1 for component in components if component['size'] == 1)
+            print(f"❌ ERROR: 연결 요소 {len(components)}개 발견 (최대 요소: {components[0]['size']}개, 고립 Address: {isolated}개)")
+            self.logger.error(f"연결 요소 {len(components)}개 발견 - 최대 요소: {components[0]['size']}개, 고립 Address: {isolated}개")
+            for n, component in enumerate(components):
+                detail = f"연결 요소 {n+1}: 크기={component['size']}, 대표 Address={component['representative']}"
+                self._report_detail('connected_components', detail, console=f"   🔴 {detail}" if n < 5 else None)
+            if len(components) > 5:
+                print(f"     ... 및 {len(components) - 5}개 더")
+            self._report_suppressed('connected_components')
+        
+        # 2. 강연결 요소 (반복형 Tarjan, line 방향 기준)
+        largest_strong = strong_components[0]['size'] if strong_components else 0
+        nontrivial = [component for component in strong_components if component['size'] > 1]
+        outside_largest = sum(component['size'] for component in strong_components[1:])
+        print(f"📊 강연결 요소(방향 기준): {len(strong_components)}개 (최대 요소: {largest_strong}개, 크기 2 이상: {len(nontrivial)}개)")
+        self.logger.info(f"강연결 요소: {len(strong_components)}개 - 최대 요소: {largest_strong}개, 크기 2 이상: {len(nontrivial)}개")
+        # 크기 2 이상인 요소가 없으면(순환 없는 한 방향 line 배치) 모든 Address가 따로 떨어지는 것이 정상이므로 Info로만 기록
+        if outside_largest and nontrivial:
+            print(f"⚠️ WARNING: 최대 강연결 요소 밖의 Address: {outside_largest}개 (방향을 따라 서로 왕복할 수 없음)")
+            self.logger.warning(f"최대 강연결 요소 밖의 Address: {outside_largest}개")
+        elif outside_largest:
+            self.logger.info(f"최대 강연결 요소 밖의 Address: {outside_largest}개 (크기 2 이상인 강연결 요소 없음)")
+        for n, component in enumerate(nontrivial):
+            self._report_detail('strong_components', f"강연결 요소 {n+1}: 크기={component['size']}, 대표 Address={component['representative']}", level=logging.INFO)
+        self._report_suppressed('strong_components', level=logging.INFO)
+        
+        limit = self.report_sample_limit
+        self._record_result(
+            'connected_components', len(components) <= 1, len(components),
+            ids=[component['representative'] for component in components],
+            samples=[{'size': component['size'], 'representative': component['representative'], 'members': component['members'][:limit]}
+                     for component in components[:limit]],
+            sizes=[component['size'] for component in components]
+        )
+        self._record_result(
+            'strong_components', True, len(strong_components),
+            ids=[component['representative'] for component in nontrivial],
+            samples=[{'size': component['size'], 'representative': component['representative']} for component in nontrivial[:limit]],
+            largest=largest_strong, outside_largest=outside_largest,
+            sizes=[component['size'] for component in nontrivial]
+        )
+        
+        return len(components) <= 1
+    
+    def compute_degree_histogram(self):
+        """모든 address의 연결 수 분포를 한 번의 카운팅 패스로 계산합니다.
+        
+        반환값:
+            degrees: {연결 수: address 개수} (line에만 등장하는 미등록 address 포함)
+            bins: DEGREE_HISTOGRAM_BINS 구간별 address 개수 ('0', '1', ..., '4+')
+        """
+        address_degrees = self._get_finding('degrees')
+        degrees = Counter()
+        for addr_id in self.address_index:
+            degrees[address_degrees.get(addr_id, 0)] += 1
+        for addr_id, count in address_degrees.items():
+            if addr_id not in self.address_index:
+                degrees[count] += 1
+        
+        bounds = self.degree_histogram_bins
+        bins = {}
+        for i, low in enumerate(bounds):
+            high = bounds[i + 1] if i + 1 < len(bounds) else None
+            if high is None:
+                label = f"{low}+"
+                total = sum(count for degree, count in degrees.items() if degree >= low)
+            elif high - low == 1:
+                label = f"{low}"
+                total = degrees.get(low, 0)
+            else:
+                label = f"{low}-{high - 1}"
+                total = sum(count for degree, count in degrees.items() if low <= degree < high)
+            bins[label] = total
+        
+        self.degree_histogram = {
+            'degrees': dict(sorted(degrees.items())),
+            'bins': bins
+        }
+        return self.degree_histogram
+    
     def find_highly_connected_addresses(self):
-        """4개 이상 연결된 address를 찾아서 출력합니다."""
+        """HIGHLY_CONNECTED_THRESHOLD개 이상 연결된 address를 찾아서 출력합니다."""
+        threshold = self.highly_connected_threshold
         print("\n🔍 고연결 Addresses 검사 중...")
         self.logger.info("고연결 Addresses 검사 시작")
         
-        # 각 address의 연결 횟수 계산
-        address_connections = defaultdict(int)
+        # 연결 수 분포
+        histogram = self.compute_degree_histogram()
+        histogram_str = ", ".join(f"{label}: {count}개" for label, count in histogram['bins'].items())
+        print(f"📊 연결 수 분포: {histogram_str}")
+        self.logger.info(f"연결 수 분포: {histogram_str}")
+        self.logger.info(f"연결 수별 Address 수: {histogram['degrees']}")
         
-        for line in self.lines:
-            from_addr = line.get('fromAddress')
-            to_addr = line.get('toAddress')
-            
-            if from_addr:
-                address_connections[from_addr] += 1
-            if to_addr:
-                address_connections[to_addr] += 1
+        # 각 address의 연결 횟수 (검사 엔진의 degree 카운터 사용)
+        address_connections = self._get_finding('degrees')
         
-        # 4개 이상 연결된 address 찾기
-        highly_connected = {addr_id: count for addr_id, count in address_connections.items() if count >= 4}
+        # threshold개 이상 연결된 address 찾기
+        highly_connected = {addr_id: count for addr_id, count in address_connections.items() if count >= threshold}
         
         if highly_connected:
-            print(f"📊 4개 이상 연결된 Addresses: {len(highly_connected)}개")
-            self.logger.info(f"4개 이상 연결된 Addresses: {len(highly_connected)}개")
+            print(f"📊 {threshold}개 이상 연결된 Addresses: {len(highly_connected)}개")
+            self.logger.info(f"{threshold}개 이상 연결된 Addresses: {len(highly_connected)}개")
             
             # 연결 횟수별로 정렬
             sorted_connected = sorted(highly_connected.items(), key=lambda x: x[1], reverse=True)
@@ -434,17 +913,18 @@ class DataChecker:
             # 모든 고연결 주소 정보를 로그에 저장
             self.logger.info(f"=== 고연결 Addresses 상세 정보 ===")
             for addr_id, connection_count in sorted_connected:
-                addr_info = next((addr for addr in self.addresses if addr.get('id') == addr_id), None)
+                addr_info = self.address_index.get(addr_id)
                 if addr_info:
                     pos = addr_info.get('pos', {})
                     addr_detail = f"고연결 Address: ID={addr_id}, Name={addr_info.get('name')}, Position=({pos.get('x')}, {pos.get('y')}, {pos.get('z')}), 연결수={connection_count}"
-                    self.logger.info(addr_detail)
+                    self._report_detail('highly_connected', addr_detail, level=logging.INFO)
                 else:
-                    self.logger.warning(f"고연결 Address 정보 없음: ID={addr_id}, 연결수={connection_count}")
+                    self._report_detail('highly_connected', f"고연결 Address 정보 없음: ID={addr_id}, 연결수={connection_count}", level=logging.WARNING)
+            self._report_suppressed('highly_connected', level=logging.INFO)
             
             # 화면에는 상위 10개만 출력
             for addr_id, connection_count in sorted_connected[:10]:
-                addr_info = next((addr for addr in self.addresses if addr.get('id') == addr_id), None)
+                addr_info = self.address_index.get(addr_id)
                 if addr_info:
                     pos = addr_info.get('pos', {})
                     print(f"   Address ID={addr_id}, Name={addr_info.get('name')}")
@@ -458,8 +938,17 @@ class DataChecker:
                 print(f"   ... 및 {len(sorted_connected) - 10}개 더")
                 self.logger.info(f"화면 출력 제한으로 인해 {len(sorted_connected) - 10}개 고연결 주소 정보는 로그 파일에서 확인 가능")
         else:
-            print("✅ 4개 이상 연결된 Address 없음")
-            self.logger.info("4개 이상 연결된 Address 없음")
+            print(f"✅ {threshold}개 이상 연결된 Address 없음")
+            self.logger.info(f"{threshold}개 이상 연결된 Address 없음")
+        
+        sorted_connected = sorted(highly_connected.items(), key=lambda x: x[1], reverse=True)
+        self._record_result(
+            'highly_connected', True, len(highly_connected),
+            ids=[addr_id for addr_id, _ in sorted_connected],
+            samples=[{'id': addr_id, 'name': (self.address_index.get(addr_id) or {}).get('name'), 'connections': count}
+                     for addr_id, count in sorted_connected[:self.report_sample_limit]],
+            threshold=threshold, histogram=histogram['bins']
+        )
         
         return highly_connected
     
@@ -505,51 +994,122 @@ class DataChecker:
             self.logger.error(error_msg)
             return False
     
+    def build_report(self, success, error=None, layout_saved=None):
+        """검사 결과를 JSON으로 저장할 수 있는 dict로 정리합니다."""
+        suppressed = {}
+        for category, counts in self.detail_counts.items():
+            log_suppressed = max(0, counts['log'] - self.log_limit) if self.log_limit is not None else 0
+            print_suppressed = max(0, counts['print'] - self.print_limit) if self.print_limit is not None else 0
+            if log_suppressed or print_suppressed:
+                suppressed[category] = {'log': log_suppressed, 'print': print_suppressed}
+        
+        self.report = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'input_file': OUTPUT_FILE,
+            'success': success,
+            'error': error,
+            'totals': {
+                'addresses': len(self.addresses),
+                'lines': len(self.lines)
+            },
+            'layout_saved': layout_saved,
+            'check_mode': self.check_mode,
+            'sample_limit': self.report_sample_limit,
+            'checks': self.check_results,
+            'timings': {
+                'steps': self.step_timings,
+                'engine': {name: round(elapsed, 6) for name, elapsed in self.check_timings.items()}
+            },
+            'suppressed': suppressed
+        }
+        return self.report
+    
+    def save_report(self):
+        """검사 리포트를 CHECK_REPORT_FILE에 저장합니다."""
+        try:
+            with open(CHECK_REPORT_FILE, 'w', encoding='utf-8') as f:
+                json.dump(self.report, f, ensure_ascii=False)
+            
+            print(f"✅ 검사 리포트가 {CHECK_REPORT_FILE} 파일에 저장되었습니다.")
+            self.logger.info(f"검사 리포트가 {CHECK_REPORT_FILE} 파일에 저장됨")
+            return True
+            
+        except Exception as e:
+            error_msg = f"{CHECK_REPORT_FILE} 파일 저장 중 오류 발생: {str(e)}"
+            print(f"❌ {error_msg}")
+            self.logger.error(error_msg)
+            return False
+    
     def run_all_checks(self):
         """모든 검증을 실행합니다."""
         print("🚀 데이터 무결성 검사를 시작합니다...")
         
-        if not self.load_output_data():
+        if not self._timed('load', self.load_output_data):
+            self.build_report(False, error=f"{OUTPUT_FILE} 로드 실패")
+            self.save_report()
             return False
         
+        # 0. 독립적인 검사들을 한 번에 병렬 실행 (이후 단계는 결과를 보고만 함)
+        self._timed('engine', self.run_integrity_engine)
+        
         # 1. Addresses 중복 검사 및 보고
-        address_check = self.check_and_report_duplicate_addresses()
+        address_check = self._timed('address_duplicates', self.check_and_report_duplicate_addresses)
+        
+        # 1-1. Address 근접 위치 검사 및 보고
+        near_duplicate_check = self._timed('near_duplicate_positions', self.check_and_report_near_duplicate_positions)
         
         # 2. Lines 중복 검사 및 보고
-        line_check = self.check_and_report_duplicate_lines()
+        line_check = self._timed('line_duplicates', self.check_and_report_duplicate_lines)
+        
+        # 2-1. Lines 참조/좌표 검사 (옵션에 따라 좌표 자동 수정)
+        reference_check = self._timed('line_references', self.check_and_report_line_references)
         
         # 3. Lines 겹침 검사 및 보고
-        overlap_check = self.check_and_report_line_overlaps()
+        overlap_check = self._timed('line_overlaps', self.check_and_report_line_overlaps)
         
         # 4. 겹치는 라인 삭제
-        overlap_removed = self.remove_overlapping_lines()
+        overlap_removed = self._timed('overlap_removal', self.remove_overlapping_lines)
         
-        # 5. 고연결 Addresses 검사
-        highly_connected = self.find_highly_connected_addresses()
+        # 5. 기하 교차/겹침 검사 (경고만, 전체 결과에는 반영하지 않음)
+        geometry_check = self._timed('segment_intersections', self.check_and_report_segment_intersections)
         
-        # 6. layout.json 저장
+        # 5-1. 그래프 연결성 검사
+        connectivity_check = self._timed('connectivity', self.check_and_report_connectivity)
+        
+        # 6. 고연결 Addresses 검사
+        highly_connected = self._timed('highly_connected', self.find_highly_connected_addresses)
+        
+        # 7. layout.json 저장
         print("\n📊 최종 데이터 저장 중...")
-        layout_save_success = self.save_layout_data()
+        layout_save_success = self._timed('layout_save', self.save_layout_data)
         
         # 결과 요약
         print("\n📋 검사 결과 요약:")
         print(f"   Addresses 중복 검사: {'✅ 통과' if address_check else '❌ 오류 발견'}")
+        print(f"   Address 근접 위치 검사: {'✅ 통과' if near_duplicate_check else '❌ 오류 발견'}")
         print(f"   Lines 중복 검사: {'✅ 통과' if line_check else '❌ 오류 발견'}")
+        print(f"   Lines 참조/좌표 검사: {'✅ 통과' if reference_check else '❌ 오류 발견'}")
         print(f"   Lines 겹침 검사: {'✅ 통과' if overlap_check else '❌ 오류 발견'}")
         print(f"   겹치는 Lines 삭제: {'✅ 삭제됨' if overlap_removed else '✅ 삭제할 항목 없음'}")
+        print(f"   Lines 기하 교차/겹침 검사: {'✅ 통과' if geometry_check else '⚠️ 경고 (전체 결과에 미반영)'}")
+        print(f"   그래프 연결성 검사: {'✅ 통과' if connectivity_check else '❌ 오류 발견'}")
         print(f"   고연결 Addresses: {len(highly_connected)}개 발견")
         print(f"   Layout 저장: {'✅ 성공' if layout_save_success else '❌ 실패'}")
         
         # 상세 요약을 로그에 저장
         self.logger.info("=== 최종 검사 결과 요약 ===")
         self.logger.info(f"Addresses 중복 검사: {'통과' if address_check else '오류 발견'}")
+        self.logger.info(f"Address 근접 위치 검사: {'통과' if near_duplicate_check else '오류 발견'}")
         self.logger.info(f"Lines 중복 검사: {'통과' if line_check else '오류 발견'}")
+        self.logger.info(f"Lines 참조/좌표 검사: {'통과' if reference_check else '오류 발견'}")
         self.logger.info(f"Lines 겹침 검사: {'통과' if overlap_check else '오류 발견'}")
         self.logger.info(f"겹치는 Lines 삭제: {'삭제됨' if overlap_removed else '삭제할 항목 없음'}")
+        self.logger.info(f"Lines 기하 교차/겹침 검사: {'통과' if geometry_check else '경고 (전체 결과에 미반영)'}")
+        self.logger.info(f"그래프 연결성 검사: {'통과' if connectivity_check else '오류 발견'}")
         self.logger.info(f"고연결 Addresses 발견: {len(highly_connected)}개")
         self.logger.info(f"Layout 저장: {'성공' if layout_save_success else '실패'}")
         
-        overall_success = address_check and line_check and overlap_check and layout_save_success
+        overall_success = address_check and near_duplicate_check and line_check and reference_check and overlap_check and connectivity_check and layout_save_success
         
         if overall_success:
             print("\n🎉 모든 검사가 통과되었습니다!")
@@ -558,16 +1118,24 @@ class DataChecker:
             print("\n⚠️ 일부 검사에서 오류가 발견되었습니다.")
             self.logger.warning("일부 검사에서 오류 발견")
         
+        # 8. JSON 리포트 저장
+        self.build_report(overall_success, layout_saved=layout_save_success)
+        self.save_report()
+        
         self.logger.info("=" * 50)
         self.logger.info("데이터 무결성 검사 종료")
         self.logger.info("=" * 50)
         
         return overall_success
 
-def check_data_integrity():
-    """데이터 무결성 검사를 실행하는 함수"""
+def check_data_integrity(return_report=False):
+    """데이터 무결성 검사를 실행하는 함수 (return_report가 True면 JSON 리포트 dict를 반환)"""
     checker = DataChecker()
-    return checker.run_all_checks()
+    try:
+        success = checker.run_all_checks()
+    finally:
+        checker.close_logging()
+    return checker.report if return_report else success
 
 def main():
     """메인 실행 함수"""
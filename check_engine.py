@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Check Engine - output.json 무결성 검사를 열(column) 배열 위에서 병렬로 실행하는 모듈
+addresses / lines를 한 번만 순회하여 ID, name, 좌표, from/to 배열을 만들고,
+서로 독립적인 검사들을 스레드 풀에서 동시에 실행한 뒤 고정된 순서로 결과를 합칩니다.
+"""
+
+import time
+import numpy as np
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+from config import (
+    CHECK_ENGINE_MAX_WORKERS, DUPLICATE_POSITION_TOLERANCE, SEGMENT_INTERSECTION_TOLERANCE, LINE_POSITION_TOLERANCE
+)
+from edge_index import EdgeIndex
+from geometry import find_segment_intersections
+from graph_algorithms import connected_components, strongly_connected_components
+from spatial_index import find_coincident_clusters
+
+
+def _column(values: List) -> np.ndarray:
+    """모든 값이 int이면 int64 배열, 아니면 object 배열로 변환합니다."""
+    if all(type(value) is int for value in values):
+        return np.array(values, dtype=np.int64)
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _position_column(positions: List[Optional[Dict]]) -> np.ndarray:
+    """{x, y, z} dict 목록을 (N, 3) float 배열로 변환합니다. (값이 없으면 NaN)"""
+    return np.array(
+        [((pos or {}).get('x'), (pos or {}).get('y'), (pos or {}).get('z')) for pos in positions],
+        dtype=np.float64
+    ).reshape(-1, 3)
+
+
+def duplicate_groups(keys) -> List[List[int]]:
+    """두 번 이상 등장하는 키의 인덱스 그룹을 반환합니다. (그룹 내부와 그룹 목록 모두 첫 등장 순서)
+
+    숫자 배열(1차원 또는 행 단위 2차원)은 np.unique로, object 배열은 dict로 묶습니다.
+    """
+    if isinstance(keys, np.ndarray) and keys.dtype != object:
+        if len(keys) == 0:
+            return []
+        if keys.ndim == 2:
+            keys = np.ascontiguousarray(keys)
+            keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+        _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        members = np.flatnonzero(counts[inverse] > 1)
+        if len(members) == 0:
+            return []
+        group_first = first[inverse[members]]
+        order = np.lexsort((members, group_first))
+        members = members[order]
+        splits = np.flatnonzero(np.diff(group_first[order])) + 1
+        return [group.tolist() for group in np.split(members, splits)]
+
+    groups = {}
+    for idx, key in enumerate(keys):
+        groups.setdefault(key, []).append(idx)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+class CheckTables:
+    """addresses / lines를 한 번씩만 순회하여 만든 검사용 열 배열 묶음"""
+
+    def __init__(self, addresses: Sequence[Dict], lines: Sequence[Dict]):
+        self.address_count = len(addresses)
+        self.line_count = len(lines)
+
+        self.address_ids = _column([addr.get('id') for addr in addresses])
+        self.address_names = _column([addr.get('name') for addr in addresses])
+        # 좌표가 없으면 NaN
+        self.positions = _position_column([addr.get('pos') for addr in addresses])
+
+        self.line_ids = _column([line.get('id') for line in lines])
+        self.line_names = _column([line.get('name') for line in lines])
+        self.from_ids = _column([line.get('fromAddress') for line in lines])
+        self.to_ids = _column([line.get('toAddress') for line in lines])
+        # line에 복사된 fromPos / toPos (없으면 NaN)
+        self.from_positions = _position_column([line.get('fromPos') for line in lines])
+        self.to_positions = _position_column([line.get('toPos') for line in lines])
+
+    def canonical_pairs(self):
+        """방향과 무관한 (from, to) 키 배열을 반환합니다."""
+        if self.from_ids.dtype != object and self.to_ids.dtype != object:
+            return np.stack([np.minimum(self.from_ids, self.to_ids), np.maximum(self.from_ids, self.to_ids)], axis=1)
+        keys = np.empty(self.line_count, dtype=object)
+        keys[:] = [frozenset(pair) for pair in zip(self.from_ids.tolist(), self.to_ids.tolist())]
+        return keys
+
+    def address_rows(self, address_ids: np.ndarray) -> np.ndarray:
+        """address ID 배열을 addresses 행 번호로 변환합니다. (없으면 -1, ID 중복 시 첫 번째 행)"""
+        rows = np.full(len(address_ids), -1, dtype=np.int64)
+        if self.address_count == 0 or len(address_ids) == 0:
+            return rows
+        if self.address_ids.dtype != object and address_ids.dtype != object:
+            unique_ids, first = np.unique(self.address_ids, return_index=True)
+            pos = np.clip(np.searchsorted(unique_ids, address_ids), 0, len(unique_ids) - 1)
+            found = unique_ids[pos] == address_ids
+            rows[found] = first[pos[found]]
+            return rows
+        lookup = {}
+        for row, addr_id in enumerate(self.address_ids.tolist()):
+            lookup.setdefault(addr_id, row)
+        for i, addr_id in enumerate(address_ids.tolist()):
+            rows[i] = lookup.get(addr_id, -1)
+        return rows
+
+
+def find_address_duplicates(tables: CheckTables) -> Dict[str, List[List[int]]]:
+    """ID / name / 좌표가 같은 address 행 그룹을 찾습니다."""
+    return {
+        'ids': duplicate_groups(tables.address_ids),
+        'names': duplicate_groups(tables.address_names),
+        'positions': duplicate_groups(tables.positions)
+    }
+
+
+def find_near_duplicate_positions(tables: CheckTables, tolerance: float) -> List[List[int]]:
+    """서로 tolerance 이내에 있지만 좌표가 모두 같지는 않은 address 행 클러스터를 찾습니다."""
+    valid = np.flatnonzero(~np.isnan(tables.positions).any(axis=1))
+    positions = tables.positions[valid]
+    clusters = []
+    for members in find_coincident_clusters(positions, tolerance):
+        # 좌표가 모두 정확히 같은 경우는 position 중복 검사에서 보고됨
+        if len(np.unique(positions[members], axis=0)) > 1:
+            clusters.append(valid[members].tolist())
+    return clusters
+
+
+def find_line_duplicates(tables: CheckTables) -> Dict[str, List[List[int]]]:
+    """ID / name이 같은 line 행 그룹을 찾습니다."""
+    return {
+        'ids': duplicate_groups(tables.line_ids),
+        'names': duplicate_groups(tables.line_names)
+    }
+
+
+def find_line_overlap_groups(tables: CheckTables) -> List[List[int]]:
+    """같은 두 address를 (방향과 무관하게) 잇는 line 행 그룹을 찾습니다."""
+    return duplicate_groups(tables.canonical_pairs())
+
+
+def kept_line_mask(tables: CheckTables, overlap_groups: Optional[List[List[int]]] = None) -> np.ndarray:
+    """겹침 그룹의 첫 번째 line만 남겼을 때 남는 line의 mask를 반환합니다."""
+    if overlap_groups is None:
+        overlap_groups = find_line_overlap_groups(tables)
+    keep = np.ones(tables.line_count, dtype=bool)
+    for group in overlap_groups:
+        keep[group[1:]] = False
+    return keep
+
+
+def find_segment_intersection_pairs(tables: CheckTables, tolerance: float,
+                                   line_rows: Optional[np.ndarray] = None) -> Dict[str, List]:
+    """같은 Z 레이어의 line 선분끼리 교차/동일선상 겹침을 찾습니다.
+
+    겹치는 line 중 삭제될 line(각 겹침 그룹의 첫 번째 제외)은 검사하지 않으며,
+    결과는 (z, line 행1, line 행2) 목록입니다. line_rows를 주면 그 line들끼리만 검사합니다.
+    """
+    if line_rows is None:
+        line_rows = np.flatnonzero(kept_line_mask(tables))
+    line_rows = np.asarray(line_rows, dtype=np.int64)
+    from_rows = tables.address_rows(tables.from_ids[line_rows])
+    to_rows = tables.address_rows(tables.to_ids[line_rows])
+    valid = (from_rows >= 0) & (to_rows >= 0)
+    line_rows, from_rows, to_rows = line_rows[valid], from_rows[valid], to_rows[valid]
+
+    from_pos = tables.positions[from_rows]
+    to_pos = tables.positions[to_rows]
+    same_layer = from_pos[:, 2] == to_pos[:, 2]
+    line_rows, from_rows, to_rows = line_rows[same_layer], from_rows[same_layer], to_rows[same_layer]
+    from_pos, to_pos = from_pos[same_layer], to_pos[same_layer]
+
+    crossings = []
+    collinear_overlaps = []
+    for z_value in np.unique(from_pos[:, 2]).tolist():
+        in_layer = np.flatnonzero(from_pos[:, 2] == z_value)
+        rows = line_rows[in_layer]
+        endpoint_ids = np.stack([from_rows[in_layer], to_rows[in_layer]], axis=1)
+        result = find_segment_intersections(from_pos[in_layer, :2], to_pos[in_layer, :2], endpoint_ids, tolerance=tolerance)
+        crossings.extend((z_value, int(rows[i]), int(rows[j])) for i, j in result['crossings'].tolist())
+        collinear_overlaps.extend((z_value, int(rows[i]), int(rows[j])) for i, j in result['collinear_overlaps'].tolist())
+
+    return {'crossings': crossings, 'collinear_overlaps': collinear_overlaps}
+
+
+def find_line_reference_issues(tables: CheckTables, tolerance: float,
+                               line_rows: Optional[np.ndarray] = None) -> Dict[str, List[int]]:
+    """lines를 address 테이블과 조인하여 잘못된 참조와 오래된 fromPos/toPos를 찾습니다.
+
+    dangling_from / dangling_to: fromAddress / toAddress가 addresses에 없는 line 행
+    stale_from / stale_to: fromPos / toPos가 없거나 address 좌표와 tolerance보다 멀리 떨어진 line 행
+    line_rows를 주면 그 line들만 검사합니다.
+    """
+    if line_rows is None:
+        line_rows = np.arange(tables.line_count)
+    line_rows = np.asarray(line_rows, dtype=np.int64)
+    result = {}
+    for end, ids, copies in (('from', tables.from_ids, tables.from_positions), ('to', tables.to_ids, tables.to_positions)):
+        ids = ids[line_rows]
+        copies = copies[line_rows]
+        rows = tables.address_rows(ids)
+        found = rows >= 0
+        actual = tables.positions[np.where(found, rows, 0)] if tables.address_count else np.full((len(rows), 3), np.nan)
+        # 양쪽 모두 값이 없는 좌표 성분은 일치로 간주, 한쪽만 없으면 NaN 거리 (불일치)
+        both_missing = np.isnan(copies) & np.isnan(actual)
+        distance = np.sqrt(np.where(both_missing, 0.0, (copies - actual) ** 2).sum(axis=1))
+        stale = found & ~(distance <= tolerance)
+        result[f'dangling_{end}'] = line_rows[~found].tolist()
+        result[f'stale_{end}'] = line_rows[stale].tolist()
+    return result
+
+
+def _summarize_components(components: List[List[int]], node_ids: List) -> List[Dict]:
+    """노드 번호 그룹을 {size, representative, members} 목록으로 바꿉니다. (크기 내림차순, 대표 ID 오름차순)"""
+    summary = []
+    for component in components:
+        members = sorted(node_ids[i] for i in component)
+        summary.append({'size': len(members), 'representative': members[0], 'members': members})
+    summary.sort(key=lambda item: (-item['size'], item['representative']))
+    return summary
+
+
+def find_connectivity(tables: CheckTables) -> Dict[str, List[Dict]]:
+    """address 그래프의 연결 요소(방향 무시)와 강연결 요소(line 방향)를 구합니다.
+
+    삭제될 겹침 line은 제외하며, line이 없는 address도 크기 1의 요소로 포함합니다.
+    """
+    keep = kept_line_mask(tables)
+    from_ids = tables.from_ids[keep]
+    to_ids = tables.to_ids[keep]
+    address_ids = tables.address_ids
+
+    if from_ids.dtype != object and to_ids.dtype != object and address_ids.dtype != object:
+        nodes = np.unique(np.concatenate([address_ids, from_ids, to_ids]))
+        sources = np.searchsorted(nodes, from_ids)
+        targets = np.searchsorted(nodes, to_ids)
+        node_ids = nodes.tolist()
+    else:
+        lookup = {}
+        for addr_id in address_ids.tolist() + from_ids.tolist() + to_ids.tolist():
+            if addr_id is not None:
+                lookup.setdefault(addr_id, len(lookup))
+        edges = [(lookup[a], lookup[b]) for a, b in zip(from_ids.tolist(), to_ids.tolist()) if a is not None and b is not None]
+        sources = [a for a, _ in edges]
+        targets = [b for _, b in edges]
+        node_ids = list(lookup)
+
+    sources = np.asarray(sources, dtype=np.int64).tolist()
+    targets = np.asarray(targets, dtype=np.int64).tolist()
+    return {
+        'components': _summarize_components(connected_components(len(node_ids), sources, targets), node_ids),
+        'strong_components': _summarize_components(strongly_connected_components(len(node_ids), sources, targets), node_ids)
+    }
+
+
+def count_degrees(tables: CheckTables, edge_index: Optional[EdgeIndex] = None) -> Counter:
+    """address가 fromAddress/toAddress로 사용된 횟수를 셉니다. (from/to가 없는 line 제외)
+
+    같은 lines로 만든 edge_index가 있으면 그 degree 카운터를 복사해 사용합니다.
+    """
+    if edge_index is not None:
+        return Counter(edge_index.degrees)
+    endpoints = np.concatenate([tables.from_ids, tables.to_ids])
+    if endpoints.dtype != object:
+        ids, counts = np.unique(endpoints, return_counts=True)
+        return Counter(dict(zip(ids.tolist(), counts.tolist())))
+    degrees = Counter()
+    for from_addr, to_addr in zip(tables.from_ids.tolist(), tables.to_ids.tolist()):
+        if from_addr is not None and to_addr is not None:
+            degrees[from_addr] += 1
+            degrees[to_addr] += 1
+    return degrees
+
+
+class IntegrityCheckEngine:
+    """서로 독립적인 무결성 검사를 열 배열 위에서 병렬로 실행합니다."""
+
+    # 결과를 합치는 순서 (실행 완료 순서와 무관하게 항상 이 순서)
+    CHECKS = (
+        'address_duplicates',
+        'near_duplicate_positions',
+        'line_duplicates',
+        'line_references',
+        'line_overlaps',
+        'segment_intersections',
+        'connectivity',
+        'degrees',
+    )
+
+    def __init__(self, addresses: Sequence[Dict], lines: Sequence[Dict], max_workers: Optional[int] = None,
+                 near_duplicate_tolerance: Optional[float] = None, segment_tolerance: Optional[float] = None,
+                 line_position_tolerance: Optional[float] = None, edge_index: Optional[EdgeIndex] = None):
+        self.tables = CheckTables(addresses, lines)
+        # 호출 측이 lines와 함께 관리하는 EdgeIndex (있으면 degree를 여기서 읽음)
+        self.edge_index = edge_index
+        self.max_workers = max_workers if max_workers is not None else CHECK_ENGINE_MAX_WORKERS
+        self.near_duplicate_tolerance = near_duplicate_tolerance if near_duplicate_tolerance is not None else DUPLICATE_POSITION_TOLERANCE
+        self.segment_tolerance = segment_tolerance if segment_tolerance is not None else SEGMENT_INTERSECTION_TOLERANCE
+        self.line_position_tolerance = line_position_tolerance if line_position_tolerance is not None else LINE_POSITION_TOLERANCE
+        self.timings = {}
+
+    def run_check(self, name: str):
+        """검사 하나를 실행하고 소요 시간을 기록합니다."""
+        tasks = {
+            'address_duplicates': lambda: find_address_duplicates(self.tables),
+            'near_duplicate_positions': lambda: find_near_duplicate_positions(self.tables, self.near_duplicate_tolerance),
+            'line_duplicates': lambda: find_line_duplicates(self.tables),
+            'line_references': lambda: find_line_reference_issues(self.tables, self.line_position_tolerance),
+            'line_overlaps': lambda: find_line_overlap_groups(self.tables),
+            'segment_intersections': lambda: find_segment_intersection_pairs(self.tables, self.segment_tolerance),
+            'connectivity': lambda: find_connectivity(self.tables),
+            'degrees': lambda: count_degrees(self.tables, self.edge_index),
+        }
+        start = time.perf_counter()
+        result = tasks[name]()
+        self.timings[name] = time.perf_counter() - start
+        return result
+
+    def run(self, checks: Optional[Sequence[str]] = None) -> Dict:
+        """검사들을 병렬로 실행하고 CHECKS 순서로 결과를 합칩니다."""
+        names = [name for name in self.CHECKS if checks is None or name in checks]
+        if self.max_workers <= 1 or len(names) <= 1:
+            results = {name: self.run_check(name) for name in names}
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(names))) as executor:
+                futures = {name: executor.submit(self.run_check, name) for name in names}
+                results = {name: futures[name].result() for name in names}
+        self.timings = {name: self.timings[name] for name in names}
+        return results
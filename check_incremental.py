@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental Check - 직전 검사 상태를 이용해 바뀐 엔티티만 다시 검사하는 모듈
+address / line마다 내용 해시를 저장해 두고, 다음 검사에서 추가/삭제/수정된 엔티티와
+그 이웃(같은 키를 공유하는 엔티티, 연결된 line, 주변 좌표)만 다시 검사하여
+IntegrityCheckEngine과 같은 형식의 결과를 만듭니다. 조건이 맞지 않으면 전체 검사로 돌아갑니다.
+"""
+
+import json
+import os
+import time
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Set
+from config import CHECK_STATE_FILE, CHECK_INCREMENTAL_MAX_CHANGE_RATIO
+from check_engine import (
+    IntegrityCheckEngine, CheckTables, duplicate_groups, kept_line_mask, count_degrees,
+    find_connectivity, find_line_reference_issues, find_segment_intersection_pairs
+)
+from graph_algorithms import UnionFind
+from spatial_index import find_coincident_clusters
+
+STATE_VERSION = 2
+# 행 해시에 쓰는 FNV-1a 64비트 상수
+_HASH_OFFSET = 0xcbf29ce484222325
+_HASH_PRIME = np.uint64(0x100000001b3)
+# 상태 파일에 배열로 저장하는 연결성 결과 항목
+_CONNECTIVITY_KEYS = ('components', 'strong_components')
+
+
+def _column_words(column: np.ndarray) -> np.ndarray:
+    """열 배열을 행마다 uint64 단어 (N, k) 배열로 바꿉니다. (object 열은 repr 문자열의 코드 포인트)"""
+    if len(column) == 0:
+        return np.zeros((0, 0), dtype=np.uint64)
+    if column.dtype == object:
+        text = np.array([repr(value) for value in column.tolist()], dtype=str)
+        return text.view(np.uint32).reshape(len(column), -1).astype(np.uint64)
+    return np.ascontiguousarray(column).reshape(len(column), -1).view(np.uint64)
+
+
+def row_hashes(*columns: np.ndarray) -> np.ndarray:
+    """CheckTables 열들의 행 단위 내용 해시 (실행마다 같은 값, 열마다 단어 수를 섞어 경계를 구분)"""
+    hashes = np.full(len(columns[0]), _HASH_OFFSET, dtype=np.uint64)
+    for column in columns:
+        words = _column_words(column)
+        for k in range(words.shape[1]):
+            hashes ^= words[:, k]
+            hashes *= _HASH_PRIME
+        hashes ^= np.uint64(words.shape[1])
+        hashes *= _HASH_PRIME
+    return hashes
+
+
+def _lookup(ids: np.ndarray, values: np.ndarray, keys: np.ndarray):
+    """ids에서 keys를 찾아 (찾았는지 mask, 해당 values)를 반환합니다. (없는 키의 값은 의미 없음)"""
+    if len(ids) == 0:
+        return np.zeros(len(keys), dtype=bool), np.zeros(len(keys), dtype=values.dtype)
+    order = np.argsort(ids, kind='stable')
+    pos = np.clip(np.searchsorted(ids[order], keys), 0, len(ids) - 1)
+    rows = order[pos]
+    return ids[rows] == keys, values[rows]
+
+
+def _isin(values: np.ndarray, targets) -> np.ndarray:
+    """values의 각 원소가 targets에 포함되는지 (numpy 배열은 np.isin, object 배열은 set)"""
+    if values.dtype != object:
+        return np.isin(values, targets if values.dtype.kind == 'V' else np.asarray(list(targets)))
+    targets = set(targets)
+    return np.fromiter((value in targets for value in values.tolist()), dtype=bool, count=len(values))
+
+
+def _row_keys(array: np.ndarray) -> np.ndarray:
+    """(N, k) 배열은 행 단위 비교가 가능한 void 배열로, 1차원 배열은 그대로 반환합니다."""
+    if array.ndim == 2 and array.dtype != object:
+        array = np.ascontiguousarray(array)
+        return array.view(np.dtype((np.void, array.dtype.itemsize * array.shape[1]))).ravel()
+    return array
+
+
+class CheckState:
+    """직전 검사의 ID별 행 해시, line 양 끝 address 해시, ID 기준 검사 결과
+
+    해시와 연결성 결과(요소 크기와 이어 붙인 address ID)는 배열로, 나머지 검사 결과는 JSON 문자열로
+    하나의 .npz에 저장합니다. 연결성 결과는 재사용할 때만 dict 목록으로 되돌립니다.
+    """
+
+    def __init__(self, settings: Dict, address_ids: np.ndarray, address_hashes: np.ndarray, line_ids: np.ndarray,
+                 line_hashes: np.ndarray, endpoint_hashes: np.ndarray, findings: Dict, connectivity: Dict):
+        self.settings = settings
+        self.address_ids = address_ids
+        self.address_hashes = address_hashes
+        self.line_ids = line_ids
+        self.line_hashes = line_hashes
+        self.endpoint_hashes = endpoint_hashes
+        # connectivity를 제외한 findings_to_ids 결과
+        self.findings = findings
+        # {'components': (sizes, members), 'strong_components': (sizes, members)}
+        self.connectivity = connectivity
+
+    @staticmethod
+    def connectivity_arrays(connectivity: Dict) -> Dict:
+        """find_connectivity 결과를 요소별 크기와 이어 붙인 address ID 배열로 바꿉니다."""
+        return {
+            key: (
+                np.array([component['size'] for component in connectivity[key]], dtype=np.int64),
+                np.array([addr_id for component in connectivity[key] for addr_id in component['members']], dtype=np.int64)
+            )
+            for key in _CONNECTIVITY_KEYS
+        }
+
+    def connectivity_findings(self) -> Dict:
+        """저장된 연결성 배열을 find_connectivity 결과 형식으로 되돌립니다."""
+        result = {}
+        for key in _CONNECTIVITY_KEYS:
+            sizes, members = self.connectivity[key]
+            members = members.tolist()
+            ends = np.cumsum(sizes).tolist()
+            groups = (members[end - size:end] for size, end in zip(sizes.tolist(), ends))
+            result[key] = [{'size': len(group), 'representative': group[0], 'members': group} for group in groups]
+        return result
+
+    @classmethod
+    def load(cls, path: str) -> Optional['CheckState']:
+        """상태 파일을 읽습니다. 없거나 버전이 다르면 None을 반환합니다."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data['version']) != STATE_VERSION:
+                    return None
+                return cls(
+                    json.loads(str(data['settings'])), data['address_ids'], data['address_hashes'],
+                    data['line_ids'], data['line_hashes'], data['endpoint_hashes'], json.loads(str(data['findings'])),
+                    {key: (data[f'{key}_sizes'], data[f'{key}_members']) for key in _CONNECTIVITY_KEYS}
+                )
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, path: str):
+        arrays = {
+            'version': np.array(STATE_VERSION),
+            'settings': np.array(json.dumps(self.settings)),
+            'address_ids': self.address_ids,
+            'address_hashes': self.address_hashes,
+            'line_ids': self.line_ids,
+            'line_hashes': self.line_hashes,
+            'endpoint_hashes': self.endpoint_hashes,
+            'findings': np.array(json.dumps(self.findings, ensure_ascii=False))
+        }
+        for key, (sizes, members) in self.connectivity.items():
+            arrays[f'{key}_sizes'] = sizes
+            arrays[f'{key}_members'] = members
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+
+def findings_to_ids(findings: Dict, address_ids: List, line_ids: List) -> Dict:
+    """행 번호 기준 검사 결과를 ID 기준으로 바꿉니다. (ID가 모두 고유할 때만 사용, 연결성은 이미 ID 기준이라 제외)"""
+    addr = lambda rows: [address_ids[i] for i in rows]
+    line = lambda rows: [line_ids[i] for i in rows]
+    return {
+        'address_names': [addr(group) for group in findings['address_duplicates']['names']],
+        'address_positions': [addr(group) for group in findings['address_duplicates']['positions']],
+        'near_duplicate_positions': [addr(group) for group in findings['near_duplicate_positions']],
+        'line_names': [line(group) for group in findings['line_duplicates']['names']],
+        'line_references': {key: line(rows) for key, rows in findings['line_references'].items()},
+        'line_overlaps': [line(group) for group in findings['line_overlaps']],
+        'segment_intersections': {
+            key: [[z_value, line_ids[i], line_ids[j]] for z_value, i, j in pairs]
+            for key, pairs in findings['segment_intersections'].items()
+        }
+    }
+
+
+class IncrementalCheckEngine:
+    """직전 상태와 비교하여 바뀐 부분만 다시 검사하는 IntegrityCheckEngine 대체 엔진"""
+
+    def __init__(self, addresses: Sequence[Dict], lines: Sequence[Dict], state_file: Optional[str] = None,
+                 max_change_ratio: Optional[float] = None, **engine_options):
+        self.addresses = addresses
+        self.lines = lines
+        self.state_file = state_file if state_file is not None else CHECK_STATE_FILE
+        self.max_change_ratio = max_change_ratio if max_change_ratio is not None else CHECK_INCREMENTAL_MAX_CHANGE_RATIO
+        self.engine = IntegrityCheckEngine(addresses, lines, **engine_options)
+        self.tables = self.engine.tables
+        self.max_workers = self.engine.max_workers
+        self.timings = {}
+        self.mode = 'full'
+        self.fallback_reason = None
+        self.changes = {}
+        self._connectivity_arrays = None
+
+    @property
+    def settings(self) -> Dict:
+        return {
+            'near_duplicate_tolerance': self.engine.near_duplicate_tolerance,
+            'segment_tolerance': self.engine.segment_tolerance,
+            'line_position_tolerance': self.engine.line_position_tolerance
+        }
+
+    def run(self) -> Dict:
+        """가능하면 증분 검사, 아니면 전체 검사를 실행하고 바뀐 경우에만 상태 파일을 갱신합니다."""
+        tables = self.tables
+        # 증분 검사는 ID가 모두 정수이고 고유할 때만 사용 (해시와 검사 결과를 ID 배열로 저장)
+        numeric = all(column.dtype != object for column in (tables.address_ids, tables.line_ids, tables.from_ids, tables.to_ids))
+        ids_unique = numeric and len(np.unique(tables.address_ids)) == tables.address_count \
+            and len(np.unique(tables.line_ids)) == tables.line_count
+        if not ids_unique:
+            self.fallback_reason = 'address/line ID 중복, 누락 또는 정수 아님'
+            findings = self.engine.run()
+            self.timings.update(self.engine.timings)
+            return findings
+
+        start = time.perf_counter()
+        address_hashes = row_hashes(tables.address_names, tables.positions)
+        line_hashes = row_hashes(tables.line_names, tables.from_ids, tables.to_ids, tables.from_positions, tables.to_positions)
+        endpoint_hashes = row_hashes(tables.from_ids, tables.to_ids)
+        self.timings['hash'] = time.perf_counter() - start
+
+        findings = None
+        state = CheckState.load(self.state_file)
+        if state is None:
+            self.fallback_reason = '이전 검사 상태 없음'
+        elif state.settings != self.settings:
+            self.fallback_reason = '검사 설정 변경'
+        else:
+            self.changes = {
+                'addresses': self._diff(state.address_ids, state.address_hashes, tables.address_ids, address_hashes),
+                'lines': self._diff(state.line_ids, state.line_hashes, tables.line_ids, line_hashes)
+            }
+            changed = sum(len(ids) for diff in self.changes.values() for ids in diff.values())
+            total = max(1, tables.address_count + tables.line_count)
+            if changed / total > self.max_change_ratio:
+                self.fallback_reason = f'변경 비율 {changed / total:.1%} > {self.max_change_ratio:.0%}'
+            else:
+                findings = self._run_incremental(state, endpoint_hashes)
+                self.mode = 'incremental'
+                if changed == 0:
+                    # 바뀐 엔티티가 없으면 상태 파일도 그대로 둠
+                    return findings
+
+        if findings is None:
+            findings = self.engine.run()
+            self.timings.update(self.engine.timings)
+
+        start = time.perf_counter()
+        connectivity = self._connectivity_arrays if self._connectivity_arrays is not None \
+            else CheckState.connectivity_arrays(findings['connectivity'])
+        findings_ids = findings_to_ids(findings, tables.address_ids.tolist(), tables.line_ids.tolist())
+        CheckState(self.settings, tables.address_ids, address_hashes, tables.line_ids, line_hashes, endpoint_hashes,
+                   findings_ids, connectivity).save(self.state_file)
+        self.timings['save_state'] = time.perf_counter() - start
+        return findings
+
+    @staticmethod
+    def _diff(old_ids: np.ndarray, old_hashes: np.ndarray, new_ids: np.ndarray, new_hashes: np.ndarray) -> Dict[str, List]:
+        found, previous = _lookup(old_ids, old_hashes, new_ids)
+        return {
+            'added': new_ids[~found].tolist(),
+            'removed': old_ids[~np.isin(old_ids, new_ids)].tolist(),
+            'modified': new_ids[found & (previous != new_hashes)].tolist()
+        }
+
+    def _timed(self, name, func):
+        start = time.perf_counter()
+        result = func()
+        self.timings[name] = time.perf_counter() - start
+        return result
+
+    def _run_incremental(self, state: CheckState, endpoint_hashes: np.ndarray) -> Dict:
+        tables = self.tables
+        address_ids = tables.address_ids.tolist()
+        line_ids = tables.line_ids.tolist()
+        address_row = {addr_id: row for row, addr_id in enumerate(address_ids)}
+        line_row = {line_id: row for row, line_id in enumerate(line_ids)}
+        old = state.findings
+        changes = self.changes
+
+        # 바뀐 address (현재 행), 바뀌거나 사라진 address ID
+        changed_addresses = changes['addresses']['added'] + changes['addresses']['modified']
+        touched_addresses = set(changed_addresses) | set(changes['addresses']['removed'])
+        changed_address_rows = np.array(sorted(address_row[a] for a in changed_addresses), dtype=np.int64)
+        changed_lines = changes['lines']['added'] + changes['lines']['modified']
+        touched_lines = set(changed_lines) | set(changes['lines']['removed'])
+        changed_line_rows = np.array(sorted(line_row[l] for l in changed_lines), dtype=np.int64)
+
+        def regroup(keys, old_groups, touched, changed_rows, rows_of):
+            """바뀐 엔티티의 키와, 바뀐 엔티티가 속했던 이전 그룹의 키만 다시 묶습니다."""
+            keys = _row_keys(keys)
+            kept = []
+            affected_rows = list(changed_rows.tolist())
+            for group in old_groups:
+                if touched.intersection(group):
+                    affected_rows.extend(rows_of[i] for i in group if i in rows_of)
+                else:
+                    kept.append(sorted(rows_of[i] for i in group))
+            if affected_rows:
+                affected_keys = keys[np.unique(np.array(affected_rows, dtype=np.int64))]
+                candidates = np.flatnonzero(_isin(keys, affected_keys))
+                # 바뀐 엔티티가 새로 합류한 기존 그룹은 다시 묶은 결과로 대체
+                candidate_set = set(candidates.tolist())
+                kept = [group for group in kept if group[0] not in candidate_set]
+                kept.extend(candidates[group].tolist() for group in duplicate_groups(keys[candidates]))
+            return sorted(kept, key=lambda group: group[0])
+
+        findings = {}
+
+        # 1. address 중복 (ID가 고유하므로 ID 중복은 없음)
+        findings['address_duplicates'] = self._timed('address_duplicates', lambda: {
+            'ids': [],
+            'names': regroup(tables.address_names, old['address_names'], touched_addresses, changed_address_rows, address_row),
+            'positions': regroup(tables.positions, old['address_positions'], touched_addresses, changed_address_rows, address_row)
+        })
+
+        # 2. 근접 위치: 바뀐 address 주변 셀의 점들만 다시 클러스터링
+        findings['near_duplicate_positions'] = self._timed('near_duplicate_positions', lambda: self._near_duplicates(
+            old['near_duplicate_positions'], touched_addresses, changed_address_rows, address_row))
+
+        # 3. line 중복 (ID 중복 없음)
+        findings['line_duplicates'] = self._timed('line_duplicates', lambda: {
+            'ids': [],
+            'names': regroup(tables.line_names, old['line_names'], touched_lines, changed_line_rows, line_row)
+        })
+
+        # 바뀐 line, 그리고 바뀌거나 사라진 address에 연결된 line
+        incident = np.flatnonzero(_isin(tables.from_ids, list(touched_addresses)) | _isin(tables.to_ids, list(touched_addresses))) \
+            if touched_addresses else np.empty(0, dtype=np.int64)
+        affected_line_rows = np.union1d(changed_line_rows, incident)
+        affected_line_ids = touched_lines | {line_ids[i] for i in incident.tolist()}
+
+        # 4. 참조/좌표: 영향받은 line만 다시 조인
+        def line_references():
+            fresh = find_line_reference_issues(tables, self.engine.line_position_tolerance, affected_line_rows)
+            result = {}
+            for key, ids in old['line_references'].items():
+                rows = [line_row[i] for i in ids if i not in affected_line_ids]
+                result[key] = sorted(rows + fresh[key])
+            return result
+        findings['line_references'] = self._timed('line_references', line_references)
+
+        # 5. 겹침: canonical pair 키로 다시 묶기
+        findings['line_overlaps'] = self._timed('line_overlaps', lambda: regroup(
+            tables.canonical_pairs(), old['line_overlaps'], touched_lines, changed_line_rows, line_row))
+
+        # 겹침 그룹에서 삭제 대상 여부가 바뀐 line (line 순서가 바뀐 경우 포함)
+        old_removed = {line_id for group in old['line_overlaps'] for line_id in group[1:]}
+        new_removed = {line_ids[row] for group in findings['line_overlaps'] for row in group[1:]}
+        flipped = {line_id for line_id in old_removed ^ new_removed if line_id in line_row}
+
+        # 6. 기하 교차: 영향받은 line과 그 주변 line만 다시 검사
+        findings['segment_intersections'] = self._timed('segment_intersections', lambda: self._segment_intersections(
+            old['segment_intersections'], findings['line_overlaps'], affected_line_rows, affected_line_ids | flipped, line_row))
+
+        # 7. 연결성: line 연결 구조나 address 집합이 바뀐 경우에만 다시 계산
+        def connectivity():
+            topology_changed = bool(changes['addresses']['added'] or changes['addresses']['removed']
+                                    or changes['lines']['added'] or changes['lines']['removed'] or flipped)
+            if changes['lines']['modified'] and not topology_changed:
+                modified = np.array(changes['lines']['modified'], dtype=np.int64)
+                _, previous = _lookup(state.line_ids, state.endpoint_hashes, modified)
+                current = endpoint_hashes[[line_row[line_id] for line_id in changes['lines']['modified']]]
+                topology_changed = bool((previous != current).any())
+            if topology_changed:
+                return find_connectivity(tables)
+            # 연결 구조가 그대로면 저장된 배열도 그대로 다시 저장
+            self._connectivity_arrays = state.connectivity
+            return state.connectivity_findings()
+        findings['connectivity'] = self._timed('connectivity', connectivity)
+
+        # 8. 연결 수는 배열 한 번으로 계산
+        findings['degrees'] = self._timed('degrees', lambda: count_degrees(tables, self.engine.edge_index))
+        return findings
+
+    def _near_duplicates(self, old_clusters: List[List], touched: Set, changed_rows: np.ndarray, address_row: Dict) -> List[List[int]]:
+        tables = self.tables
+        tolerance = self.engine.near_duplicate_tolerance
+        kept = []
+        affected_rows = list(changed_rows.tolist())
+        for cluster in old_clusters:
+            if touched.intersection(cluster):
+                affected_rows.extend(address_row[i] for i in cluster if i in address_row)
+            else:
+                kept.append(sorted(address_row[i] for i in cluster))
+
+        valid = ~np.isnan(tables.positions).any(axis=1)
+        affected_rows = [row for row in affected_rows if valid[row]]
+        if not affected_rows:
+            return sorted(kept, key=lambda cluster: cluster[0])
+
+        # 영향받은 점이 속한 셀과 인접 셀(3x3x3)에 있는 점만 후보로 사용
+        cells = np.floor(np.where(valid[:, None], tables.positions, 0.0) / tolerance).astype(np.int64)
+        offsets = np.array(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1], indexing='ij')).reshape(3, -1).T
+        neighbour_cells = (cells[np.array(affected_rows)][:, None, :] + offsets[None, :, :]).reshape(-1, 3)
+        candidates = np.flatnonzero(valid & _isin(_row_keys(cells), _row_keys(np.unique(neighbour_cells, axis=0))))
+
+        positions = tables.positions[candidates]
+        fresh = []
+        for members in find_coincident_clusters(positions, tolerance):
+            if len(np.unique(positions[members], axis=0)) > 1:
+                fresh.append(candidates[members].tolist())
+
+        # 후보 경계 밖으로 이어지는 기존 클러스터와 합침
+        groups = kept + fresh
+        owner = {}
+        union_find = UnionFind(len(groups))
+        for index, group in enumerate(groups):
+            for row in group:
+                union_find.union(owner.setdefault(row, index), index)
+        clusters = [sorted({row for index in members for row in groups[index]}) for members in union_find.groups()]
+        return sorted(clusters, key=lambda cluster: cluster[0])
+
+    def _segment_intersections(self, old_pairs: Dict, overlap_groups: List[List[int]], affected_line_rows: np.ndarray,
+                               affected_ids: Set, line_row: Dict) -> Dict[str, List]:
+        tables = self.tables
+        tolerance = self.engine.segment_tolerance
+        keep = kept_line_mask(tables, overlap_groups)
+        affected = np.union1d(affected_line_rows, np.array(sorted(line_row[i] for i in affected_ids if i in line_row), dtype=np.int64))
+
+        result = {}
+        for key, pairs in old_pairs.items():
+            result[key] = [(z_value, *sorted((line_row[a], line_row[b]))) for z_value, a, b in pairs
+                           if a not in affected_ids and b not in affected_ids]
+
+        affected = affected[keep[affected]]
+        if len(affected):
+            # 영향받은 선분의 bounding box와 겹치는 선분만 후보로 사용
+            from_rows = tables.address_rows(tables.from_ids)
+            to_rows = tables.address_rows(tables.to_ids)
+            has_pos = (from_rows >= 0) & (to_rows >= 0)
+            starts = np.where(has_pos[:, None], tables.positions[np.maximum(from_rows, 0)], np.nan)
+            ends = np.where(has_pos[:, None], tables.positions[np.maximum(to_rows, 0)], np.nan)
+            # geometry.find_segment_intersections와 같은 기준 (tolerance만큼 확장한 bounding box)
+            low = np.minimum(starts, ends)[:, :2] - tolerance
+            high = np.maximum(starts, ends)[:, :2] + tolerance
+
+            near = np.zeros(tables.line_count, dtype=bool)
+            for chunk in np.array_split(affected, max(1, len(affected) // 64)):
+                overlap = (low[None, :, :] <= high[chunk][:, None, :]) & (high[None, :, :] >= low[chunk][:, None, :])
+                near |= overlap.all(axis=2).any(axis=0)
+            candidates = np.flatnonzero(near & keep & has_pos)
+
+            affected_set = set(affected.tolist())
+            fresh = find_segment_intersection_pairs(tables, tolerance, candidates)
+            for key, pairs in fresh.items():
+                result[key].extend(pair for pair in pairs if pair[1] in affected_set or pair[2] in affected_set)
+
+        return {key: sorted(pairs, key=lambda pair: (pair[0], pair[1], pair[2])) for key, pairs in result.items()}
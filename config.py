@@ -32,6 +32,61 @@ OHT_TARGET_DURATION_SEC = 10
 RANDOM_INTERVAL = [54.0, 58.0]
 ADDRESS_ID_START = 100001
 LINE_ID_START = 200001
+# loop 그룹(레이어 x loop 종류) 병렬 생성 프로세스 수 (1이면 순차 실행, None이면 CPU 코어 수)
+GENERATION_WORKERS = 1
+# address 간격 추출 시드 (None이면 매번 다른 레이아웃을 생성하고 캐시를 사용하지 않음)
+GENERATION_SEED = 20240601
+# 같은 input.json / 시드 / RANDOM_INTERVAL이면 저장된 output.json을 재사용
+GENERATION_CACHE = True
+GENERATION_CACHE_DIR = 'generation_cache'
+GENERATION_CACHE_MAX_ENTRIES = 8
+# True면 직전 생성 스냅샷과 input.json을 요소 단위로 비교하여 바뀐 loop/shortcut/crossover만 다시 생성 (바뀌지 않은 요소는 ID 유지)
+GENERATION_INCREMENTAL = False
+GENERATION_SNAPSHOT_FILE = 'generation_snapshot.json'
+# 생성 직후 허용 오차 이내에 겹치는 address를 하나로 병합 (line 참조도 변경)
+GENERATION_WELD = True
+GENERATION_WELD_TOLERANCE = 0.1
+# shortcut 점을 가까운 rail 선분 위로 투영하여 선분을 나누고 연결 line을 바로 생성
+SHORTCUT_PROJECTION = True
+# shortcut 점 하나를 연결할 rail 수, 투영 최대 거리, 선분 끝점/다른 투영점에 붙이는 거리 (좌표 단위)
+SHORTCUT_PROJECTION_COUNT = 2
+SHORTCUT_PROJECTION_MAX_DISTANCE = 100.0
+SHORTCUT_SNAP_DISTANCE = 1.0
+
+# Endpoint 연결 설정
+# True면 같은 Z 레이어의 address끼리만 최근접 검색
+ENDPOINT_PARTITION_BY_Z = False
+
+# 데이터 검증 설정
+# 고연결 주소점 기준 (연결 수가 이 값 이상이면 고연결로 보고)
+HIGHLY_CONNECTED_THRESHOLD = 4
+# 연결 수 분포 구간 시작값 (마지막 값은 'N+' 구간)
+DEGREE_HISTOGRAM_BINS = [0, 1, 2, 3, 4]
+# 선분 교차/동일선상 겹침 판정 허용 오차 (좌표 단위)
+SEGMENT_INTERSECTION_TOLERANCE = 0.01
+# line의 fromPos/toPos와 address 좌표 불일치 판정 허용 오차 (좌표 단위)
+LINE_POSITION_TOLERANCE = 0.01
+# True면 불일치한 fromPos/toPos를 address 좌표로 자동 수정
+LINE_POSITION_REPAIR = False
+# 근접 위치(사실상 같은 점) Address 판정 허용 오차 (좌표 단위)
+DUPLICATE_POSITION_TOLERANCE = 0.1
+# 무결성 검사 엔진의 병렬 실행 스레드 수 (1이면 순차 실행)
+CHECK_ENGINE_MAX_WORKERS = 4
+# True면 QueueHandler/QueueListener로 check.log 파일/콘솔 기록을 별도 스레드에서 처리
+CHECK_LOG_ASYNC = True
+# 검사 항목(카테고리)별 상세 로그/화면 출력 최대 줄 수 (None이면 제한 없음, 초과분은 건수만 요약)
+CHECK_LOG_MAX_PER_CATEGORY = 1000
+CHECK_PRINT_MAX_PER_CATEGORY = 50
+# 검사 결과 JSON 리포트 파일과 항목별 샘플 최대 개수
+CHECK_REPORT_FILE = 'check_report.json'
+CHECK_REPORT_SAMPLE_LIMIT = 20
+# True면 직전 검사 상태(엔티티 내용 해시)와 비교하여 바뀐 부분만 다시 검사
+CHECK_INCREMENTAL = True
+CHECK_STATE_FILE = 'check_state.npz'
+# 바뀐 엔티티 비율이 이 값을 넘으면 전체 검사로 실행
+CHECK_INCREMENTAL_MAX_CHANGE_RATIO = 0.2
+# /api/run-check 응답에 포함할 stdout 최대 글자 수 (None이면 제한 없음)
+CHECK_API_STDOUT_LIMIT = 20000
 
 # Stations 생성 설정
 EQUIPMENTS = 1000
@@ -39,6 +94,23 @@ STATION_ID_START = 300003
 STATION_Y_INTERVAL = 20
 
 # UDP 데이터 생성 설정
+# 경로 탐색 방식: 'ch'(거리 최단, contraction hierarchy 전처리 후 양방향 질의, 대량 질의용),
+# 'alt'(거리 최단, landmark 거리표 하한 사용), 'astar'(거리 최단, 직선 거리 하한 사용),
+# 'dijkstra'(거리 최단), 'bfs'(간선 수 최단)
+UDP_ROUTING_METHOD = 'alt'
+# ALT landmark 수와 거리표 파일 접미사 (output.json -> output.alt.npz, output.json 내용이 바뀌면 다시 계산)
+UDP_ALT_LANDMARKS = 8
+UDP_ALT_FILE_SUFFIX = '.alt.npz'
+# contraction hierarchy 파일 접미사 (output.json -> output.ch.npz, output.json 내용이 바뀌면 다시 생성)
+UDP_CH_FILE_SUFFIX = '.ch.npz'
+# 배치 경로 생성 프로세스 수 (1이면 순차 실행, None이면 CPU 코어 수), worker에 한 번에 넘기는 쌍 수, 로그 파일
+UDP_BATCH_WORKERS = None
+UDP_BATCH_CHUNK_SIZE = 64
+UDP_BATCH_LOG_FILE = 'output_udp_batch.log'
+# True면 line 방향(fromAddress→toAddress)으로만 이동 (False면 모든 line을 양방향으로 사용)
+UDP_ROUTING_DIRECTED = False
+# 방향 모드에서 양방향으로 다닐 수 있는 line ID 목록 (line dict의 "bidirectional": true도 양방향)
+UDP_BIDIRECTIONAL_LINES = []
 UDP_START_ADDRESS = 100059
 UDP_DESTINATION_ADDRESS = 103360
 UDP_IP = '10.10.10.1'
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contraction Hierarchy - 같은 layout에 대한 대량 최단 경로 질의용 전처리 / 질의 모듈
+RoutingGraph의 노드를 중요도 순으로 축약하면서 필요한 shortcut 간선을 추가하고,
+질의는 순위가 올라가는 간선만 따라가는 양방향 Dijkstra로 처리합니다.
+shortcut은 거쳐 간 노드(middle)를 기억하므로 원래 address 경로로 풀어낼 수 있습니다.
+"""
+
+import heapq
+import json
+import math
+import os
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from routing import RoutingGraph
+
+# witness 탐색에서 확정할 최대 노드 수 (넘으면 shortcut을 추가하는 쪽으로 판단)
+WITNESS_SETTLE_LIMIT = 500
+
+
+def _csr(node_count: int, owners: List[int], targets: List[int], weights: List[float], middles: List[int]):
+    """owner 노드별 (targets, weights, middles) 목록을 CSR 배열로 변환합니다."""
+    owners = np.asarray(owners, dtype=np.int64)
+    order = np.argsort(owners, kind='stable')
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owners, minlength=node_count), out=offsets[1:])
+    return (
+        offsets,
+        np.asarray(targets, dtype=np.int64)[order],
+        np.asarray(weights, dtype=np.float64)[order],
+        np.asarray(middles, dtype=np.int64)[order]
+    )
+
+
+class ContractionHierarchy:
+    """노드 순위와 위쪽 방향 간선(정방향 / 역방향 CSR), shortcut의 middle 노드"""
+
+    VERSION = 1
+
+    def __init__(self, node_ids: List[int], rank: np.ndarray, forward: Tuple, backward: Tuple, meta: Dict):
+        self.node_ids = list(node_ids)
+        self.index = {addr_id: i for i, addr_id in enumerate(self.node_ids)}
+        self.rank = np.asarray(rank, dtype=np.int64)
+        # forward: v -> w (rank[w] > rank[v]), backward: v <- u (rank[u] > rank[v])를 v 기준으로 저장
+        self.forward = forward
+        self.backward = backward
+        self.meta = meta
+        # 탐색 루프에서는 list 사용
+        self._forward = tuple(array.tolist() for array in forward[:3])
+        self._backward = tuple(array.tolist() for array in backward[:3])
+        # 경로 풀기용 (from, to) -> middle 노드 (-1이면 원래 간선)
+        self._middles = {}
+        for offsets, targets, middles, reverse in (
+            (forward[0], forward[1], forward[3], False), (backward[0], backward[1], backward[3], True)
+        ):
+            owners = np.repeat(np.arange(len(self.node_ids)), np.diff(offsets)).tolist()
+            for owner, other, middle in zip(owners, targets.tolist(), middles.tolist()):
+                self._middles[(other, owner) if reverse else (owner, other)] = middle
+
+    def __reduce__(self):
+        """pickle(배치 worker 프로세스로 전달)에는 배열만 담고, 탐색용 list와 middle 색인은 받는 쪽에서 다시 만듭니다."""
+        return ContractionHierarchy, (self.node_ids, self.rank, self.forward, self.backward, self.meta)
+
+    @classmethod
+    def build(cls, graph: RoutingGraph, meta: Dict) -> 'ContractionHierarchy':
+        """노드를 (edge difference + 이미 축약된 이웃 수)가 작은 순으로 축약하여 hierarchy를 만듭니다.
+
+        우선순위는 꺼낼 때 다시 계산하는 lazy update 방식이며, 노드 v를 축약할 때 u→v→w보다 짧은 우회 경로
+        (witness)가 없는 경우에만 shortcut u→w를 추가합니다. 원래 간선과 shortcut은 모두 남겨 두고
+        순위가 올라가는 방향만 질의에 사용합니다.
+        """
+        node_count = len(graph)
+        offsets, targets, weights = graph.adjacency()
+        out_edges = [dict() for _ in range(node_count)]
+        in_edges = [dict() for _ in range(node_count)]
+        for v in range(node_count):
+            for i in range(offsets[v], offsets[v + 1]):
+                w, weight = targets[i], weights[i]
+                if w == v or math.isinf(weight):
+                    continue
+                if weight < out_edges[v].get(w, (math.inf,))[0]:
+                    out_edges[v][w] = (weight, -1)
+                    in_edges[w][v] = (weight, -1)
+
+        contracted = [False] * node_count
+        deleted_neighbors = [0] * node_count
+
+        def witness_distances(source: int, excluded: int, limit: float, wanted: set) -> Dict[int, float]:
+            """excluded와 축약된 노드를 지나지 않는 source 기준 거리 (limit / 확정 노드 수 제한)"""
+            dist = {source: 0.0}
+            heap = [(0.0, source)]
+            settled = 0
+            remaining = len(wanted)
+            while heap and remaining and settled < WITNESS_SETTLE_LIMIT:
+                d, v = heapq.heappop(heap)
+                if d > dist[v]:
+                    continue
+                if d > limit:
+                    break
+                settled += 1
+                if v in wanted:
+                    remaining -= 1
+                for w, (weight, _) in out_edges[v].items():
+                    if w == excluded or contracted[w]:
+                        continue
+                    candidate = d + weight
+                    if candidate < dist.get(w, math.inf):
+                        dist[w] = candidate
+                        heapq.heappush(heap, (candidate, w))
+            return dist
+
+        def contraction_shortcuts(v: int) -> Tuple[List[Tuple[int, int, float]], int]:
+            """v를 축약할 때 필요한 shortcut (u, w, 가중치) 목록과 v에 남은 간선 수"""
+            ins = [(u, weight) for u, (weight, _) in in_edges[v].items() if not contracted[u]]
+            outs = [(w, weight) for w, (weight, _) in out_edges[v].items() if not contracted[w]]
+            shortcuts = []
+            if ins and outs:
+                max_out = max(weight for _, weight in outs)
+                for u, in_weight in ins:
+                    needed = {w: in_weight + out_weight for w, out_weight in outs if w != u}
+                    if not needed:
+                        continue
+                    dist = witness_distances(u, v, in_weight + max_out, set(needed))
+                    shortcuts.extend((u, w, weight) for w, weight in needed.items() if dist.get(w, math.inf) > weight)
+            return shortcuts, len(ins) + len(outs)
+
+        def priority(v: int, shortcuts: List, degree: int) -> int:
+            return len(shortcuts) - degree + deleted_neighbors[v]
+
+        heap = [(priority(v, *contraction_shortcuts(v)), v) for v in range(node_count)]
+        heapq.heapify(heap)
+        rank = np.zeros(node_count, dtype=np.int64)
+        order = 0
+        shortcut_count = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            shortcuts, degree = contraction_shortcuts(v)
+            current = priority(v, shortcuts, degree)
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, v))
+                continue
+
+            contracted[v] = True
+            rank[v] = order
+            order += 1
+            for u, w, weight in shortcuts:
+                if weight < out_edges[u].get(w, (math.inf,))[0]:
+                    out_edges[u][w] = (weight, v)
+                    in_edges[w][u] = (weight, v)
+                    shortcut_count += 1
+            for neighbor in set(in_edges[v]) | set(out_edges[v]):
+                if not contracted[neighbor]:
+                    deleted_neighbors[neighbor] += 1
+
+        forward = ([], [], [], [])
+        backward = ([], [], [], [])
+        for u in range(node_count):
+            for w, (weight, middle) in out_edges[u].items():
+                owner, other, side = (u, w, forward) if rank[w] > rank[u] else (w, u, backward)
+                side[0].append(owner)
+                side[1].append(other)
+                side[2].append(weight)
+                side[3].append(middle)
+        meta = dict(meta, shortcuts=shortcut_count)
+        return cls(graph.node_ids, rank, _csr(node_count, *forward), _csr(node_count, *backward), meta)
+
+    @classmethod
+    def load(cls, path: str, meta: Dict) -> Optional['ContractionHierarchy']:
+        """저장된 hierarchy를 읽습니다. 없거나 layout 해시 / 설정(meta)이 다르면 None을 반환합니다."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                stored_meta = json.loads(str(data['meta']))
+                if stored_meta.get('version') != cls.VERSION or \
+                        {key: stored_meta.get(key) for key in meta} != meta:
+                    return None
+                forward = tuple(data[f'forward_{name}'] for name in ('offsets', 'targets', 'weights', 'middles'))
+                backward = tuple(data[f'backward_{name}'] for name in ('offsets', 'targets', 'weights', 'middles'))
+                return cls(data['node_ids'].tolist(), data['rank'], forward, backward, stored_meta)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, path: str):
+        """hierarchy를 압축 .npz로 저장합니다."""
+        arrays = {'node_ids': np.asarray(self.node_ids, dtype=np.int64), 'rank': self.rank}
+        for prefix, side in (('forward', self.forward), ('backward', self.backward)):
+            for name, array in zip(('offsets', 'targets', 'weights', 'middles'), side):
+                arrays[f'{prefix}_{name}'] = array
+        arrays['meta'] = np.array(json.dumps(dict(self.meta, version=self.VERSION), sort_keys=True))
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+    @property
+    def shortcut_count(self) -> int:
+        return int((self.forward[3] >= 0).sum() + (self.backward[3] >= 0).sum())
+
+    def shortest_path(self, source: int, target: int) -> Tuple[Optional[List[int]], float]:
+        """양방향 위쪽 Dijkstra로 최단 경로 노드 목록(shortcut을 푼 원래 경로)과 거리를 반환합니다.
+
+        두 방향 힙의 최솟값이 모두 지금까지 찾은 최단 거리 이상이 되면 멈춥니다.
+        """
+        if source == target:
+            return [source], 0.0
+        sides = (
+            (self._forward, {source: 0.0}, {source: -1}, [(0.0, source)]),
+            (self._backward, {target: 0.0}, {target: -1}, [(0.0, target)])
+        )
+        best = math.inf
+        meeting = -1
+        while True:
+            tops = [side[3][0][0] if side[3] else math.inf for side in sides]
+            if min(tops) >= best:
+                break
+            current = 0 if tops[0] <= tops[1] else 1
+            (offsets, targets, weights), dist, parent, heap = sides[current]
+            other_dist = sides[1 - current][1]
+            d, v = heapq.heappop(heap)
+            if d > dist[v]:
+                continue
+            if v in other_dist and d + other_dist[v] < best:
+                best = d + other_dist[v]
+                meeting = v
+            for i in range(offsets[v], offsets[v + 1]):
+                w = targets[i]
+                candidate = d + weights[i]
+                if candidate < dist.get(w, math.inf):
+                    dist[w] = candidate
+                    parent[w] = v
+                    heapq.heappush(heap, (candidate, w))
+
+        if meeting == -1:
+            return None, math.inf
+        up_path = RoutingGraph.unwind(sides[0][2], meeting)
+        v = sides[1][2][meeting]
+        while v != -1:
+            up_path.append(v)
+            v = sides[1][2][v]
+        return self.unpack(up_path), best
+
+    def unpack(self, path: List[int]) -> List[int]:
+        """hierarchy 경로의 shortcut을 middle 노드로 재귀적으로 풀어 원래 간선 경로로 만듭니다."""
+        result = [path[0]]
+        stack = [(a, b) for a, b in zip(reversed(path[:-1]), reversed(path[1:]))]
+        while stack:
+            a, b = stack.pop()
+            middle = self._middles[(a, b)]
+            if middle < 0:
+                result.append(b)
+            else:
+                stack.append((middle, b))
+                stack.append((a, middle))
+        return result
+
+    def route(self, start_address: int, destination_address: int) -> Optional[List[int]]:
+        """address ID로 질의하여 generate_path_data가 쓰는 address 순서 목록을 반환합니다. (경로가 없으면 None)"""
+        if start_address not in self.index or destination_address not in self.index:
+            return None
+        path, _ = self.shortest_path(self.index[start_address], self.index[destination_address])
+        return None if path is None else [self.node_ids[v] for v in path]
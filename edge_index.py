@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Edge Index - lines의 연결 관계를 증분 갱신하는 인덱스 모듈
+무방향 canonical pair 집합, 방향 인접 리스트, address별 연결 수(degree)를 함께 관리하여
+line 존재 여부와 degree 조회를 O(1)로 처리합니다.
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+
+class EdgeIndex:
+    def __init__(self):
+        # (min(from, to), max(from, to)) -> 해당 pair를 잇는 line 수
+        self.pair_counts = Counter()
+        # from -> {to: line 수}, to -> {from: line 수} (삽입 순서 유지)
+        self.successors_map = defaultdict(dict)
+        self.predecessors_map = defaultdict(dict)
+        # address -> {이웃 address: line 수} (방향 무관, 삽입 순서 유지)
+        self.neighbors_map = defaultdict(dict)
+        # address -> fromAddress/toAddress로 사용된 횟수
+        self.degrees = Counter()
+        self.line_count = 0
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[Dict]):
+        """line dict 목록(fromAddress, toAddress)으로 인덱스를 생성합니다."""
+        index = cls()
+        for line in lines:
+            from_addr = line.get('fromAddress')
+            to_addr = line.get('toAddress')
+            if from_addr is not None and to_addr is not None:
+                index.add_line(from_addr, to_addr)
+        return index
+
+    @classmethod
+    def from_pairs(cls, from_ids: Iterable[int], to_ids: Iterable[int]):
+        """fromAddress / toAddress 배열로 인덱스를 생성합니다."""
+        index = cls()
+        for from_addr, to_addr in zip(from_ids, to_ids):
+            index.add_line(from_addr, to_addr)
+        return index
+
+    @staticmethod
+    def canonical(from_addr: int, to_addr: int) -> Tuple[int, int]:
+        """방향과 무관한 pair 키를 반환합니다."""
+        return (from_addr, to_addr) if from_addr <= to_addr else (to_addr, from_addr)
+
+    @staticmethod
+    def _increment(mapping: Dict, key: int):
+        mapping[key] = mapping.get(key, 0) + 1
+
+    @staticmethod
+    def _decrement(mapping: Dict, key: int):
+        count = mapping.get(key, 0) - 1
+        if count > 0:
+            mapping[key] = count
+        else:
+            mapping.pop(key, None)
+
+    def add_line(self, from_addr: int, to_addr: int):
+        """line 하나를 인덱스에 추가합니다."""
+        self.pair_counts[self.canonical(from_addr, to_addr)] += 1
+        self._increment(self.successors_map[from_addr], to_addr)
+        self._increment(self.predecessors_map[to_addr], from_addr)
+        self._increment(self.neighbors_map[from_addr], to_addr)
+        if from_addr != to_addr:
+            self._increment(self.neighbors_map[to_addr], from_addr)
+        self.degrees[from_addr] += 1
+        self.degrees[to_addr] += 1
+        self.line_count += 1
+
+    def remove_line(self, from_addr: int, to_addr: int) -> bool:
+        """line 하나를 인덱스에서 제거합니다. 존재하지 않으면 False를 반환합니다."""
+        if self.successors_map.get(from_addr, {}).get(to_addr, 0) == 0:
+            return False
+
+        key = self.canonical(from_addr, to_addr)
+        self.pair_counts[key] -= 1
+        if self.pair_counts[key] <= 0:
+            del self.pair_counts[key]
+        self._decrement(self.successors_map[from_addr], to_addr)
+        self._decrement(self.predecessors_map[to_addr], from_addr)
+        self._decrement(self.neighbors_map[from_addr], to_addr)
+        if from_addr != to_addr:
+            self._decrement(self.neighbors_map[to_addr], from_addr)
+        for addr in (from_addr, to_addr):
+            self.degrees[addr] -= 1
+            if self.degrees[addr] <= 0:
+                del self.degrees[addr]
+        self.line_count -= 1
+        return True
+
+    def has_edge(self, addr1: int, addr2: int) -> bool:
+        """방향과 무관하게 두 address를 잇는 line이 있는지 확인합니다."""
+        return self.canonical(addr1, addr2) in self.pair_counts
+
+    def has_directed_edge(self, from_addr: int, to_addr: int) -> bool:
+        """from_addr -> to_addr 방향의 line이 있는지 확인합니다."""
+        return to_addr in self.successors_map.get(from_addr, {})
+
+    def degree(self, addr: int) -> int:
+        """address가 fromAddress/toAddress로 사용된 횟수를 반환합니다."""
+        return self.degrees.get(addr, 0)
+
+    def neighbors(self, addr: int) -> List[int]:
+        """방향과 무관하게 연결된 address 목록을 반환합니다."""
+        return list(self.neighbors_map.get(addr, {}))
+
+    def successors(self, addr: int) -> List[int]:
+        """addr에서 나가는 방향으로 연결된 address 목록을 반환합니다."""
+        return list(self.successors_map.get(addr, {}))
+
+    def predecessors(self, addr: int) -> List[int]:
+        """addr로 들어오는 방향으로 연결된 address 목록을 반환합니다."""
+        return list(self.predecessors_map.get(addr, {}))
+
+    def undirected_adjacency(self) -> Dict[int, List[int]]:
+        """모든 address의 무방향 인접 리스트를 반환합니다."""
+        return {addr: list(nbrs) for addr, nbrs in self.neighbors_map.items() if nbrs}
+
+    def addresses_with_degree(self, degree: int) -> List[int]:
+        """연결 수가 정확히 degree인 address 목록을 반환합니다."""
+        return [addr for addr, count in self.degrees.items() if count == degree]
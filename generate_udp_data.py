@@ -6,23 +6,43 @@ output.json의 addresses와 lines 정보를 기반으로 경로를 생성하고
 UDP 로그 데이터를 output_udp_data.log 파일에 저장합니다.
 """
 
+import csv
+import hashlib
+import io
 import json
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import math
 from config import *
+from routing import LandmarkTable, RoutingGraph
+from contraction_hierarchy import ContractionHierarchy
+
+# 배치 worker 프로세스의 생성기 (initializer가 전달받은 routing_engine()으로 한 번 준비)
+_BATCH_GENERATOR = None
 
 class UDPDataGenerator:
     def __init__(self):
         self.output_data = None
-        self.address_graph = {}
         self.address_coords = {}
+        self.routing_graph = None
+        self.landmarks = None
+        self.hierarchy = None
+        # output.json 내용 해시 (landmark 거리표 무효화 기준)
+        self.layout_hash = None
+        # 경로 탐색 방식 ('ch' / 'alt' / 'astar' / 'dijkstra': 거리 가중치, 'bfs': 간선 수 기준)
+        self.routing_method = UDP_ROUTING_METHOD
+        # True면 line 방향(fromAddress→toAddress)대로만 이동 (양방향 line은 UDP_BIDIRECTIONAL_LINES / "bidirectional")
+        self.directed = UDP_ROUTING_DIRECTED
         
     def load_output_data(self):
         """output.json 파일을 로드합니다."""
         try:
-            with open('output.json', 'r', encoding='utf-8') as f:
-                self.output_data = json.load(f)
+            with open('output.json', 'rb') as f:
+                content = f.read()
+            self.layout_hash = hashlib.sha256(content).hexdigest()
+            self.output_data = json.loads(content.decode('utf-8'))
             return True
         except Exception as e:
             print(f"output.json 로드 실패: {e}")
@@ -40,22 +60,58 @@ class UDPDataGenerator:
                 if 'address' in addr and 'pos' in addr and 'x' in addr['pos'] and 'y' in addr['pos']:
                     self.address_coords[addr['address']] = (addr['pos']['x'], addr['pos']['y'])
         
-        # 라인 정보로 그래프 구성
-        for line in self.output_data['lines']:
-            if 'fromAddress' in line and 'toAddress' in line:
-                from_addr = line['fromAddress']
-                to_addr = line['toAddress']
-                
-                if from_addr not in self.address_graph:
-                    self.address_graph[from_addr] = []
-                if to_addr not in self.address_graph:
-                    self.address_graph[to_addr] = []
-                    
-                self.address_graph[from_addr].append(to_addr)
-                self.address_graph[to_addr].append(from_addr)
+        # 라인 정보로 경로 탐색용 CSR 그래프 구성 (간선 가중치 = address 좌표 간 유클리드 거리)
+        self.routing_graph = RoutingGraph.from_output(
+            self.output_data.get('addresses', []), self.output_data['lines'],
+            directed=self.directed, bidirectional_lines=UDP_BIDIRECTIONAL_LINES
+        )
+        if self.routing_method == 'alt':
+            self.landmarks = self.load_landmarks()
+        elif self.routing_method == 'ch':
+            self.hierarchy = self.load_hierarchy()
         
         return True
     
+    def routing_meta(self):
+        """전처리 결과 파일이 현재 layout / 그래프 설정과 맞는지 비교하는 값"""
+        return {
+            'layout_hash': self.layout_hash,
+            'directed': self.directed,
+            'bidirectional_lines': sorted(UDP_BIDIRECTIONAL_LINES)
+        }
+    
+    def load_landmarks(self):
+        """layout 옆에 저장된 ALT landmark 거리표를 읽고, 없거나 layout 해시가 다르면 새로 계산하여 저장합니다."""
+        path = os.path.splitext('output.json')[0] + UDP_ALT_FILE_SUFFIX
+        meta = dict(self.routing_meta(), landmarks=UDP_ALT_LANDMARKS)
+        landmarks = LandmarkTable.load(path, meta)
+        if landmarks is not None:
+            return landmarks
+        
+        landmarks = LandmarkTable.build(self.routing_graph, UDP_ALT_LANDMARKS, meta)
+        try:
+            landmarks.save(path)
+            print(f"ALT landmark 거리표 저장: {path} (landmark {len(landmarks.landmarks)}개)")
+        except Exception as e:
+            print(f"ALT landmark 거리표 저장 실패: {e}")
+        return landmarks
+    
+    def load_hierarchy(self):
+        """layout 옆에 저장된 contraction hierarchy를 읽고, 없거나 layout 해시가 다르면 새로 만들어 저장합니다."""
+        path = os.path.splitext('output.json')[0] + UDP_CH_FILE_SUFFIX
+        meta = self.routing_meta()
+        hierarchy = ContractionHierarchy.load(path, meta)
+        if hierarchy is not None:
+            return hierarchy
+        
+        hierarchy = ContractionHierarchy.build(self.routing_graph, meta)
+        try:
+            hierarchy.save(path)
+            print(f"Contraction hierarchy 저장: {path} (shortcut {hierarchy.shortcut_count}개)")
+        except Exception as e:
+            print(f"Contraction hierarchy 저장 실패: {e}")
+        return hierarchy
+    
     def calculate_distance(self, addr1, addr2):
         """두 주소 간의 유클리드 거리를 계산합니다."""
         if addr1 not in self.address_coords or addr2 not in self.address_coords:
@@ -66,35 +122,32 @@ class UDPDataGenerator:
         return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
     
     def find_shortest_path(self, start_addr, destination_addr):
-        """BFS를 사용하여 최단 경로를 찾습니다."""
+        """routing_method에 따라 CH / ALT / A* / Dijkstra(거리 최단) 또는 BFS(간선 수 최단)로 경로를 찾습니다."""
         if start_addr == destination_addr:
             return [start_addr]
             
-        if start_addr not in self.address_graph or destination_addr not in self.address_graph:
+        graph = self.routing_graph
+        if start_addr not in graph.index or destination_addr not in graph.index:
             return None
-            
-        # BFS로 최단 경로 찾기
-        queue = [(start_addr, [start_addr])]
-        visited = set()
         
-        while queue:
-            current, path = queue.pop(0)
-            
-            if current == destination_addr:
-                return path
-                
-            if current in visited:
-                continue
-                
-            visited.add(current)
-            
-            # 연결된 주소들을 확인
-            for next_addr in self.address_graph[current]:
-                if next_addr not in visited:
-                    new_path = path + [next_addr]
-                    queue.append((next_addr, new_path))
+        source = graph.index[start_addr]
+        target = graph.index[destination_addr]
+        if not graph.reachable(source, target):
+            reason = "line 방향상 도달할 수 없음" if graph.directed else "연결되지 않은 주소"
+            print(f"경로 없음: {start_addr} → {destination_addr} ({reason})")
+            return None
+        if self.routing_method == 'bfs':
+            path = graph.hop_path(source, target)
+        elif self.routing_method == 'ch':
+            path, _ = self.hierarchy.shortest_path(source, target)
+        elif self.routing_method == 'alt':
+            path, _ = graph.shortest_path(source, target, landmarks=self.landmarks)
+        else:
+            path, _ = graph.shortest_path(source, target, use_heuristic=self.routing_method != 'dijkstra')
         
-        return None
+        if path is None:
+            return None
+        return [graph.node_ids[v] for v in path]
     
     def generate_udp_log_entry(self, timestamp, current_addr, next_addr, destination_addr):
         """UDP 로그 엔트리를 생성합니다."""
@@ -132,13 +185,16 @@ class UDPDataGenerator:
         if start_address == destination_address:
             return []
         
-        # BFS로 최단 경로 찾기
+        # 최단 경로 찾기
         shortest_path = self.find_shortest_path(start_address, destination_address)
         
         if not shortest_path:
             return []
         
-        # 경로 데이터 생성
+        return self.path_log_entries(shortest_path, destination_address)
+    
+    def path_log_entries(self, shortest_path, destination_address):
+        """address 경로의 구간마다 UDP 로그 엔트리를 만듭니다."""
         path_data = []
         timestamp = int(datetime.now().timestamp() * 1000)
         
@@ -198,10 +254,141 @@ class UDPDataGenerator:
             print(f"로그 파일 저장 실패: {e}")
             return False
 
+    
+    def routing_engine(self):
+        """배치 worker에 넘기는 경로 탐색 상태 (routing_method, directed, 그래프, 선택한 방식의 전처리 결과)
+
+        output.json 내용과 좌표 dict는 담지 않으며, 그래프 / 전처리 결과도 pickle에는 배열만 들어가므로
+        spawn 방식(macOS / Windows 기본)에서도 worker마다 이 값만 한 번 전달됩니다.
+        """
+        return self.routing_method, self.directed, self.routing_graph, self.landmarks, self.hierarchy
+    
+    def iter_batch_routes(self, pairs, workers=None, log_file=None):
+        """(시작, 목적지) 쌍마다 경로와 UDP 로그 엔트리를 구해 입력 순서대로 내보내는 iterator를 반환합니다.
+
+        로그 파일과 worker 프로세스 풀은 호출할 때 바로 준비하므로 설정 오류는 첫 결과 전에 예외로 드러납니다.
+        쌍은 UDP_BATCH_CHUNK_SIZE개씩 묶어 나눠 주며, log_file이 있으면 엔트리를 결과 순서대로 기록합니다.
+        """
+        workers = min(batch_worker_count(workers), max(1, len(pairs)))
+        log = open(log_file, 'w', encoding='utf-8') if log_file else None
+        executor = None
+        try:
+            if workers > 1:
+                executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=self.routing_engine())
+                # worker 시작과 initializer 실행을 여기서 확인
+                executor.submit(_batch_worker_ready).result()
+            else:
+                _init_batch_worker(*self.routing_engine())
+        except Exception:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+            if log:
+                log.close()
+            raise
+        return self._batch_results(pairs, executor, log)
+    
+    @staticmethod
+    def _batch_results(pairs, executor, log):
+        try:
+            run = (lambda fn, items: executor.map(fn, items, chunksize=UDP_BATCH_CHUNK_SIZE)) if executor else map
+            for result in run(_route_batch_pair, list(enumerate(pairs))):
+                if log:
+                    for entry in result['entries']:
+                        log.write(entry + '\n')
+                yield result
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+            if log:
+                log.close()
+
+def batch_worker_count(workers=None):
+    """배치 worker 수를 정수로 검증합니다. (None이면 UDP_BATCH_WORKERS, 그것도 None이면 CPU 수, 최대 os.cpu_count())"""
+    cpu_count = os.cpu_count() or 1
+    if workers is None:
+        workers = UDP_BATCH_WORKERS
+    if workers is None:
+        return cpu_count
+    if isinstance(workers, bool):
+        raise ValueError(f"잘못된 worker 수: {workers!r}")
+    try:
+        workers = int(workers)
+    except (TypeError, ValueError):
+        raise ValueError(f"잘못된 worker 수: {workers!r}")
+    if workers < 1:
+        raise ValueError(f"worker 수는 1 이상이어야 합니다: {workers}")
+    return min(workers, cpu_count)
+
+def _init_batch_worker(routing_method, directed, routing_graph, landmarks, hierarchy):
+    """전달받은 경로 탐색 상태로 이 프로세스의 배치 생성기를 준비합니다."""
+    global _BATCH_GENERATOR
+    generator = UDPDataGenerator()
+    generator.routing_method = routing_method
+    generator.directed = directed
+    generator.routing_graph = routing_graph
+    generator.landmarks = landmarks
+    generator.hierarchy = hierarchy
+    _BATCH_GENERATOR = generator
+
+def _batch_worker_ready():
+    return _BATCH_GENERATOR is not None
+
+def _route_batch_pair(item):
+    """배치 쌍 하나의 경로 / UDP 로그 엔트리 결과 dict (worker 프로세스에서 실행)"""
+    index, (start_address, destination_address) = item
+    path = None
+    entries = []
+    if start_address != destination_address:
+        path = _BATCH_GENERATOR.find_shortest_path(start_address, destination_address)
+        if path:
+            entries = _BATCH_GENERATOR.path_log_entries(path, destination_address)
+    return {
+        'index': index,
+        'start_address': start_address,
+        'destination_address': destination_address,
+        'success': bool(entries),
+        'path': path,
+        'entries': entries
+    }
+
+def normalize_route_pair(item):
+    """[시작, 목적지] 또는 {'start_address', 'destination_address'}를 (int, int) 쌍으로 변환합니다."""
+    if isinstance(item, dict):
+        item = (item.get('start_address'), item.get('destination_address'))
+    if not isinstance(item, (list, tuple)) or len(item) != 2:
+        raise ValueError(f"잘못된 경로 쌍: {item!r}")
+    try:
+        return int(item[0]), int(item[1])
+    except (TypeError, ValueError):
+        raise ValueError(f"잘못된 address 값: {item!r}")
+
+def read_route_pairs_csv(text):
+    """'시작,목적지' 행으로 된 CSV 텍스트를 경로 쌍 목록으로 읽습니다. (숫자가 아닌 첫 행은 헤더로 보고 건너뜀)"""
+    pairs = []
+    for row_number, row in enumerate(csv.reader(io.StringIO(text))):
+        row = [cell.strip() for cell in row if cell.strip()]
+        if not row:
+            continue
+        if row_number == 0 and not row[0].lstrip('-').isdigit():
+            continue
+        pairs.append(normalize_route_pair(row[:2]))
+    return pairs
+
 def generate_udp_data(start_address=None, destination_address=None):
     """UDP 데이터 생성을 위한 래퍼 함수"""
     generator = UDPDataGenerator()
     return generator.run(start_address, destination_address)
 
+def generate_udp_batch(pairs, workers=None, log_file=UDP_BATCH_LOG_FILE):
+    """여러 (시작, 목적지) 쌍의 UDP 데이터를 생성하는 래퍼 함수
+
+    output.json과 그래프(전처리 포함)는 한 번만 준비하고, 결과 dict를 입력 순서대로 내보내는 iterator를 반환합니다.
+    output.json을 읽지 못하면 None을 반환합니다.
+    """
+    generator = UDPDataGenerator()
+    if not generator.load_output_data() or not generator.build_address_graph():
+        return None
+    return generator.iter_batch_routes([normalize_route_pair(pair) for pair in pairs], workers, log_file)
+
 if __name__ == "__main__":
     generate_udp_data()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental Generation - 직전 생성 스냅샷과 input.json을 비교해 바뀐 요소만 다시 생성하는 모듈
+input 요소(crossover 연결, loop rail, shortcut 점)마다 생성된 address / line 조각을 저장해 두고,
+다음 생성에서 내용이 같은 요소는 조각을 그대로(같은 ID로) 재사용합니다.
+"""
+
+import json
+import os
+import zlib
+from collections import defaultdict, deque
+from typing import Dict, List, Optional, Tuple
+
+SNAPSHOT_VERSION = 1
+
+
+def element_key(section: str, element) -> str:
+    """섹션 이름과 요소 내용으로 만든 비교 키 (예: 'z6022.local_loop|[[0,0],[10,0]]')"""
+    return f"{section}|{json.dumps(element, separators=(',', ':'))}"
+
+
+def element_seed(key: str) -> int:
+    """새로 생성하는 요소의 난수 생성기 시드 (실행마다 같은 값)"""
+    return zlib.crc32(key.encode('utf-8'))
+
+
+def match_fragments(fragments: List[Dict], elements: List[Tuple[str, object]]) -> Tuple[List[Optional[Dict]], Dict]:
+    """새 input 요소 목록을 직전 조각과 내용 기준으로 짝지웁니다.
+
+    요소 순서가 바뀌거나 중간에 요소가 추가/삭제되어도 같은 내용의 요소는 재사용되며, 같은 내용이
+    여러 번 나오면 앞에서부터 짝을 짓습니다. (elements와 같은 순서의 조각 또는 None, 섹션별 변경 요약)을 반환합니다.
+    """
+    pool = defaultdict(deque)
+    for fragment in fragments:
+        pool[element_key(fragment['section'], fragment['element'])].append(fragment)
+
+    summary = defaultdict(lambda: {'unchanged': 0, 'added': 0, 'removed': 0})
+    matched = []
+    for section, element in elements:
+        candidates = pool.get(element_key(section, element))
+        fragment = candidates.popleft() if candidates else None
+        summary[section]['unchanged' if fragment else 'added'] += 1
+        matched.append(fragment)
+    for candidates in pool.values():
+        for fragment in candidates:
+            summary[fragment['section']]['removed'] += 1
+    return matched, dict(summary)
+
+
+class GenerationSnapshot:
+    """직전 생성의 설정, 요소별 원본 조각, 후처리로 생긴 address / line의 ID, 다음에 사용할 ID"""
+
+    def __init__(self, settings: Dict, fragments: List[Dict], derived_addresses: List, derived_lines: List,
+                 next_address_id: int, next_line_id: int):
+        self.settings = settings
+        # [{'kind', 'section', 'element', 'addresses', 'lines'}] (투영/병합 전 원본 dict)
+        self.fragments = fragments
+        # 투영으로 생긴 address [id, x, y, z]와 line [id, fromAddress, toAddress]
+        self.derived_addresses = derived_addresses
+        self.derived_lines = derived_lines
+        # 삭제된 요소의 ID를 다시 쓰지 않도록 지금까지 사용한 ID 다음 값을 유지
+        self.next_address_id = next_address_id
+        self.next_line_id = next_line_id
+
+    @property
+    def seed(self):
+        return self.settings.get('seed')
+
+    @classmethod
+    def load(cls, path: str) -> Optional['GenerationSnapshot']:
+        """스냅샷 파일을 읽습니다. 없거나 버전이 다르면 None을 반환합니다."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != SNAPSHOT_VERSION:
+            return None
+        return cls(
+            data['settings'], data['fragments'], data['derived_addresses'], data['derived_lines'],
+            data['next_address_id'], data['next_line_id']
+        )
+
+    def save(self, path: str):
+        data = {
+            'version': SNAPSHOT_VERSION,
+            'settings': self.settings,
+            'next_address_id': self.next_address_id,
+            'next_line_id': self.next_line_id,
+            'fragments': self.fragments,
+            'derived_addresses': self.derived_addresses,
+            'derived_lines': self.derived_lines
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    @staticmethod
+    def remove(path: str):
+        """output.json과 맞지 않게 된 스냅샷을 지웁니다."""
+        if os.path.exists(path):
+            os.remove(path)
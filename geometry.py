@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Geometry - rail 선분의 기하학적 교차/겹침을 찾는 모듈
+선분을 균일 격자에 버킷팅하여 같은 셀을 공유하는 후보 쌍만 NumPy로 검사합니다.
+점에서 가까운 선분을 찾아 투영하는 선분 공간 인덱스(SegmentIndex)도 제공합니다.
+"""
+
+import numpy as np
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+
+def _cell_size_for(starts: np.ndarray, ends: np.ndarray) -> float:
+    """선분 길이의 중앙값을 기준으로 격자 셀 크기를 정합니다."""
+    lengths = np.sqrt(((ends - starts) ** 2).sum(axis=1))
+    positive = lengths[lengths > 0]
+    if len(positive) == 0:
+        return 1.0
+    return float(np.median(positive)) * 4.0
+
+
+def candidate_pairs(starts: np.ndarray, ends: np.ndarray, cell_size: Optional[float] = None, margin: float = 0.0) -> np.ndarray:
+    """bounding box(margin만큼 확장)가 같은 격자 셀에 걸치는 선분 쌍 (i < j)을 (P, 2) 배열로 반환합니다."""
+    n = len(starts)
+    if n < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    if cell_size is None:
+        cell_size = _cell_size_for(starts, ends)
+
+    low = np.minimum(starts, ends) - margin
+    high = np.maximum(starts, ends) + margin
+    origin = low.min(axis=0)
+    c0 = np.floor((low - origin) / cell_size).astype(np.int64)
+    c1 = np.floor((high - origin) / cell_size).astype(np.int64)
+    widths = c1[:, 0] - c0[:, 0] + 1
+    counts = widths * (c1[:, 1] - c0[:, 1] + 1)
+
+    # 각 선분이 걸치는 모든 셀을 (cell key, 선분 번호)로 펼침
+    seg = np.repeat(np.arange(n, dtype=np.int64), counts)
+    local = np.arange(int(counts.sum()), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    cx = c0[seg, 0] + local % widths[seg]
+    cy = c0[seg, 1] + local // widths[seg]
+    keys = cy * (int(c1[:, 0].max()) + 1) + cx
+
+    order = np.lexsort((seg, keys))
+    keys = keys[order]
+    seg = seg[order]
+
+    boundaries = np.flatnonzero(np.diff(keys)) + 1
+    group_starts = np.concatenate(([0], boundaries))
+    group_sizes = np.diff(np.concatenate((group_starts, [len(keys)])))
+
+    # 크기가 같은 셀 그룹끼리 묶어서 triu 인덱스로 쌍을 한 번에 생성
+    pairs = []
+    for size in np.unique(group_sizes[group_sizes > 1]).tolist():
+        starts_of_size = group_starts[group_sizes == size]
+        members = seg[starts_of_size[:, None] + np.arange(size)[None, :]]
+        a, b = np.triu_indices(size, k=1)
+        pairs.append(np.stack([members[:, a].ravel(), members[:, b].ravel()], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+
+    pairs = np.concatenate(pairs)
+    pairs = np.sort(pairs, axis=1)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    return np.unique(pairs, axis=0)
+
+
+def find_segment_intersections(starts, ends, endpoint_ids=None, tolerance: float = 0.01,
+                               cell_size: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """2D 선분들 사이의 교차와 동일선상 겹침을 찾습니다.
+
+    crossings: 한 점에서 만나는 선분 쌍 (끝점끼리 맞닿는 경우와 address를 공유하는 경우 제외)
+    collinear_overlaps: 같은 직선 위에서 tolerance보다 긴 구간이 겹치는 선분 쌍
+    endpoint_ids를 주면 같은 두 address를 잇는 선분 쌍(ID 기반 겹침 검사 대상)은 제외합니다.
+    tolerance만큼 확장한 bounding box가 겹치는 쌍만 검사하므로 결과는 격자 셀 크기와 무관합니다.
+    """
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    empty = np.empty((0, 2), dtype=np.int64)
+    pairs = candidate_pairs(starts, ends, cell_size, margin=tolerance)
+    if len(pairs) > 0:
+        low = np.minimum(starts, ends) - tolerance
+        high = np.maximum(starts, ends) + tolerance
+        boxes_overlap = ((low[pairs[:, 0]] <= high[pairs[:, 1]]) & (low[pairs[:, 1]] <= high[pairs[:, 0]])).all(axis=1)
+        pairs = pairs[boxes_overlap]
+    if len(pairs) == 0:
+        return {'crossings': empty, 'collinear_overlaps': empty}
+
+    i, j = pairs[:, 0], pairs[:, 1]
+    if endpoint_ids is not None:
+        endpoint_ids = np.asarray(endpoint_ids)
+        a0, a1 = endpoint_ids[i, 0], endpoint_ids[i, 1]
+        b0, b1 = endpoint_ids[j, 0], endpoint_ids[j, 1]
+        shares_address = (a0 == b0) | (a0 == b1) | (a1 == b0) | (a1 == b1)
+        same_pair = ((a0 == b0) & (a1 == b1)) | ((a0 == b1) & (a1 == b0))
+    else:
+        shares_address = np.zeros(len(pairs), dtype=bool)
+        same_pair = np.zeros(len(pairs), dtype=bool)
+
+    p1, p2 = starts[i], ends[i]
+    q1, q2 = starts[j], ends[j]
+    d_p = p2 - p1
+    d_q = q2 - q1
+    len_p = np.maximum(np.sqrt((d_p ** 2).sum(axis=1)), 1e-12)
+    len_q = np.maximum(np.sqrt((d_q ** 2).sum(axis=1)), 1e-12)
+
+    def cross(u, v):
+        return u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
+
+    def side(value, length):
+        # 직선까지의 수직 거리가 tolerance 이내면 0 (직선 위)
+        dist = value / length
+        return np.where(np.abs(dist) <= tolerance, 0, np.sign(dist)).astype(np.int8)
+
+    s1 = side(cross(d_p, q1 - p1), len_p)
+    s2 = side(cross(d_p, q2 - p1), len_p)
+    s3 = side(cross(d_q, p1 - q1), len_q)
+    s4 = side(cross(d_q, p2 - q1), len_q)
+
+    # 동일선상 겹침: 두 선분이 같은 직선 위에 있고 투영 구간이 tolerance보다 길게 겹침
+    collinear = (s1 == 0) & (s2 == 0)
+    t1 = ((q1 - p1) * d_p).sum(axis=1) / len_p
+    t2 = ((q2 - p1) * d_p).sum(axis=1) / len_p
+    overlap_len = np.minimum(len_p, np.maximum(t1, t2)) - np.maximum(0.0, np.minimum(t1, t2))
+    collinear_overlap = collinear & (overlap_len > tolerance) & ~same_pair
+
+    # 한 점 교차: 서로가 상대 직선의 양쪽(또는 위)에 걸침
+    intersects = ~collinear & (s1 * s2 <= 0) & (s3 * s4 <= 0)
+    endpoint_gap = np.minimum.reduce([
+        np.sqrt(((p1 - q1) ** 2).sum(axis=1)), np.sqrt(((p1 - q2) ** 2).sum(axis=1)),
+        np.sqrt(((p2 - q1) ** 2).sum(axis=1)), np.sqrt(((p2 - q2) ** 2).sum(axis=1)),
+    ])
+    crossing = intersects & (endpoint_gap > tolerance) & ~shares_address
+
+    return {
+        'crossings': pairs[crossing],
+        'collinear_overlaps': pairs[collinear_overlap]
+    }
+
+
+class SegmentIndex:
+    """2D 선분들을 균일 격자에 버킷팅하여 점 주변의 선분을 찾고 점을 선분 위로 투영하는 인덱스"""
+
+    def __init__(self, starts, ends, cell_size: Optional[float] = None):
+        self.starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        self.ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+        if cell_size is None:
+            cell_size = _cell_size_for(self.starts, self.ends)
+        self.cell_size = float(cell_size)
+
+        # 각 선분의 bounding box가 걸치는 모든 셀에 선분 번호를 등록
+        self.buckets = defaultdict(list)
+        low = np.floor(np.minimum(self.starts, self.ends) / self.cell_size).astype(np.int64)
+        high = np.floor(np.maximum(self.starts, self.ends) / self.cell_size).astype(np.int64)
+        for seg, (x0, y0, x1, y1) in enumerate(np.hstack([low, high]).tolist()):
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    self.buckets[(cx, cy)].append(seg)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def project(self, point, segments: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """point를 각 선분 위로 투영한 (거리, 선분 위 비율 t) 배열을 반환합니다. (t는 0~1로 제한)"""
+        point = np.asarray(point, dtype=np.float64)[:2]
+        a = self.starts[segments]
+        d = self.ends[segments] - a
+        length_sq = (d ** 2).sum(axis=1)
+        t = np.where(length_sq > 0, ((point - a) * d).sum(axis=1) / np.where(length_sq > 0, length_sq, 1.0), 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        distances = np.sqrt(((a + t[:, None] * d - point) ** 2).sum(axis=1))
+        return distances, t
+
+    def query(self, point, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """point로부터 radius 이내의 선분을 (선분 번호, 거리, t) 배열로 반환합니다. (거리, 번호 순)"""
+        empty = (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0))
+        if len(self.starts) == 0 or radius < 0:
+            return empty
+        x, y = float(point[0]), float(point[1])
+        x0, y0 = int(np.floor((x - radius) / self.cell_size)), int(np.floor((y - radius) / self.cell_size))
+        x1, y1 = int(np.floor((x + radius) / self.cell_size)), int(np.floor((y + radius) / self.cell_size))
+        found = set()
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                found.update(self.buckets.get((cx, cy), ()))
+        if not found:
+            return empty
+
+        segments = np.fromiter(sorted(found), dtype=np.int64, count=len(found))
+        distances, t = self.project((x, y), segments)
+        within = distances <= radius
+        segments, distances, t = segments[within], distances[within], t[within]
+        order = np.lexsort((segments, distances))
+        return segments[order], distances[order], t[order]
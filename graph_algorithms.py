@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Graph Algorithms - address 그래프 분석에 공통으로 사용하는 알고리즘 모듈
+"""
+
+import numpy as np
+from typing import Dict, Hashable, List, Sequence
+
+
+class UnionFind:
+    """경로 압축과 union by size를 사용하는 서로소 집합 구조"""
+
+    def __init__(self, size: int = 0):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def add(self) -> int:
+        """새 원소를 추가하고 그 번호를 반환합니다."""
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        return len(self.parent) - 1
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: int, b: int) -> int:
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+    def groups(self) -> List[List[int]]:
+        """원소들을 집합별로 묶어 반환합니다. (각 집합과 집합 목록 모두 첫 원소 순서)"""
+        grouped: Dict[Hashable, List[int]] = {}
+        for x in range(len(self.parent)):
+            grouped.setdefault(self.find(x), []).append(x)
+        return list(grouped.values())
+
+
+def _adjacency_offsets(node_count: int, sources: Sequence[int], targets: Sequence[int]):
+    """(sources -> targets) 간선을 CSR 형태(offsets, 인접 노드 목록)로 변환합니다."""
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=offsets[1:])
+    return offsets.tolist(), targets[order].tolist()
+
+
+def connected_components(node_count: int, sources: Sequence[int], targets: Sequence[int]) -> List[List[int]]:
+    """간선 방향을 무시한 연결 요소를 union-find 한 번으로 구합니다. (노드 번호 0..node_count-1)"""
+    uf = UnionFind(node_count)
+    for a, b in zip(sources, targets):
+        uf.union(a, b)
+    return uf.groups()
+
+
+def strongly_connected_components(node_count: int, sources: Sequence[int], targets: Sequence[int]) -> List[List[int]]:
+    """방향 그래프의 강연결 요소를 반복형 Tarjan 알고리즘으로 구합니다. (역위상 순서로 반환)
+
+    재귀를 쓰지 않으므로 긴 rail 루프에서도 recursion limit에 걸리지 않습니다.
+    """
+    offsets, adjacency = _adjacency_offsets(node_count, sources, targets)
+    index = [-1] * node_count
+    low = [0] * node_count
+    on_stack = [False] * node_count
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(node_count):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [[root, offsets[root]]]
+
+        while work:
+            frame = work[-1]
+            v, ptr = frame
+            if ptr < offsets[v + 1]:
+                frame[1] = ptr + 1
+                w = adjacency[ptr]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append([w, offsets[w]])
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[v] < low[parent]:
+                    low[parent] = low[v]
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(component)
+
+    return components
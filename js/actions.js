@@ -5,7 +5,9 @@ async function runAddAddresses() {
         const result = await res.json();
         hideLoading();
         if (result.success) {
-            showStatus('✅ add Addresses가 성공적으로 실행되었습니다.', 'success');
+            const updated = result.config_updated || {};
+            const cacheNote = updated.cache_hit ? ' (캐시 사용)' : updated.incremental ? ' (증분 생성)' : '';
+            showStatus('✅ add Addresses가 성공적으로 실행되었습니다.' + cacheNote, 'success');
             if (result.execution_output) displayExecutionOutput('add Addresses', result.execution_output, result.config_updated);
         } else {
             showStatus('❌ add Addresses 실행 실패: ' + result.message, 'error');
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Routing - address 그래프의 가중치 최단 경로 탐색 모듈
+lines를 CSR 인접 배열(offsets, targets, weights)로 구성하고, 유클리드 거리 가중치로
+이진 힙 기반 Dijkstra / A* 탐색을 수행합니다. 경로는 parent 포인터로 복원합니다.
+방향 모드에서는 fromAddress→toAddress 간선만 사용하고, 강연결 요소(SCC) 라벨로 도달 불가를 미리 판정합니다.
+LandmarkTable은 ALT(A*, Landmarks, Triangle inequality)용 landmark 거리표를 만들고 저장합니다.
+"""
+
+import heapq
+import json
+import math
+import operator
+import os
+import numpy as np
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+from graph_algorithms import strongly_connected_components
+
+
+class RoutingGraph:
+    """address 그래프의 CSR 인접 배열과 XY 좌표 (노드 번호 0..N-1)"""
+
+    def __init__(self, node_ids: List[int], coords: np.ndarray, sources: np.ndarray, targets: np.ndarray,
+                 directed: bool = False):
+        self.node_ids = list(node_ids)
+        self.directed = directed
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+
+        # 간선 가중치: 양 끝 address 사이의 XY 유클리드 거리 (좌표가 없으면 inf로 사용하지 않음)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        deltas = self.coords[targets] - self.coords[sources]
+        weights = np.hypot(deltas[:, 0], deltas[:, 1])
+        weights[np.isnan(weights)] = np.inf
+
+        order = np.argsort(sources, kind='stable')
+        offsets = np.zeros(len(self.node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(self.node_ids)), out=offsets[1:])
+        self.offsets = offsets
+        self.targets = targets[order]
+        self.weights = weights[order]
+
+        # 노드별 SCC 번호 (Tarjan 출력 순서 = 역위상 순서이므로 C1→C2 간선이면 번호(C2) < 번호(C1))
+        self.components = np.zeros(len(self.node_ids), dtype=np.int64)
+        edge_sources = np.repeat(np.arange(len(self.node_ids)), np.diff(self.offsets))
+        for label, component in enumerate(strongly_connected_components(len(self.node_ids), edge_sources, self.targets)):
+            self.components[component] = label
+        self._build_lookups()
+
+    def _build_lookups(self):
+        """배열에서 ID 색인과 탐색용 list를 만들고 캐시를 비웁니다."""
+        self.index = {addr_id: i for i, addr_id in enumerate(self.node_ids)}
+        # 탐색 루프에서는 numpy 원소 접근보다 빠른 list 사용
+        self._offsets = self.offsets.tolist()
+        self._targets = self.targets.tolist()
+        self._weights = self.weights.tolist()
+        self._x = self.coords[:, 0].tolist()
+        self._y = self.coords[:, 1].tolist()
+        self._components = self.components.tolist()
+        self._component_successors = None
+        self._reachable_cache = {}
+        self._reverse = None
+
+    def __getstate__(self):
+        """pickle(배치 worker 프로세스로 전달)에는 배열만 담고, 색인 / list / 캐시는 받는 쪽에서 다시 만듭니다."""
+        return {name: getattr(self, name) for name in ('node_ids', 'directed', 'coords', 'offsets', 'targets', 'weights', 'components')}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_lookups()
+
+    @classmethod
+    def from_output(cls, addresses: Iterable[Dict], lines: Iterable[Dict], directed: bool = False,
+                    bidirectional_lines: Collection = ()) -> 'RoutingGraph':
+        """output.json의 addresses / lines로 그래프를 구성합니다.
+
+        directed가 False면 모든 line을 양방향으로, True면 fromAddress→toAddress 방향으로만 넣습니다.
+        방향 모드에서도 "bidirectional": true인 line과 ID가 bidirectional_lines에 있는 line은 양방향입니다.
+        좌표가 없는 address도 line에 쓰이면 노드가 되며, 그 노드에 닿는 간선의 가중치는 inf입니다.
+        """
+        bidirectional_lines = set(bidirectional_lines)
+        node_ids = []
+        coords = []
+        index = {}
+        for addr in addresses:
+            addr_id = addr.get('address')
+            pos = addr.get('pos') or {}
+            if addr_id is None or addr_id in index or 'x' not in pos or 'y' not in pos:
+                continue
+            index[addr_id] = len(node_ids)
+            node_ids.append(addr_id)
+            coords.append((pos['x'], pos['y']))
+
+        sources = []
+        targets = []
+        reverse_sources = []
+        reverse_targets = []
+        for line in lines:
+            from_addr = line.get('fromAddress')
+            to_addr = line.get('toAddress')
+            if from_addr is None or to_addr is None:
+                continue
+            for addr_id in (from_addr, to_addr):
+                if addr_id not in index:
+                    index[addr_id] = len(node_ids)
+                    node_ids.append(addr_id)
+                    coords.append((math.nan, math.nan))
+            sources.append(index[from_addr])
+            targets.append(index[to_addr])
+            if not directed or line.get('bidirectional') or line.get('id') in bidirectional_lines:
+                reverse_sources.append(index[to_addr])
+                reverse_targets.append(index[from_addr])
+
+        return cls(node_ids, np.array(coords, dtype=np.float64).reshape(-1, 2),
+                   sources + reverse_sources, targets + reverse_targets, directed=directed)
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._targets)
+
+    def reachable(self, source: int, target: int) -> bool:
+        """SCC 라벨로 source에서 target에 도달할 수 있는지 판정합니다. (탐색 없이 도달 불가를 보고하는 용도)
+
+        같은 SCC면 도달 가능하고, target SCC 번호가 더 크면 역위상 순서상 도달 불가입니다.
+        나머지는 SCC 축약 그래프(DAG)에서 target 번호 이상인 요소만 따라가며 확인하고 결과를 캐시합니다.
+        """
+        cs, ct = self._components[source], self._components[target]
+        if cs == ct:
+            return True
+        if ct > cs:
+            return False
+        key = (cs, ct)
+        if key not in self._reachable_cache:
+            successors = self.component_successors()
+            seen = {cs}
+            stack = [cs]
+            found = False
+            while stack and not found:
+                for nxt in successors[stack.pop()]:
+                    if nxt == ct:
+                        found = True
+                        break
+                    if nxt > ct and nxt not in seen:
+                        seen.add(nxt)
+                        stack.append(nxt)
+            self._reachable_cache[key] = found
+        return self._reachable_cache[key]
+
+    def component_successors(self) -> List[List[int]]:
+        """SCC 축약 그래프의 요소별 다음 요소 목록 (처음 호출할 때 구성)"""
+        if self._component_successors is None:
+            edge_sources = np.repeat(np.arange(len(self.node_ids)), np.diff(self.offsets))
+            pairs = np.unique(np.stack([self.components[edge_sources], self.components[self.targets]], axis=1), axis=0)
+            successors = [[] for _ in range(int(self.components.max(initial=-1)) + 1)]
+            for a, b in pairs.tolist():
+                if a != b:
+                    successors[a].append(b)
+            self._component_successors = successors
+        return self._component_successors
+
+    def adjacency(self, reverse: bool = False) -> Tuple[List[int], List[int], List[float]]:
+        """탐색용 (offsets, targets, weights) list. reverse면 간선 방향을 뒤집은 CSR (처음 호출할 때 구성)"""
+        if not reverse or not self.directed:
+            return self._offsets, self._targets, self._weights
+        if self._reverse is None:
+            edge_sources = np.repeat(np.arange(len(self.node_ids)), np.diff(self.offsets))
+            order = np.argsort(self.targets, kind='stable')
+            offsets = np.zeros(len(self.node_ids) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.targets, minlength=len(self.node_ids)), out=offsets[1:])
+            self._reverse = (offsets.tolist(), edge_sources[order].tolist(), self.weights[order].tolist())
+        return self._reverse
+
+    def distances(self, source: int, reverse: bool = False) -> np.ndarray:
+        """source에서 모든 노드까지의 최단 거리 (reverse면 모든 노드에서 source까지, 도달 불가는 inf)"""
+        offsets, targets, weights = self.adjacency(reverse)
+        dist = [math.inf] * len(self.node_ids)
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > dist[v]:
+                continue
+            for i in range(offsets[v], offsets[v + 1]):
+                w = targets[i]
+                candidate = d + weights[i]
+                if candidate < dist[w]:
+                    dist[w] = candidate
+                    heapq.heappush(heap, (candidate, w))
+        return np.array(dist, dtype=np.float64)
+
+    def heuristic(self, target: int):
+        """target까지의 XY 직선 거리 (A*의 허용 가능한 하한, 좌표가 없으면 0)"""
+        tx, ty = self._x[target], self._y[target]
+        xs, ys = self._x, self._y
+        if math.isnan(tx):
+            return lambda v: 0.0
+
+        def estimate(v: int) -> float:
+            distance = math.hypot(xs[v] - tx, ys[v] - ty)
+            return 0.0 if distance != distance else distance
+        return estimate
+
+    def shortest_path(self, source: int, target: int, use_heuristic: bool = True,
+                      landmarks: Optional['LandmarkTable'] = None) -> Tuple[Optional[List[int]], float]:
+        """source에서 target까지의 최단 경로 노드 목록과 거리를 반환합니다. (경로가 없으면 (None, inf))
+
+        use_heuristic이 True면 A*, False면 Dijkstra로 탐색하고, landmarks가 있으면 ALT 하한을 사용합니다.
+        힙에는 (우선순위, 노드)만 넣고 경로는 parent 포인터로 한 번만 복원하므로 경로 길이에 비례하는 복사가 없습니다.
+        """
+        if source == target:
+            return [source], 0.0
+        if not self.reachable(source, target):
+            return None, math.inf
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+        if landmarks is not None:
+            estimate = landmarks.heuristic(self, target)
+        else:
+            estimate = self.heuristic(target) if use_heuristic else None
+        dist = {source: 0.0}
+        parent = {source: -1}
+        closed = set()
+        heap = [(estimate(source) if estimate else 0.0, source)]
+
+        while heap:
+            _, v = heapq.heappop(heap)
+            if v in closed:
+                continue
+            if v == target:
+                return self.unwind(parent, target), dist[target]
+            closed.add(v)
+            base = dist[v]
+            for i in range(offsets[v], offsets[v + 1]):
+                w = targets[i]
+                candidate = base + weights[i]
+                if candidate < dist.get(w, math.inf):
+                    dist[w] = candidate
+                    parent[w] = v
+                    heapq.heappush(heap, (candidate + estimate(w) if estimate else candidate, w))
+
+        return None, math.inf
+
+    def hop_path(self, source: int, target: int) -> Optional[List[int]]:
+        """간선 수 기준 최단 경로(BFS)를 반환합니다. (경로가 없으면 None)"""
+        if source == target:
+            return [source]
+        if not self.reachable(source, target):
+            return None
+        offsets, targets = self._offsets, self._targets
+        parent = {source: -1}
+        frontier = [source]
+        while frontier:
+            next_frontier = []
+            for v in frontier:
+                for i in range(offsets[v], offsets[v + 1]):
+                    w = targets[i]
+                    if w in parent:
+                        continue
+                    parent[w] = v
+                    if w == target:
+                        return self.unwind(parent, target)
+                    next_frontier.append(w)
+            frontier = next_frontier
+        return None
+
+    @staticmethod
+    def unwind(parent: Dict[int, int], target: int) -> List[int]:
+        """parent 포인터를 따라 target까지의 경로를 복원합니다."""
+        path = []
+        v = target
+        while v != -1:
+            path.append(v)
+            v = parent[v]
+        path.reverse()
+        return path
+
+
+class LandmarkTable:
+    """ALT용 landmark 거리표: landmark마다 모든 노드까지 / 모든 노드에서의 최단 거리 (float32)
+
+    삼각 부등식으로 d(v, t) >= d(L, t) - d(L, v), d(v, t) >= d(v, L) - d(t, L)이므로
+    여러 landmark 중 가장 큰 값이 A*의 하한이 됩니다. 거리표는 layout 해시와 함께 .npz로 저장합니다.
+    """
+
+    VERSION = 1
+    # 도달 불가 거리(inf)를 대신하는 값 (두 값의 차가 inf - inf = nan이 되지 않도록)
+    _UNREACHABLE = 1e300
+
+    def __init__(self, landmarks: np.ndarray, from_landmarks: np.ndarray, to_landmarks: np.ndarray, meta: Dict):
+        self.landmarks = np.asarray(landmarks, dtype=np.int64)
+        self.from_landmarks = np.asarray(from_landmarks, dtype=np.float32)
+        self.to_landmarks = np.asarray(to_landmarks, dtype=np.float32)
+        self.meta = meta
+        # float32 반올림으로 하한이 실제 거리보다 커지지 않도록 빼는 여유값
+        finite = self.from_landmarks[np.isfinite(self.from_landmarks)]
+        self.slack = float(finite.max()) * 2.0 ** -22 if finite.size else 0.0
+        self._rows = None
+
+    def __getstate__(self):
+        """pickle(배치 worker 프로세스로 전달)에는 배열만 담고, 노드별 행 list는 받는 쪽에서 다시 만듭니다."""
+        return dict(self.__dict__, _rows=None)
+
+    @classmethod
+    def build(cls, graph: RoutingGraph, count: int, meta: Dict) -> 'LandmarkTable':
+        """farthest-point 방식으로 landmark를 골라 거리표를 계산합니다.
+
+        매번 기존 landmark들에서 가장 먼 노드를 고르며, 어떤 landmark와도 이어지지 않은 노드(다른 연결 요소)가
+        있으면 그 노드를 먼저 고릅니다. 방향 그래프는 정방향 / 역방향 거리를 각각 계산합니다.
+        """
+        node_count = len(graph)
+        count = min(count, node_count)
+        landmarks = []
+        from_rows = []
+        to_rows = []
+        if count:
+            first = graph.distances(0)
+            finite = np.where(np.isfinite(first), first, -1.0)
+            landmark = int(np.argmax(finite))
+            closest = np.full(node_count, np.inf)
+            for _ in range(count):
+                from_row = graph.distances(landmark)
+                to_row = graph.distances(landmark, reverse=True) if graph.directed else from_row
+                landmarks.append(landmark)
+                from_rows.append(from_row)
+                to_rows.append(to_row)
+                closest = np.minimum(closest, np.minimum(from_row, to_row))
+                closest[landmarks] = -1.0
+                landmark = int(np.argmax(closest))
+        shape = (len(landmarks), node_count)
+        return cls(
+            np.array(landmarks, dtype=np.int64),
+            np.array(from_rows, dtype=np.float32).reshape(shape),
+            np.array(to_rows, dtype=np.float32).reshape(shape),
+            meta
+        )
+
+    @classmethod
+    def load(cls, path: str, meta: Dict) -> Optional['LandmarkTable']:
+        """저장된 거리표를 읽습니다. 없거나 layout 해시 / 설정(meta)이 다르면 None을 반환합니다."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                stored_meta = json.loads(str(data['meta']))
+                if stored_meta != dict(meta, version=cls.VERSION):
+                    return None
+                from_landmarks = data['from_landmarks']
+                to_landmarks = data['to_landmarks'] if data['to_landmarks'].size else from_landmarks
+                return cls(data['landmarks'], from_landmarks, to_landmarks, meta)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, path: str):
+        """거리표를 압축 .npz로 저장합니다. (무방향 그래프는 정방향 거리표 하나만 저장)"""
+        directed = not np.array_equal(self.to_landmarks, self.from_landmarks)
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                landmarks=self.landmarks,
+                from_landmarks=self.from_landmarks,
+                to_landmarks=self.to_landmarks if directed else np.empty((0, 0), dtype=np.float32),
+                meta=np.array(json.dumps(dict(self.meta, version=self.VERSION), sort_keys=True))
+            )
+
+    def heuristic(self, graph: RoutingGraph, target: int):
+        """target까지의 하한을 탐색이 방문하는 노드마다 계산합니다. (ALT 하한과 XY 직선 거리 중 큰 값)
+
+        v에서 target에 도달할 수 없음이 거리표로 드러나면 하한은 매우 큰 값(_UNREACHABLE 수준)입니다.
+        """
+        if self._rows is None:
+            # 노드 v의 행 = from_landmarks[:, v]와 -to_landmarks[:, v]를 이은 리스트 (첫 질의에서 한 번만 만듦)
+            # 행끼리 빼면 d(L, t) - d(L, v)와 d(v, L) - d(t, L)이 한 번에 나오며,
+            # inf - inf가 nan이 되지 않도록 도달 불가(inf)는 큰 유한값으로 바꿔 둠
+            table = np.concatenate([self.from_landmarks, -self.to_landmarks]).astype(np.float64)
+            self._rows = np.clip(table, -self._UNREACHABLE, self._UNREACHABLE).T.tolist()
+        rows = self._rows
+        target_row = rows[target]
+        slack = self.slack
+        straight = graph.heuristic(target)
+        if not target_row:
+            return straight
+
+        def estimate(v: int) -> float:
+            bound = max(map(operator.sub, target_row, rows[v])) - slack
+            distance = straight(v)
+            return distance if distance > bound else bound
+        return estimate
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Spatial Index - address 좌표에 대한 균일 격자(uniform grid) 기반 공간 인덱스 모듈
+k-NN 검색, 반경 검색, 제외 ID 필터, Z 레이어별 분할을 지원합니다.
+"""
+
+import math
+import numpy as np
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from graph_algorithms import UnionFind
+
+# batch_knn 한 번에 처리할 query 수와 (query x 후보) 거리 행렬의 최대 크기
+BATCH_CHUNK_SIZE = 32
+BATCH_MAX_PAIRS = 4_000_000
+
+class SpatialIndex:
+    def __init__(self, ids, positions, cell_size: Optional[float] = None, partition_by_z: bool = False):
+        """ids와 (N, 3) 좌표 배열로 격자 인덱스를 구성합니다.
+
+        partition_by_z가 True이면 같은 Z 값을 가진 점들끼리만 검색합니다.
+        cell_size를 지정하지 않으면 점 밀도로부터 셀 크기를 추정합니다.
+        """
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        self.partition_by_z = partition_by_z
+        self.id_to_index = {int(addr_id): i for i, addr_id in enumerate(self.ids.tolist())}
+
+        if cell_size is None:
+            cell_size = self._estimate_cell_size()
+        self.cell_size = float(cell_size)
+
+        # Z 레이어별 격자: {z: {(cx, cy, cz): np.ndarray(indices)}}
+        self.grids = {}
+        self.grid_bounds = {}
+        self.layer_indices = {}
+        self._build()
+
+    @classmethod
+    def from_addresses(cls, addresses: Iterable[Dict], cell_size: Optional[float] = None, partition_by_z: bool = False):
+        """address dict 목록(id, pos)으로 인덱스를 생성합니다."""
+        ids = []
+        positions = []
+        for addr in addresses:
+            pos = addr.get('pos', {}) or {}
+            ids.append(addr.get('id'))
+            positions.append((pos.get('x', 0), pos.get('y', 0), pos.get('z', 0)))
+        return cls(ids, positions, cell_size=cell_size, partition_by_z=partition_by_z)
+
+    @classmethod
+    def from_dataframe(cls, addresses_df, cell_size: Optional[float] = None, partition_by_z: bool = False):
+        """EndpointConnector의 addresses DataFrame(id, pos 컬럼)으로 인덱스를 생성합니다."""
+        if addresses_df is None or addresses_df.empty:
+            return cls([], np.empty((0, 3)), cell_size=cell_size or 1.0, partition_by_z=partition_by_z)
+        return cls.from_addresses(addresses_df[['id', 'pos']].to_dict('records'), cell_size=cell_size, partition_by_z=partition_by_z)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _estimate_cell_size(self) -> float:
+        """셀 하나에 평균 2~4개 점이 들어가도록 XY 평면 밀도로 셀 크기를 추정합니다."""
+        n = len(self.positions)
+        if n < 2:
+            return 1.0
+        span = self.positions[:, :2].max(axis=0) - self.positions[:, :2].min(axis=0)
+        area = float(max(span[0], 1.0) * max(span[1], 1.0))
+        return max(math.sqrt(area * 3.0 / n), 1e-6)
+
+    def _layer_key(self, z: float):
+        return float(z) if self.partition_by_z else None
+
+    def _build(self):
+        """모든 점을 (layer, cell) 버킷에 배치합니다."""
+        if len(self.positions) == 0:
+            return
+
+        cells = np.floor(self.positions / self.cell_size).astype(np.int64)
+        if self.partition_by_z:
+            # 레이어 내부에서는 z 셀을 사용하지 않음
+            cells[:, 2] = 0
+
+        buckets = defaultdict(list)
+        for i, (cell, z) in enumerate(zip(map(tuple, cells.tolist()), self.positions[:, 2].tolist())):
+            buckets[(self._layer_key(z), cell)].append(i)
+
+        for (layer, cell), indices in buckets.items():
+            self.grids.setdefault(layer, {})[cell] = np.asarray(indices, dtype=np.int64)
+
+        for layer, grid in self.grids.items():
+            keys = np.asarray(list(grid.keys()), dtype=np.int64)
+            self.grid_bounds[layer] = (keys.min(axis=0), keys.max(axis=0))
+            self.layer_indices[layer] = np.sort(np.concatenate(list(grid.values())))
+
+    def _query_cell(self, point) -> Tuple[int, int, int]:
+        cell = np.floor(np.asarray(point, dtype=np.float64) / self.cell_size).astype(np.int64)
+        if self.partition_by_z:
+            cell[2] = 0
+        return tuple(cell.tolist())
+
+    def _ring_cells(self, center, ring: int):
+        """center 셀로부터 체비셰프 거리가 정확히 ring인 셀들을 반환합니다."""
+        cx, cy, cz = center
+        z_range = [0] if self.partition_by_z else range(-ring, ring + 1)
+        for dz in z_range:
+            for dy in range(-ring, ring + 1):
+                for dx in range(-ring, ring + 1):
+                    if max(abs(dx), abs(dy), abs(dz)) == ring:
+                        yield (cx + dx, cy + dy, cz + dz)
+
+    def _grid_for(self, point):
+        return self.grids.get(self._layer_key(point[2]), {})
+
+    def _max_ring(self, point, center) -> int:
+        """center 셀에서 해당 레이어의 모든 셀을 덮는 데 필요한 최대 ring 반경을 계산합니다."""
+        low, high = self.grid_bounds[self._layer_key(point[2])]
+        center = np.asarray(center, dtype=np.int64)
+        return int(np.maximum(np.abs(center - low), np.abs(high - center)).max())
+
+    def _ring_size(self, ring: int) -> int:
+        if ring == 0:
+            return 1
+        side = 2 * ring + 1
+        if self.partition_by_z:
+            return side * side - (side - 2) ** 2
+        return side ** 3 - (side - 2) ** 3
+
+    def _candidate_mask(self, indices, exclude_ids: Optional[Set[int]]):
+        if not exclude_ids:
+            return indices
+        keep = [i for i in indices.tolist() if int(self.ids[i]) not in exclude_ids]
+        return np.asarray(keep, dtype=np.int64)
+
+    def knn(self, point, k: int = 1, exclude_ids: Optional[Set[int]] = None) -> List[Tuple[int, float]]:
+        """point와 가장 가까운 k개의 (id, 거리)를 거리 오름차순으로 반환합니다."""
+        point = np.asarray(point, dtype=np.float64)
+        grid = self._grid_for(point)
+        if k <= 0 or not grid:
+            return []
+
+        center = self._query_cell(point)
+        max_ring = self._max_ring(point, center)
+
+        found_idx = []
+        found_dist = []
+        ring = 0
+        while ring <= max_ring:
+            if self._ring_size(ring) > len(grid):
+                # 희소한 레이어에서는 빈 셀을 순회하는 것보다 남은 점 전체를 한 번에 계산하는 편이 빠름
+                return self._brute_force_knn(point, k, exclude_ids)
+            for cell in self._ring_cells(center, ring):
+                indices = grid.get(cell)
+                if indices is None:
+                    continue
+                indices = self._candidate_mask(indices, exclude_ids)
+                if len(indices) == 0:
+                    continue
+                dists = np.sqrt(((self.positions[indices] - point) ** 2).sum(axis=1))
+                found_idx.extend(indices.tolist())
+                found_dist.extend(dists.tolist())
+
+            # ring 바깥의 점은 최소 ring * cell_size 이상 떨어져 있음
+            if len(found_idx) >= k:
+                kth = sorted(found_dist)[k - 1]
+                if kth <= ring * self.cell_size:
+                    break
+            ring += 1
+
+        order = sorted(range(len(found_idx)), key=lambda i: (found_dist[i], found_idx[i]))[:k]
+        return [(int(self.ids[found_idx[i]]), float(found_dist[i])) for i in order]
+
+    def _brute_force_knn(self, point, k: int, exclude_ids: Optional[Set[int]]) -> List[Tuple[int, float]]:
+        """레이어의 모든 점에 대해 거리를 계산하여 상위 k개를 반환합니다."""
+        indices = self._candidate_mask(self.layer_indices[self._layer_key(point[2])], exclude_ids)
+        if len(indices) == 0:
+            return []
+        dists = np.sqrt(((self.positions[indices] - point) ** 2).sum(axis=1))
+        order = np.lexsort((indices, dists))[:k]
+        return [(int(self.ids[indices[i]]), float(dists[i])) for i in order]
+
+    def radius(self, point, r: float, exclude_ids: Optional[Set[int]] = None) -> List[Tuple[int, float]]:
+        """point로부터 거리 r 이내의 모든 (id, 거리)를 거리 오름차순으로 반환합니다."""
+        point = np.asarray(point, dtype=np.float64)
+        grid = self._grid_for(point)
+        if r < 0 or not grid:
+            return []
+
+        center = self._query_cell(point)
+        reach = int(math.ceil(r / self.cell_size))
+        results = []
+        for ring in range(reach + 1):
+            for cell in self._ring_cells(center, ring):
+                indices = grid.get(cell)
+                if indices is None:
+                    continue
+                indices = self._candidate_mask(indices, exclude_ids)
+                if len(indices) == 0:
+                    continue
+                dists = np.sqrt(((self.positions[indices] - point) ** 2).sum(axis=1))
+                for i, d in zip(indices.tolist(), dists.tolist()):
+                    if d <= r:
+                        results.append((int(self.ids[i]), float(d)))
+
+        results.sort(key=lambda item: (item[1], item[0]))
+        return results
+
+    def batch_knn(self, points, k: int = 1, query_ids: Optional[Sequence[int]] = None,
+                  exclude_ids: Optional[Set[int]] = None,
+                  per_query_exclude: Optional[Sequence[Optional[Set[int]]]] = None,
+                  chunk_size: int = BATCH_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+        """여러 query 좌표의 k-NN을 NumPy 연산으로 한 번에 계산합니다.
+
+        query를 격자 순서로 정렬해 chunk 단위로 묶고, chunk의 bounding box를 탐색 반경만큼
+        넓힌 영역의 후보 점들과 거리 행렬을 계산합니다. k번째 거리가 탐색 반경 이내인 query는
+        결과가 확정되고, 나머지는 반경을 두 배로 늘려 다시 계산합니다.
+
+        query_ids의 ID는 각 query 자신으로 간주되어 제외되고, exclude_ids는 모든 query에서,
+        per_query_exclude[i]는 i번째 query에서만 제외됩니다.
+        반환값은 (M, k) 크기의 (ids, distances)이며 이웃이 부족한 칸은 -1 / inf로 채워집니다.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        m = len(points)
+        result_ids = np.full((m, k), -1, dtype=np.int64)
+        result_dists = np.full((m, k), np.inf, dtype=np.float64)
+        if m == 0 or k <= 0 or len(self.ids) == 0:
+            return result_ids, result_dists
+
+        query_ids = np.asarray(query_ids, dtype=np.int64) if query_ids is not None else None
+
+        if self.partition_by_z:
+            layer_groups = defaultdict(list)
+            for i, z in enumerate(points[:, 2].tolist()):
+                layer_groups[self._layer_key(z)].append(i)
+        else:
+            layer_groups = {None: list(range(m))}
+
+        for layer, query_index in layer_groups.items():
+            candidates = self.layer_indices.get(layer)
+            if candidates is None:
+                continue
+            if exclude_ids:
+                candidates = candidates[~np.isin(self.ids[candidates], list(exclude_ids))]
+            if len(candidates) == 0:
+                continue
+
+            # Z-order(Morton) 순서로 정렬하여 chunk마다 공간적으로 모인 query가 묶이도록 함
+            query_index = np.asarray(query_index, dtype=np.int64)
+            cells = np.floor(points[query_index] / self.cell_size).astype(np.int64)
+            cells -= cells.min(axis=0)
+            morton = _interleave_bits(cells[:, 0]) | (_interleave_bits(cells[:, 1]) << 1)
+            query_index = query_index[np.lexsort((morton, cells[:, 2]))]
+
+            self._batch_knn_layer(points, query_index, candidates, k, query_ids, per_query_exclude,
+                                  chunk_size, result_ids, result_dists)
+
+        return result_ids, result_dists
+
+    def _batch_knn_layer(self, points, query_index, candidates, k, query_ids, per_query_exclude,
+                         chunk_size, result_ids, result_dists):
+        """한 레이어의 query들에 대해 반경을 늘려가며 batch k-NN을 수행합니다."""
+        cell_table = _CellTable(self.positions, candidates, self.cell_size)
+        layer_low, layer_high = cell_table.low, cell_table.high
+        search_radius = self.cell_size
+
+        pending = query_index
+        while len(pending) > 0:
+            retry = []
+            chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+            while chunks:
+                chunk = chunks.pop()
+                query_pos = points[chunk]
+                low = query_pos.min(axis=0) - search_radius
+                high = query_pos.max(axis=0) + search_radius
+                covers_layer = bool(np.all(low <= layer_low) and np.all(high >= layer_high))
+
+                box_candidates = cell_table.gather(low, high)
+                if len(chunk) > 1 and len(chunk) * len(box_candidates) > BATCH_MAX_PAIRS:
+                    # 거리 행렬이 너무 크면 chunk를 반으로 나눠서 처리
+                    half = len(chunk) // 2
+                    chunks.extend([chunk[:half], chunk[half:]])
+                    continue
+                if len(box_candidates) == 0:
+                    if not covers_layer:
+                        retry.append(chunk)
+                    continue
+
+                box_ids = self.ids[box_candidates]
+                box_pos = self.positions[box_candidates]
+                # 제곱 거리로 순위를 정하고 sqrt는 상위 k개에만 적용
+                dists = np.zeros((len(chunk), len(box_candidates)), dtype=np.float64)
+                for axis in range(3):
+                    delta = query_pos[:, axis, None] - box_pos[None, :, axis]
+                    dists += delta * delta
+
+                if query_ids is not None:
+                    dists[box_ids[None, :] == query_ids[chunk][:, None]] = np.inf
+                if per_query_exclude is not None:
+                    rows, cols = self._excluded_pairs(chunk, box_ids, per_query_exclude)
+                    dists[rows, cols] = np.inf
+
+                top_ids, top_dists = _top_k_rows(dists, box_candidates, box_ids, k)
+                top_dists = np.sqrt(top_dists)
+
+                width = top_dists.shape[1]
+                kth = top_dists[:, width - 1] if width == k else np.full(len(chunk), np.inf)
+                settled = covers_layer | (kth <= search_radius)
+
+                settled_rows = np.nonzero(settled)[0]
+                result_ids[chunk[settled_rows], :width] = top_ids[settled_rows]
+                result_dists[chunk[settled_rows], :width] = top_dists[settled_rows]
+                if not np.all(settled):
+                    retry.append(chunk[~settled])
+
+            pending = np.concatenate(retry) if retry else np.empty(0, dtype=np.int64)
+            search_radius *= 2.0
+
+    @staticmethod
+    def _excluded_pairs(chunk, box_ids, per_query_exclude):
+        """chunk의 (row, 후보 column) 중 per_query_exclude에 해당하는 위치를 찾습니다."""
+        pair_rows = []
+        pair_ids = []
+        for row, q in enumerate(chunk.tolist()):
+            excl = per_query_exclude[q]
+            if excl:
+                pair_rows.extend([row] * len(excl))
+                pair_ids.extend(excl)
+        if not pair_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        order = np.argsort(box_ids, kind='stable')
+        sorted_ids = box_ids[order]
+        pair_ids = np.asarray(pair_ids, dtype=np.int64)
+        pos = np.clip(np.searchsorted(sorted_ids, pair_ids), 0, len(sorted_ids) - 1)
+        found = sorted_ids[pos] == pair_ids
+        return np.asarray(pair_rows, dtype=np.int64)[found], order[pos[found]]
+
+    def positions_of(self, address_ids: Sequence[int]) -> np.ndarray:
+        """address ID 목록의 좌표를 (N, 3) 배열로 반환합니다."""
+        return self.positions[[self.id_to_index[int(address_id)] for address_id in address_ids]]
+
+    def position_of(self, address_id: int):
+        """address ID의 좌표를 반환합니다."""
+        index = self.id_to_index.get(int(address_id))
+        if index is None:
+            return None
+        return self.positions[index]
+
+
+def find_coincident_clusters(positions, tolerance: float) -> List[List[int]]:
+    """서로 tolerance 이내에 있는 점들을 클러스터로 묶어 반환합니다.
+
+    좌표를 tolerance 크기의 격자 셀로 스냅하고 이웃 셀(3x3x3)만 비교하므로 점 수에 선형입니다.
+    가까운 점이 사슬처럼 이어지면 하나의 클러스터가 됩니다.
+    반환값은 점이 2개 이상인 클러스터의 인덱스 목록이며 첫 인덱스 순으로 정렬됩니다.
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    n = len(positions)
+    if n < 2:
+        return []
+    cell_size = max(float(tolerance), 1e-9)
+    tol_sq = float(tolerance) ** 2
+
+    cells = np.floor(positions / cell_size).astype(np.int64)
+    buckets = defaultdict(list)
+    for i, cell in enumerate(map(tuple, cells.tolist())):
+        buckets[cell].append(i)
+
+    # 셀 자신 + 앞쪽 반공간 13개 이웃 셀만 확인하여 각 셀 쌍을 한 번씩만 비교
+    forward = [(dx, dy, dz) for dz in (-1, 0, 1) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if (dz, dy, dx) > (0, 0, 0)]
+    coords = positions.tolist()
+    union_find = UnionFind(n)
+    merged = False
+    for (cx, cy, cz), members in buckets.items():
+        for a_pos, a in enumerate(members):
+            ax, ay, az = coords[a]
+            for b in members[a_pos + 1:]:
+                bx, by, bz = coords[b]
+                if (ax - bx) ** 2 + (ay - by) ** 2 + (az - bz) ** 2 <= tol_sq:
+                    union_find.union(a, b)
+                    merged = True
+        for dx, dy, dz in forward:
+            others = buckets.get((cx + dx, cy + dy, cz + dz))
+            if not others:
+                continue
+            for a in members:
+                ax, ay, az = coords[a]
+                for b in others:
+                    bx, by, bz = coords[b]
+                    if (ax - bx) ** 2 + (ay - by) ** 2 + (az - bz) ** 2 <= tol_sq:
+                        union_find.union(a, b)
+                        merged = True
+
+    if not merged:
+        return []
+    return [group for group in union_find.groups() if len(group) > 1]
+
+
+def _interleave_bits(values: np.ndarray) -> np.ndarray:
+    """정수 배열의 하위 32비트 사이에 0비트를 끼워 넣습니다 (Morton 코드 계산용)."""
+    v = values.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return v
+
+
+class _CellTable:
+    """점 인덱스를 (cz, cy, cx) 셀 키 순서로 정렬해 두고 bounding box 내 후보를 slice로 꺼내는 테이블"""
+
+    def __init__(self, positions, indices, cell_size: float):
+        self.cell_size = cell_size
+        pos = positions[indices]
+        self.low = pos.min(axis=0)
+        self.high = pos.max(axis=0)
+
+        cells = np.floor(pos / cell_size).astype(np.int64)
+        self.cell_min = cells.min(axis=0)
+        self.cell_max = cells.max(axis=0)
+        self.shape = self.cell_max - self.cell_min + 1
+
+        keys = self._encode(cells - self.cell_min)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.indices = np.asarray(indices, dtype=np.int64)[order]
+
+    def _encode(self, rel_cells):
+        nx, ny = int(self.shape[0]), int(self.shape[1])
+        return (rel_cells[..., 2] * ny + rel_cells[..., 1]) * nx + rel_cells[..., 0]
+
+    def gather(self, low, high) -> np.ndarray:
+        """[low, high] 박스와 겹치는 셀들에 속한 점 인덱스를 반환합니다."""
+        lo = np.maximum(np.floor(low / self.cell_size).astype(np.int64), self.cell_min) - self.cell_min
+        hi = np.minimum(np.floor(high / self.cell_size).astype(np.int64), self.cell_max) - self.cell_min
+        if np.any(hi < lo):
+            return np.empty(0, dtype=np.int64)
+
+        zz, yy = np.meshgrid(np.arange(lo[2], hi[2] + 1), np.arange(lo[1], hi[1] + 1), indexing='ij')
+        zz = zz.ravel()
+        yy = yy.ravel()
+        row_start = self._encode(np.stack([np.full_like(zz, lo[0]), yy, zz], axis=1))
+        row_end = self._encode(np.stack([np.full_like(zz, hi[0]), yy, zz], axis=1))
+        starts = np.searchsorted(self.keys, row_start, side='left')
+        ends = np.searchsorted(self.keys, row_end, side='right')
+
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        # 여러 [start, end) 구간을 하나의 인덱스 배열로 이어 붙임
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.indices[np.arange(total) + offsets]
+
+
+def _top_k_rows(dists: np.ndarray, candidates: np.ndarray, candidate_ids: np.ndarray, k: int):
+    """거리 행렬의 각 행에서 (거리, 후보 순서) 기준 상위 k개의 (ids, 거리)를 구합니다."""
+    width = min(k, dists.shape[1])
+    if width < dists.shape[1]:
+        part = np.argpartition(dists, width - 1, axis=1)[:, :width]
+    else:
+        part = np.broadcast_to(np.arange(width), (len(dists), width)).copy()
+
+    part_dists = np.take_along_axis(dists, part, axis=1)
+    order = np.lexsort((candidates[part], part_dists), axis=1)
+    part = np.take_along_axis(part, order, axis=1)
+    part_dists = np.take_along_axis(part_dists, order, axis=1)
+
+    if width < dists.shape[1]:
+        # k번째와 같은 거리의 후보가 더 있으면 후보 순서로 다시 골라야 하므로 해당 행만 전체 정렬
+        kth = part_dists[:, width - 1]
+        tied = np.nonzero(np.isfinite(kth) & ((dists <= kth[:, None]).sum(axis=1) > width))[0]
+        for row in tied.tolist():
+            full = np.lexsort((candidates, dists[row]))[:width]
+            part[row] = full
+            part_dists[row] = dists[row, full]
+
+    top_ids = np.where(np.isfinite(part_dists), candidate_ids[part], -1)
+    return top_ids, part_dists